@@ -1,193 +1,67 @@
 # app.py
+# Thin client of scrapers.instagram_selenium. Streamlit re-executes this file on every
+# interaction, so only Streamlit and light stdlib-only modules are imported here; the
+# scraping stack (selenium, pandas, the driver pool) loads when a scrape first starts.
+import contextlib
+import functools
 import os
-import io
-import re
-import time
-import random
-from typing import List, Dict, Optional
-from urllib.parse import urlparse
+import tempfile
+from typing import Optional
 
-import pandas as pd
 import streamlit as st
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from selenium.webdriver.chrome.service import Service
 
-# --- Small helpers ------------------------------------------------------------
-def normalize_input(raw: str) -> Optional[str]:
-    if not raw:
-        return None
-    text = raw.strip()
-    if text.startswith("@"):
-        text = text[1:]
-    if text.startswith("http://") or text.startswith("https://"):
-        try:
-            p = urlparse(text)
-            seg = (p.path or "").strip("/").split("/")[0]
-            if seg:
-                text = seg
-        except Exception:
-            pass
-    return text if re.match(r"^[A-Za-z0-9._]{1,100}$", text) else None
-
-def build_driver(headless: bool = True) -> webdriver.Chrome:
-    opts = Options()
-    if headless:
-        opts.add_argument("--headless=new")
-    # stable flags for low-RAM/headless
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--disable-extensions")
-    opts.add_argument("--window-size=1280,1696")
-    opts.add_argument("--disable-features=VizDisplayCompositor")
-    opts.add_argument("--lang=en-US")
-    opts.set_capability("pageLoadStrategy", "eager")
-    # user agent + anti-automation
-    opts.add_argument("--disable-blink-features=AutomationControlled")
-    opts.add_experimental_option("excludeSwitches", ["enable-automation"])
-    opts.add_experimental_option("useAutomationExtension", False)
-    opts.add_argument(
-        "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
-    )
-    # Let Selenium 4+ manage the driver locally (no path needed)
-    # If you are on a server with chromium paths, set CHROME_BIN/CHROMEDRIVER envs.
-    chrome_bin = os.getenv("CHROME_BIN")
-    chromedriver = os.getenv("CHROMEDRIVER")
-    if chrome_bin:
-        opts.binary_location = chrome_bin
-    service = Service(chromedriver) if chromedriver else None
-
-    driver = webdriver.Chrome(service=service, options=opts)
-    try:
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    except Exception:
-        pass
-    return driver
-
-def dismiss_cookie_banner(driver: webdriver.Chrome):
-    candidates = [
-        '//button//*[contains(text(),"Allow all cookies")]/ancestor::button',
-        '//button[contains(text(),"Allow all cookies")]',
-        '//button//*[contains(text(),"Only allow essential cookies")]/ancestor::button',
-        '//div[@role="dialog"]//button[contains(text(),"Accept")]',
-        '//button[contains(text(),"Allow All")]',
-    ]
-    for xp in candidates:
-        try:
-            btn = WebDriverWait(driver, 3).until(EC.element_to_be_clickable((By.XPATH, xp)))
-            btn.click()
-            time.sleep(1.0)
-            break
-        except Exception:
-            pass
-
-def login(driver: webdriver.Chrome, username: str, password: str):
-    st.write("🔐 Logging in…")
-    try:
-        driver.get("https://www.instagram.com/accounts/login/")
-    except WebDriverException:
-        time.sleep(2)
-        driver.get("https://www.instagram.com/accounts/login/")
-
-    time.sleep(random.uniform(3.5, 5.5))
-    wait = WebDriverWait(driver, 30)
-    try:
-        u = wait.until(EC.presence_of_element_located((By.NAME, "username")))
-        p = wait.until(EC.presence_of_element_located((By.NAME, "password")))
-        u.clear(); p.clear()
-        u.send_keys(username)
-        p.send_keys(password)
-        wait.until(EC.element_to_be_clickable((By.XPATH, '//button[@type="submit"]'))).click()
-    except TimeoutException:
-        st.warning("Login form wasn’t found in time.")
-        return
-    time.sleep(random.uniform(6, 9))
-
-    # dismiss post-login popups
-    for _ in range(3):
-        try:
-            WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, '//button[contains(text(),"Not Now") or contains(text(),"Not now")]'))
-            ).click()
-            time.sleep(1.0)
-        except TimeoutException:
-            break
-    st.write("✅ Logged in.")
-
-def collect_post_urls(driver: webdriver.Chrome, handle: str, max_idle_scrolls: int = 12) -> List[str]:
-    """Use JS to grab all /p/ and /reel/ links while scrolling."""
-    profile = f"https://www.instagram.com/{handle}/?hl=en"
-    st.write(f"🌐 Visiting: {profile}")
-    try:
-        driver.get(profile)
-    except WebDriverException:
-        time.sleep(2)
-        driver.get(profile)
-
-    time.sleep(random.uniform(3, 5))
-    dismiss_cookie_banner(driver)
-
-    # login wall?
-    try:
-        WebDriverWait(driver, 6).until(EC.presence_of_element_located((By.NAME, "username")))
-        return ["__LOGIN_REQUIRED__"]
-    except Exception:
-        pass
-
-    # quick checks
-    if driver.find_elements(By.XPATH, '//*[contains(text(),"This account is private")]'):
-        return []
-    if driver.find_elements(By.XPATH, '//*[contains(text(),"No posts yet")]'):
-        return []
-
-    js_capture = """
-    const hrefs = Array.from(document.querySelectorAll('a'))
-      .map(a => a.href)
-      .filter(h => h && (h.includes('/p/') || h.includes('/reel/')))
-      .map(h => h.split('?')[0]);
-    return Array.from(new Set(hrefs));
+from core import metrics
+from core.jobs import Job, JobManager
+from core.result_store import ResultStore
+from scrapers.urls import normalize_handle
+
+# --- Shared scraping core -----------------------------------------------------
+@st.cache_resource
+def get_result_store() -> ResultStore:
+    """Every post this app has scraped, across runs and profiles (SCRAPER_RESULTS_DB)."""
+    return ResultStore()
+
+@st.cache_resource
+def get_scraper(lean: bool = False):
+    """One scraper (and its pool of warm, logged-in browsers) per browser mode, shared by
+    every session and rerun. Imported here so reruns that don't scrape never pay for it.
+    Rows go into the result store as they are found."""
+    from scrapers.instagram_selenium import InstagramScraperSelenium
+
+    scraper = InstagramScraperSelenium(lean=lean, store=get_result_store())
+    scraper.warm(background=True)
+    return scraper
+
+# --- Background jobs ----------------------------------------------------------
+def run_scrape_job(job: Job, handle: str, scraper):
+    """Worker-thread body: no Streamlit calls here, only `job.update(...)`.
+
+    Returns a compact PostSet (cached per handle by the job manager) rather than row dicts.
     """
+    from scrapers.post_set import PostSet
+
+    job.update(message="⏳ Waiting for a browser…")
+    posts = PostSet()
+    with metrics.span("app_scrape", handle=handle) as info:
+        for row in scraper.iter_profile(handle):
+            posts.add(row["shortcode"], row["type"])
+            job.update(message=f"📸 Collected so far: {len(posts)}", collected=len(posts))
+        info["posts"] = len(posts)
+    return posts.sort()
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    """Shared by every session: scrapes outlive reruns, and results are cached per handle."""
+    return JobManager(
+        runner=run_scrape_job,
+        workers=int(os.getenv("SCRAPER_POOL_SIZE", "1")),
+        ttl=float(os.getenv("SCRAPER_RESULT_TTL", "3600")),
+    )
 
-    urls = set()
-    prev, idle = 0, 0
-
-    try:
-        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a")))
-    except TimeoutException:
-        pass
-
-    while True:
-        try:
-            found = driver.execute_script(js_capture) or []
-        except WebDriverException:
-            found = []
-        for h in found:
-            if "/p/" in h or "/reel/" in h:
-                urls.add(h)
-
-        st.write(f"📸 Collected so far: {len(urls)}")
-        driver.execute_script("window.scrollBy(0, document.body.scrollHeight * 0.85);")
-        time.sleep(random.uniform(1.8, 3.4))
-
-        curr = len(urls)
-        idle = idle + 1 if curr == prev else 0
-        prev = curr
-        if idle >= max_idle_scrolls:
-            break
-
-    return sorted(urls)
-
-def url_to_row(url: str) -> Dict:
-    kind = "post" if "/p/" in url else ("reel" if "/reel/" in url else "unknown")
-    m = re.search(r"/(p|reel)/([^/]+)/?", url)
-    shortcode = m.group(2) if m else None
-    return {"type": kind, "shortcode": shortcode, "post_url": url}
+@st.cache_resource
+def start_metrics_server():
+    """Prometheus /metrics on SCRAPER_METRICS_PORT, started once per server process (None if unset)."""
+    return metrics.serve_prometheus()
 
 # --- Streamlit UI -------------------------------------------------------------
 st.set_page_config(page_title="Instagram Scraper", layout="wide")
@@ -196,85 +70,168 @@ st.title("Instagram Profile Scraper (Selenium)")
 with st.expander("How it works", expanded=False):
     st.markdown(
         "- Enter an Instagram **username** (e.g. `@user`) or **profile URL**.\n"
-        "- App will **log in** if you supply `INSTAGRAM_USERNAME` & `INSTAGRAM_PASSWORD` env vars.\n"
+        "- App will **log in** if you supply `INSTAGRAM_USERNAME` & `INSTAGRAM_PASSWORD` env vars\n"
+        "  (or several logins in `INSTAGRAM_ACCOUNTS`, rotated by remaining budget).\n"
         "- It scrolls the profile and extracts `/p/` and `/reel/` URLs.\n"
-        "- Download results as **CSV** or **Excel**."
+        "- Every result is kept: browse any scraped profile page by page, filter it, and\n"
+        "  download the filtered rows as **CSV**, **Excel** or **Parquet**."
     )
 
 raw = st.text_input("Instagram username or profile URL", placeholder="@user or https://instagram.com/user", key="profile_input")
+lean = st.checkbox(
+    "Lean browser (skip images, video, fonts & trackers)", value=False, key="lean_mode",
+    help="Faster page loads and lower memory; only post links are needed.",
+)
+refresh = st.checkbox(
+    "Ignore cached results", value=False, key="refresh",
+    help="Results are reused per handle for SCRAPER_RESULT_TTL seconds (default 1 hour).",
+)
 run = st.button("Scrape Post URLs", key="run_btn")
 
 st.caption(
     f"Env → INSTAGRAM_USERNAME: **{bool(os.getenv('INSTAGRAM_USERNAME'))}**, "
-    f"INSTAGRAM_PASSWORD: **{bool(os.getenv('INSTAGRAM_PASSWORD'))}**"
+    f"INSTAGRAM_PASSWORD: **{bool(os.getenv('INSTAGRAM_PASSWORD'))}**, "
+    f"INSTAGRAM_ACCOUNTS: **{bool(os.getenv('INSTAGRAM_ACCOUNTS') or os.getenv('SCRAPER_ACCOUNTS_FILE'))}**"
 )
 
+start_metrics_server()
+with st.expander("Metrics", expanded=False):
+    snapshot = metrics.REGISTRY.snapshot()
+    if snapshot:
+        for r in snapshot:
+            r["labels"] = ", ".join(f"{k}={v}" for k, v in r["labels"].items())
+        st.dataframe(snapshot, use_container_width=True, hide_index=True)
+    else:
+        st.caption("No scrapes have run in this server process yet.")
+
 if run:
-    handle = normalize_input(raw)
+    handle = normalize_handle(raw)
     if not handle:
         st.error("Please enter a valid username or profile URL.")
         st.stop()
-
-    user = os.getenv("INSTAGRAM_USERNAME", "")
-    pwd = os.getenv("INSTAGRAM_PASSWORD", "")
-
-    with st.spinner("Launching headless browser and scraping…"):
-        driver = build_driver(headless=True)
-        try:
-            if user and pwd:
-                login(driver, user, pwd)
-            urls = collect_post_urls(driver, handle, max_idle_scrolls=12)
-
-            if urls == ["__LOGIN_REQUIRED__"] and user and pwd:
-                login(driver, user, pwd)
-                urls = collect_post_urls(driver, handle, max_idle_scrolls=12)
-        finally:
-            try:
-                driver.quit()
-            except Exception:
-                pass
-
-    if not urls or urls == ["__LOGIN_REQUIRED__"]:
+    job = get_job_manager().submit(handle, refresh=refresh, scraper=get_scraper(lean=lean))
+    st.session_state["job_id"] = job.id
+
+job = get_job_manager().get(st.session_state.get("job_id"))
+
+def render_progress():
+    """Single placeholder refreshed in place while the job runs in the background."""
+    snap = job.snapshot()
+    p = snap["progress"]
+    if not job.finished:
+        st.info(
+            f"**@{snap['key']}** — {snap['status']} · {p.get('collected', 0)} collected · "
+            f"{snap['elapsed']:.0f}s\n\n{p.get('message', '')}"
+        )
+    else:
+        # flip the whole page over to the results view
+        st.rerun()
+
+if job is not None and not job.finished:
+    st.fragment(render_progress, run_every=1.0)()
+    st.stop()
+
+if job is not None:
+    if job.status == "failed":
+        st.error(f"Scrape failed: {job.error}")
+    elif not job.result:
         st.warning("No data returned. The account may be private or the grid didn’t load. Try again.")
-        st.stop()
-
-        # Build DataFrame from the collected URLs
-    df = pd.DataFrame([url_to_row(u) for u in urls])
-
-    st.subheader(f"Collected {len(df)} URLs")
-    st.dataframe(df, use_container_width=True)
+    else:
+        source = "cached result" if job.cached else f"scraped in {job.snapshot()['elapsed']:.0f}s"
+        st.success(f"Collected {len(job.result)} URLs for @{job.key} ({source})")
+
+# --- Stored results -----------------------------------------------------------
+VIEW_COLUMNS = ["handle", "type", "shortcode", "post_url", "scraped_at"]
+EXPORTS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+@st.cache_resource
+def get_export_dir() -> tempfile.TemporaryDirectory:
+    """Prepared exports wait here for their download; removed when the server exits."""
+    return tempfile.TemporaryDirectory(prefix="instagram_exports_")
+
+def drop_export():
+    """Forget this session's prepared export and delete its file."""
+    prepared = st.session_state.pop("export", None)
+    if prepared:
+        with contextlib.suppress(OSError):
+            os.remove(prepared[1])
+
+def read_export(path: str) -> bytes:
+    # Deferred: only runs when the download is actually clicked
+    with open(path, "rb") as fh:
+        return fh.read()
+
+def render_results(store: ResultStore, current: Optional[str] = None):
+    """Filtered, paginated view of the store; only the visible page is read, and exports
+    stream the same query through core.exporters into a temporary file when asked for."""
+    handles = [h["handle"] for h in store.handles()]
+    if not handles:
+        return
+    st.subheader("Results")
+    options = ["All profiles"] + handles
+    c1, c2, c3, c4 = st.columns([2, 1, 2, 1])
+    with c1:
+        chosen = st.selectbox("Profile", options, index=options.index(current) if current in handles else 0)
+    with c2:
+        kind = st.selectbox("Type", ["All", "post", "reel"], key="filter_type")
+    with c3:
+        prefix = st.text_input("Shortcode starts with", key="filter_shortcode").strip()
+    with c4:
+        order = st.selectbox("Sort", ["newest", "oldest", "shortcode"], key="filter_order")
+    filters = {
+        "handle": None if chosen == "All profiles" else chosen,
+        "type": None if kind == "All" else kind,
+        "shortcode": prefix or None,
+    }
+
+    total = store.count(**filters)
+    c1, c2, _ = st.columns([1, 1, 4])
+    with c1:
+        size = st.selectbox("Rows per page", [25, 50, 100, 250], index=1, key="page_size")
+    pages = max(1, -(-total // size))
+    with c2:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+    rows = store.query(limit=size, offset=(page - 1) * size, order=order, columns=VIEW_COLUMNS, **filters)
+    st.caption(f"{total} posts match · page {page} of {pages}")
+    st.dataframe(rows, use_container_width=True, hide_index=True)
 
     # ----------------- Downloads -----------------
-    c1, c2 = st.columns(2)
-
-    # CSV download
+    c1, c2, c3 = st.columns([1, 1, 2])
     with c1:
-        st.download_button(
-            "⬇️ Download CSV",
-            data=df.to_csv(index=False).encode("utf-8"),
-            file_name="instagram_post_urls.csv",
-            mime="text/csv",
-            key="csv_dl",
-        )
-
-    # Excel download (in-memory; safe on Windows)
-    import io
-    excel_buffer = io.BytesIO()
-
-    # Ensure at least one sheet is written
-    df_to_write = df if not df.empty else pd.DataFrame({"post_url": []})
-
-    with pd.ExcelWriter(excel_buffer, engine="openpyxl") as writer:
-        df_to_write.to_excel(writer, index=False, sheet_name="posts")
-    excel_buffer.seek(0)
-
+        label = st.selectbox("Export format", list(EXPORTS), key="export_format", label_visibility="collapsed")
+    fmt, mime = EXPORTS[label]
+    signature = (tuple(filters.items()), order, fmt)
+    # An export prepared for other filters is stale: delete it rather than keep it around
+    if st.session_state.get("export", (signature,))[0] != signature:
+        drop_export()
     with c2:
-        st.download_button(
-            "⬇️ Download Excel",
-            data=excel_buffer,
-            file_name="instagram_post_urls.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            key="xlsx_dl",
-        )
+        if st.button(f"Prepare {label} of {total} rows", key="export_btn"):
+            # Only now: pandas/openpyxl/pyarrow load, and rows are read in chunks from the store
+            from core.exporters import export
 
-    st.success("Done!")
+            drop_export()
+            fd, path = tempfile.mkstemp(suffix=f".{fmt}", dir=get_export_dir().name)
+            os.close(fd)
+            try:
+                export(store.frames(order=order, columns=VIEW_COLUMNS, **filters), path, fmt=fmt)
+                st.session_state["export"] = (signature, path)
+            except RuntimeError as e:  # e.g. Parquet without pyarrow
+                os.remove(path)
+                st.error(str(e))
+    prepared = st.session_state.get("export")
+    if prepared:
+        with c3:
+            st.download_button(
+                f"⬇️ Download {label}",
+                data=functools.partial(read_export, prepared[1]),
+                file_name=f"instagram_post_urls_{filters['handle'] or 'all'}.{fmt}",
+                mime=mime,
+                key="export_dl",
+            )
+
+render_results(get_result_store(), job.key if job is not None else None)
@@ -0,0 +1,179 @@
+# benchmarks/bench_accounts.py
+"""Account rotation on a simulated clock: AccountPool scheduling profile scrapes against a
+fake Instagram that throttles any login making more than `--limit` visits per `--window`
+seconds (and keeps throttling it for `--penalty` seconds), with an occasional login wall.
+No browser is launched and no real time passes, so hours of scraping run in a second.
+The scheduler's rules (account choice, cooldown doubling, refill-then-wait) are asserted
+first, so a regression fails the run before any table is printed.
+
+    python -m benchmarks.bench_accounts --accounts 1 2 4 8 --rates 2 4 --scrapes 500
+"""
+import argparse
+import contextlib
+import io
+import random
+from collections import Counter, defaultdict, deque
+from typing import Deque, Dict
+
+from scrapers.accounts import LOGIN_WALL, OK, THROTTLED, AccountPool
+
+
+class SimClock:
+    """Monotonic clock that only moves when something sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += max(0.0, seconds)
+
+
+class FakeInstagram:
+    """Throttling stand-in: a sliding window of profile visits per login."""
+
+    def __init__(self, clock: SimClock, limit: int, window: float, penalty: float,
+                 wall_rate: float, seed: int = 7):
+        self.clock = clock
+        self.limit = limit
+        self.window = window
+        self.penalty = penalty
+        self.wall_rate = wall_rate
+        self.rnd = random.Random(seed)
+        self.visits: Dict[str, Deque[float]] = defaultdict(deque)
+        self.blocked_until: Dict[str, float] = defaultdict(float)
+
+    def visit(self, username: str) -> str:
+        now = self.clock()
+        if now < self.blocked_until[username]:
+            return THROTTLED
+        recent = self.visits[username]
+        recent.append(now)
+        while recent[0] <= now - self.window:
+            recent.popleft()
+        if len(recent) > self.limit:
+            self.blocked_until[username] = now + self.penalty
+            return THROTTLED
+        if self.rnd.random() < self.wall_rate:
+            return LOGIN_WALL
+        return OK
+
+
+def check_scheduling() -> None:
+    """The pool's rules, on a clock that only moves when the pool sleeps."""
+    clock = SimClock()
+
+    def pool(n: int, **kwargs) -> AccountPool:
+        return AccountPool([(f"acct{i}", "secret") for i in range(n)], clock=clock, sleep=clock.sleep, **kwargs)
+
+    # Most tokens first, ties to the account that rested longest
+    p = pool(3, per_minute=1, burst=3)
+    picks = [p.acquire().username for _ in range(6)]
+    assert picks == ["acct0", "acct1", "acct2"] * 2, picks
+    # ... and more tokens beats having rested longer
+    p = pool(3, per_minute=1, burst=3)
+    p.accounts[2].bucket.drain()
+    picks = [p.acquire().username for _ in range(4)]
+    assert picks == ["acct0", "acct1", "acct0", "acct1"], picks
+    assert clock() == 0.0, "no wait while a bucket holds a token"
+
+    # Each consecutive block doubles the cooldown, up to max_cooldown; OK clears the strikes
+    p = pool(1, cooldown=100, max_cooldown=300)
+    a = p.accounts[0]
+    seen = []
+    for outcome in (THROTTLED, LOGIN_WALL, THROTTLED, OK, THROTTLED):
+        p.report(a, outcome)
+        if outcome != OK:
+            seen.append(a.cooldown_until - clock())
+    assert seen == [100, 200, 300, 100], seen
+    assert p.available() == 0 and a.bucket.tokens() == 0.0
+
+    # Refill, then wait: the burst goes out at once, the next token after 60/per_minute seconds
+    p = pool(1, per_minute=6, burst=2)
+    start = clock()
+    p.acquire(), p.acquire()
+    assert clock() == start
+    p.acquire()
+    assert abs(clock() - start - 10.0) < 0.01, clock() - start
+    # A cooldown outlasts the refill: the wait is the later of the two, not their sum
+    p.report(p.accounts[0], THROTTLED)
+    start = clock()
+    p.acquire()
+    assert abs(clock() - start - 900.0) < 0.01, clock() - start
+    p.acquire()  # the bucket refilled to its burst meanwhile
+    try:
+        p.acquire(timeout=5)
+        raise AssertionError("acquire should time out while no token can arrive in time")
+    except TimeoutError:
+        pass
+
+
+def simulate(accounts: int, rate: float, args) -> dict:
+    clock = SimClock()
+    site = FakeInstagram(clock, args.limit, args.window, args.penalty, args.wall_rate)
+    pool = AccountPool([(f"acct{i}", "secret") for i in range(accounts)], per_minute=rate,
+                       burst=args.burst, cooldown=args.cooldown, clock=clock, sleep=clock.sleep)
+    ok = failed = blocked = 0
+    served: Counter = Counter()
+    for _ in range(args.scrapes):
+        # Same loop as InstagramScraperSelenium._scrape_rotating
+        for attempt in range(len(pool)):
+            if attempt and not pool.available():
+                failed += 1
+                break
+            account = pool.acquire()
+            outcome = site.visit(account.username)
+            clock.sleep(args.scrape_s)
+            pool.report(account, outcome)
+            if outcome == OK:
+                ok += 1
+                served[account.username] += 1
+                break
+            blocked += 1
+        else:
+            failed += 1
+    hours = clock() / 3600
+    return {
+        "accounts": accounts,
+        "rate/min": rate,
+        "ok": ok,
+        "failed": failed,
+        "blocked_visits": blocked,
+        "sim_hours": round(hours, 2),
+        "scrapes/hour": round(ok / hours, 1) if hours else None,
+        "min/max_share": f"{min(served.values(), default=0)}/{max(served.values(), default=0)}",
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--accounts", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--rates", type=float, nargs="+", default=[2.0, 4.0], help="budget per account per minute")
+    ap.add_argument("--scrapes", type=int, default=500)
+    ap.add_argument("--burst", type=float, default=3.0)
+    ap.add_argument("--cooldown", type=float, default=900.0)
+    ap.add_argument("--scrape-s", type=float, default=8.0, help="simulated seconds one profile takes")
+    ap.add_argument("--limit", type=int, default=30, help="visits per window the fake site tolerates per login")
+    ap.add_argument("--window", type=float, default=600.0)
+    ap.add_argument("--penalty", type=float, default=1800.0, help="how long the fake site keeps throttling")
+    ap.add_argument("--wall-rate", type=float, default=0.01, help="chance a visit hits a login wall")
+    args = ap.parse_args()
+
+    results = []
+    # The pool logs every cooldown; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        check_scheduling()
+        for rate in args.rates:
+            for n in args.accounts:
+                results.append(simulate(n, rate, args))
+
+    cols = list(results[0])
+    print(" | ".join(f"{c:>14}" for c in cols))
+    for r in results:
+        print(" | ".join(f"{str(r[c]):>14}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_enrich.py
+"""Post-detail enrichment against local fixture post pages: throughput per worker count,
+field accuracy, and a second pass that should be served entirely from the shortcode cache.
+
+    python -m benchmarks.bench_enrich --posts 60 --workers 1 2 4
+"""
+import argparse
+import functools
+import os
+import tempfile
+import time
+
+from benchmarks.fixture_server import FixtureConfig, FixtureServer, post_fields
+from scrapers.driver_pool import DriverPool
+from scrapers.enrich import EnrichmentCache, Enricher
+from scrapers.instagram_selenium import _build_driver
+
+_CHECKED = ("caption", "posted_at", "likes", "comments", "media_type")
+
+
+def _rows(base_url: str, posts: int):
+    rows = []
+    for i in range(posts):
+        f = post_fields(i)
+        rows.append({"type": f["type"], "shortcode": f["shortcode"],
+                     "post_url": f"{base_url}/{f['type']}/{f['shortcode']}/"})
+    return rows
+
+
+def run(base_url: str, posts: int, workers: int, tmp: str) -> dict:
+    pool = DriverPool(factory=functools.partial(_build_driver, headless=True, lean=True), size=workers)
+    cache = EnrichmentCache(os.path.join(tmp, f"enriched-{workers}.db"))
+    # No politeness delay locally: this measures the fetch path itself
+    enricher = Enricher(pool=pool, workers=workers, per_host_per_minute=None, cache=cache)
+    rows = _rows(base_url, posts)
+    try:
+        t0 = time.perf_counter()
+        out = enricher.enrich(rows)
+        cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        enricher.enrich(rows)
+        warm = time.perf_counter() - t0
+    finally:
+        enricher.close()
+    correct = sum(
+        all(r.get(k) == post_fields(i)[k] for k in _CHECKED) for i, r in enumerate(out)
+    )
+    return {
+        "workers": workers,
+        "cold_s": round(cold, 2),
+        "posts_per_s": round(posts / cold, 1) if cold else None,
+        "cached_s": round(warm, 3),
+        "accurate": f"{correct}/{posts}",
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--posts", type=int, default=60)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = ap.parse_args()
+
+    with FixtureServer(FixtureConfig(posts=args.posts)) as srv, tempfile.TemporaryDirectory() as tmp:
+        results = [run(srv.base_url, args.posts, w, tmp) for w in args.workers]
+
+    cols = list(results[0])
+    print(" | ".join(f"{c:>12}" for c in cols))
+    for r in results:
+        print(" | ".join(f"{str(r[c]):>12}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_exporters.py
+"""Peak Python memory and throughput per export format, streamed vs the old all-in-memory path.
+
+    python -m benchmarks.bench_exporters --rows 20000 100000 500000
+
+Peak memory is what tracemalloc sees on the Python heap; Arrow's C++ buffers (Parquet) are not
+included, and tracing itself slows every format down, so compare rows/s within this table only.
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.bench_cleaners import make_posts
+from core.exporters import export
+
+
+def _legacy_csv(df: pd.DataFrame, path: str) -> None:
+    with open(path, "wb") as fh:
+        fh.write(df.to_csv(index=False).encode("utf-8"))
+
+
+def _legacy_xlsx(df: pd.DataFrame, path: str) -> None:
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name="data")
+    with open(path, "wb") as fh:
+        fh.write(buf.getvalue())
+
+
+def _measure(fn, df: pd.DataFrame, path: str) -> dict:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn(df, path)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": elapsed,
+        "rows_per_s": len(df) / elapsed if elapsed else float("inf"),
+        "peak_mb": peak / 2 ** 20,
+        "file_mb": os.path.getsize(path) / 2 ** 20,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rows", type=int, nargs="+", default=[20_000, 100_000])
+    ap.add_argument("--skip-xlsx-over", type=int, default=50_000, help="XLSX is slow; skip it above this many rows")
+    args = ap.parse_args()
+
+    cases = [
+        ("csv (legacy)", "csv", _legacy_csv),
+        ("csv", "csv", None),
+        ("csv.gz", "csv.gz", None),
+        ("jsonl", "jsonl", None),
+        ("jsonl.gz", "jsonl.gz", None),
+        ("parquet", "parquet", None),
+        ("xlsx (legacy)", "xlsx", _legacy_xlsx),
+        ("xlsx", "xlsx", None),
+    ]
+    print(f"{'rows':>9} | {'format':<14} | {'seconds':>8} | {'rows/s':>10} | {'peak MB':>8} | {'file MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            df = make_posts(n)
+            for label, ext, legacy in cases:
+                if ext == "xlsx" and n > args.skip_xlsx_over:
+                    continue
+                path = os.path.join(tmp, f"out.{ext}")
+                fn = legacy or (lambda d, p: export(d, p))
+                r = _measure(fn, df, path)
+                print(f"{n:>9,} | {label:<14} | {r['seconds']:>8.2f} | {r['rows_per_s']:>10,.0f} | "
+                      f"{r['peak_mb']:>8.1f} | {r['file_mb']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
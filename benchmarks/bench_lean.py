@@ -0,0 +1,69 @@
+# benchmarks/bench_lean.py
+"""Page-load time, bytes transferred and browser RSS: default vs lean driver.
+
+    python -m benchmarks.bench_lean --posts 120 --runs 5
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.fixture_server import FixtureConfig, FixtureServer
+from scrapers.driver_pool import browser_rss_mb
+from scrapers.instagram_selenium import _build_driver
+
+_TRANSFERRED = (
+    "return performance.getEntriesByType('resource')"
+    ".reduce((n, e) => n + (e.transferSize || e.encodedBodySize || 0), 0);"
+)
+
+
+def _wait_loaded(driver, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if driver.execute_script("return document.readyState") == "complete":
+            return
+        time.sleep(0.02)
+
+
+def measure(lean: bool, url: str, runs: int) -> dict:
+    driver = _build_driver(headless=True, lean=lean)
+    loads, transferred = [], 0
+    try:
+        for _ in range(runs):
+            driver.get("about:blank")
+            t0 = time.perf_counter()
+            driver.get(url)
+            _wait_loaded(driver)
+            loads.append(time.perf_counter() - t0)
+            transferred = driver.execute_script(_TRANSFERRED) or 0
+        rss = browser_rss_mb(driver)
+    finally:
+        driver.quit()
+    return {
+        "mode": "lean" if lean else "default",
+        "load_ms_median": round(statistics.median(loads) * 1000, 1),
+        "load_ms_max": round(max(loads) * 1000, 1),
+        "transferred_kb": round(transferred / 1024, 1),
+        "rss_mb": round(rss, 1) if rss is not None else None,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--posts", type=int, default=120)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    # Whole grid in the first response: this measures one page load, not scrolling
+    with FixtureServer(FixtureConfig(posts=args.posts, page_size=None)) as srv:
+        url = f"{srv.base_url}/fixture_user/"
+        results = [measure(False, url, args.runs), measure(True, url, args.runs)]
+
+    cols = list(results[0])
+    print(" | ".join(f"{c:>15}" for c in cols))
+    for r in results:
+        print(" | ".join(f"{str(r[c]):>15}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
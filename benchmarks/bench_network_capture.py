@@ -0,0 +1,94 @@
+# benchmarks/bench_network_capture.py
+"""Network capture against a recorded GraphQL response served by the fixture server:
+checks which shortcodes the payload yields (carousel slides and other accounts' media
+must not become posts) and, with a browser, that `capture_network=True` merges the
+recorded metadata into the scraped rows. Exits non-zero on any mismatch.
+
+    python -m benchmarks.bench_network_capture
+    python -m benchmarks.bench_network_capture --no-browser
+"""
+import argparse
+import functools
+import json
+import time
+from urllib.request import urlopen
+
+from benchmarks.fixture_server import RECORDED_GRID, FixtureServer
+from scrapers import urls
+from scrapers.driver_pool import DriverPool
+from scrapers.instagram_selenium import InstagramScraperSelenium, _build_driver
+from scrapers.network_capture import extract_media, posted_by
+
+HANDLE = "recorded_demo"
+
+# What the rows must carry for the recorded posts (the grid shows the first three)
+EXPECTED = {
+    "Cq1RecA0001": {"type": "post", "likes": 120, "comments": 4, "media_type": "image",
+                    "caption": "First recorded post", "posted_at": "2023-11-14T22:13:20+00:00"},
+    "Cq1RecA0002": {"type": "reel", "likes": 310, "comments": 12, "views": 5400, "media_type": "reel",
+                    "caption": "A recorded reel"},
+    "Cq1RecA0003": {"type": "post", "likes": 87, "comments": 0, "media_type": "carousel",
+                    "caption": "Three slides"},
+    "Cq1RecA0004": {"type": "post", "likes": 42, "comments": 1, "media_type": "image"},
+}
+# Carousel slides of Cq1RecA0003 and a related profile's post
+NOT_POSTS = {"Cq1RecC0031", "Cq1RecC0032", "Cq1RecX0099"}
+
+
+def _mismatches(rows: dict) -> list:
+    problems = [f"missing {code}" for code in EXPECTED if code not in rows]
+    problems += [f"{code} is not a post of {HANDLE}" for code in NOT_POSTS & set(rows)]
+    for code, fields in EXPECTED.items():
+        for k, v in fields.items():
+            got = rows.get(code, {}).get(k)
+            if code in rows and got != v:
+                problems.append(f"{code}.{k}: expected {v!r}, got {got!r}")
+    return problems
+
+
+def check_payload(base_url: str) -> list:
+    """The recorded response as the browser would receive it, parsed without a browser."""
+    with urlopen(f"{base_url}/graphql/query/?username={HANDLE}") as resp:
+        media = extract_media(json.loads(resp.read()))
+    grid = {p.strip("/").split("/")[1] for p in RECORDED_GRID}
+    rows = {code: {"type": "reel" if m.get("media_type") == "reel" else "post", **m}
+            for code, m in media.items() if code in grid or posted_by(m, HANDLE)}
+    return _mismatches(rows)
+
+
+def check_scrape() -> list:
+    """A full `capture_network=True` scrape of the recorded profile."""
+    pool = DriverPool(factory=functools.partial(_build_driver, headless=True, capture_network=True), size=1)
+    try:
+        rows = InstagramScraperSelenium(pool=pool, capture_network=True).scrape_profile(HANDLE)
+    finally:
+        pool.close()
+    problems = _mismatches({r["shortcode"]: r for r in rows})
+    problems += [f"{r['shortcode']} row leaks the owner field" for r in rows if "owner" in r]
+    return problems
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--no-browser", action="store_true", help="only check the payload parsing")
+    args = ap.parse_args()
+
+    failed = False
+    with FixtureServer() as srv:
+        urls.set_base_url(srv.base_url)
+        checks = [("payload", check_payload, (srv.base_url,))]
+        if not args.no_browser:
+            checks.append(("scrape", check_scrape, ()))
+        for name, check, check_args in checks:
+            t0 = time.perf_counter()
+            problems = check(*check_args)
+            status = "ok" if not problems else "FAILED"
+            print(f"{name:>8} | {status:>6} | {time.perf_counter() - t0:.2f}s", flush=True)
+            for p in problems:
+                print(f"         - {p}", flush=True)
+            failed = failed or bool(problems)
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
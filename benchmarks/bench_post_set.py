@@ -0,0 +1,105 @@
+# benchmarks/bench_post_set.py
+"""Memory of a scraped URL set: the list-of-dicts path (URL set -> sorted -> `_url_to_row`
+dicts -> DataFrame) vs PostSet (shortcode buffers -> sort -> zero-copy DataFrame).
+
+    python -m benchmarks.bench_post_set --posts 10000 100000 500000
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+from scrapers.instagram_selenium import _url_to_row
+from scrapers.post_set import PostSet
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def make_batches(posts: int, seed: int = 7, batch: int = 24):
+    """Collector output lookalike: JSON batches as the in-page drain returns them, real-length
+    shortcodes, about a quarter reels, 5% repeats. Decoding them inside the timed section
+    gives each path freshly allocated URL strings, as the WebDriver client does."""
+    rnd = random.Random(seed)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-"
+    urls = []
+    for _ in range(posts):
+        code = "".join(rnd.choice(alphabet) for _ in range(11))
+        urls.append(f"https://www.instagram.com/{'reel' if rnd.random() < 0.25 else 'p'}/{code}/")
+    urls += urls[: posts // 20]
+    return [json.dumps(urls[i:i + batch]) for i in range(0, len(urls), batch)], len(set(urls))
+
+
+def _legacy(batches):
+    seen = set()
+    for batch in batches:
+        seen.update(json.loads(batch))
+    rows = [_url_to_row(u) for u in sorted(seen)]
+    return rows, (lambda: pd.DataFrame(rows))
+
+
+def _compact(batches):
+    posts = PostSet()
+    for batch in batches:
+        posts.update(json.loads(batch))
+    posts.sort()
+    return posts, posts.to_pandas
+
+
+def _arrow_bytes() -> int:
+    return pa.total_allocated_bytes() if pa is not None else 0
+
+
+def measure(name: str, build, batches, posts: int) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    arrow0 = _arrow_bytes()
+    t0 = time.perf_counter()
+    container, to_frame = build(batches)
+    collect_s = time.perf_counter() - t0
+    held = tracemalloc.get_traced_memory()[0] + _arrow_bytes() - arrow0
+    t0 = time.perf_counter()
+    df = to_frame()
+    frame_s = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = current + _arrow_bytes() - arrow0
+    assert len(df) == len(container)
+    del container, df
+    return {
+        "path": name,
+        "posts": posts,
+        "collect_s": round(collect_s, 3),
+        "container_mb": round(held / 2**20, 1),
+        "bytes/post": round(held / posts, 1),
+        "to_df_s": round(frame_s, 3),
+        "with_df_mb": round(total / 2**20, 1),
+        "peak_mb": round(peak / 2**20, 1),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--posts", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    args = ap.parse_args()
+
+    results = []
+    for n in args.posts:
+        batches, posts = make_batches(n)
+        results.append(measure("list-of-dicts", _legacy, batches, posts))
+        results.append(measure("PostSet", _compact, batches, posts))
+
+    cols = list(results[0])
+    print(" | ".join(f"{c:>13}" for c in cols))
+    for r in results:
+        print(" | ".join(f"{str(r[c]):>13}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
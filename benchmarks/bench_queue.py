@@ -0,0 +1,98 @@
+# benchmarks/bench_queue.py
+"""Several worker processes draining one SQLite work queue on this machine, with a fake
+scrape (a sleep, then rows) and workers that crash mid-task. Checks that every handle ends
+up done exactly once despite the crashes, and reports throughput and lease recoveries.
+
+    python -m benchmarks.bench_queue --handles 500 --workers 1 4 8 --crash-rate 0.05
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+from core.sinks import SqliteSink
+from core.work_queue import SqliteQueue
+from scrapers.worker import run_worker
+
+
+def _worker(db: str, out: str, lease: float, task_ms: float, crash_rate: float, seed: int) -> None:
+    sys.stdout = open(os.devnull, "w")  # keep the table readable
+    rnd = random.Random(seed)
+
+    def scrape(handle: str, flush):
+        for i in range(12):
+            time.sleep(task_ms / 12000)
+            if rnd.random() < crash_rate / 12:
+                os._exit(3)  # dies holding the lease, as a killed container would
+            yield {"type": "post", "shortcode": f"{handle}-{i}", "post_url": f"/p/{handle}-{i}/"}
+
+    queue = SqliteQueue(db, lease=lease, max_attempts=10)
+    with SqliteSink(out) as sink:
+        run_worker(queue, scrape, sink=sink, worker_id=f"bench:{os.getpid()}", exit_when_empty=True)
+
+
+def measure(handles: int, workers: int, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db, out = os.path.join(tmp, "queue.db"), os.path.join(tmp, "posts.db")
+        queue = SqliteQueue(db, lease=args.lease, max_attempts=10)
+        queue.put(f"user{i}" for i in range(handles))
+        ctx = mp.get_context("fork")
+        t0 = time.perf_counter()
+        procs, crashes, seed = [], 0, 0
+        # Keep `workers` processes alive until the queue drains, replacing the ones that crash
+        while True:
+            alive = [p for p in procs if p.is_alive()]
+            crashes += sum(1 for p in procs if not p.is_alive() and p.exitcode == 3)
+            stats = queue.stats()
+            if not stats["queued"] and not stats["running"]:
+                break
+            for _ in range(workers - len(alive)):
+                seed += 1
+                p = ctx.Process(target=_worker, args=(db, out, args.lease, args.task_ms, args.crash_rate, seed))
+                p.start()
+                alive.append(p)
+            procs = alive
+            time.sleep(0.05)
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - t0
+        stats = queue.stats()
+        expired = sum(1 for t in queue.tasks() if t["attempts"] > 1)
+        with closing(sqlite3.connect(out)) as con:
+            rows, covered = con.execute("SELECT COUNT(*), COUNT(DISTINCT handle) FROM posts").fetchone()
+    return {
+        "workers": workers,
+        "handles": handles,
+        "done": stats["done"],
+        "failed": stats["failed"],
+        "crashes": crashes,
+        "retried": expired,
+        "rows_ok": rows == handles * 12 and covered == handles,
+        "seconds": round(elapsed, 2),
+        "handles/s": round(handles / elapsed, 1),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--handles", type=int, default=500)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--task-ms", type=float, default=50.0, help="fake scrape duration per handle")
+    ap.add_argument("--crash-rate", type=float, default=0.05, help="chance a worker dies during a handle")
+    ap.add_argument("--lease", type=float, default=3.0, help="seconds before a dead worker's handle is requeued")
+    args = ap.parse_args()
+
+    results = [measure(args.handles, w, args) for w in args.workers]
+    cols = list(results[0])
+    print(" | ".join(f"{c:>10}" for c in cols))
+    for r in results:
+        print(" | ".join(f"{str(r[c]):>10}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
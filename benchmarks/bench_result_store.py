@@ -0,0 +1,107 @@
+# benchmarks/bench_result_store.py
+"""Browsing and exporting a large scrape history from the ResultStore: page queries
+(first page, deep page, filtered) and a CSV export streamed from a query, against the old
+path of one DataFrame holding everything and serialized in full.
+
+    python -m benchmarks.bench_result_store --posts 100000 1000000 --handles 200
+"""
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from core.exporters import df_to_csv_bytes, iter_csv_bytes
+from core.result_store import ResultStore
+
+COLUMNS = ["handle", "type", "shortcode", "post_url", "scraped_at"]
+
+
+def populate(store: ResultStore, posts: int, handles: int, seed: int = 7) -> float:
+    rnd = random.Random(seed)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-"
+    t0 = time.perf_counter()
+    for start in range(0, posts, 5000):
+        rows = []
+        for _ in range(start, min(posts, start + 5000)):
+            code = "".join(rnd.choice(alphabet) for _ in range(11))
+            kind = "reel" if rnd.random() < 0.25 else "post"
+            rows.append({"handle": f"user{rnd.randrange(handles)}", "type": kind, "shortcode": code,
+                         "post_url": f"https://www.instagram.com/{'reel' if kind == 'reel' else 'p'}/{code}/"})
+        store.write(rows)
+    return time.perf_counter() - t0
+
+
+def _timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _peak(fn):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def measure(posts: int, handles: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(os.path.join(tmp, "results.db"))
+        insert_s = populate(store, posts, handles)
+        handle = store.handles()[0]["handle"]
+        first_ms = _timed(lambda: store.query(limit=50, columns=COLUMNS)) * 1000
+        deep_ms = _timed(lambda: store.query(limit=50, offset=posts // 2, columns=COLUMNS)) * 1000
+        filtered_ms = _timed(lambda: (store.count(handle=handle, type="reel"),
+                                      store.query(limit=50, handle=handle, type="reel", columns=COLUMNS))) * 1000
+
+        def streamed():
+            return sum(len(part) for part in iter_csv_bytes(store.frames(columns=COLUMNS)))
+
+        def in_memory():
+            df = pd.DataFrame(store.query(limit=-1, columns=COLUMNS))
+            return len(df_to_csv_bytes(df))
+
+        stream_s, stream_peak, size = _peak(streamed)
+        full_s, full_peak, _ = _peak(in_memory)
+        store.close()
+    return {
+        "posts": posts,
+        "insert_s": round(insert_s, 2),
+        "page1_ms": round(first_ms, 2),
+        "deep_page_ms": round(deep_ms, 2),
+        "filtered_ms": round(filtered_ms, 2),
+        "csv_mb": round(size / 2**20, 1),
+        "stream_s": round(stream_s, 2),
+        "stream_peak_mb": round(stream_peak / 2**20, 1),
+        "full_df_s": round(full_s, 2),
+        "full_peak_mb": round(full_peak / 2**20, 1),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--posts", type=int, nargs="+", default=[100_000, 1_000_000])
+    ap.add_argument("--handles", type=int, default=200)
+    args = ap.parse_args()
+
+    results = [measure(n, args.handles) for n in args.posts]
+    cols = list(results[0])
+    print(" | ".join(f"{c:>14}" for c in cols))
+    for r in results:
+        print(" | ".join(f"{str(r[c]):>14}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
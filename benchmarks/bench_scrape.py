@@ -0,0 +1,98 @@
+# benchmarks/bench_scrape.py
+"""End-to-end profile scrapes against the fixture server: the library's
+`InstagramScraperSelenium.scrape_profile` and the app's background job (`run_scrape_job`),
+per grid size. Reports time to complete, WebDriver commands sent, peak browser RSS and posts per second.
+
+    python -m benchmarks.bench_scrape --sizes 100 1000 10000 --latency-ms 50 --cookie-banner
+"""
+import argparse
+import functools
+import time
+from typing import Tuple
+
+from benchmarks.bench_tabs import _RssSampler
+from benchmarks.fixture_server import FixtureConfig, FixtureServer
+from core import metrics
+from core.jobs import Job
+from scrapers import urls
+from scrapers.driver_pool import DriverPool
+from scrapers.instagram_selenium import InstagramScraperSelenium, _build_driver
+from scrapers.scroll import ScrollScheduler
+
+
+def _webdriver_calls() -> int:
+    return sum(r["count"] for r in metrics.REGISTRY.snapshot() if r["metric"] == "webdriver_call_seconds")
+
+
+def _run(target: str, handle: str, scheduler: ScrollScheduler, lean: bool,
+         long_scroll: bool) -> Tuple[int, float, float]:
+    pool = DriverPool(factory=functools.partial(_build_driver, headless=True, lean=lean), size=1)
+    scraper = InstagramScraperSelenium(pool=pool, scheduler=scheduler, lean=lean, long_scroll=long_scroll)
+    if target == "app":
+        import app  # deferred: importing runs the Streamlit script (bare mode, no UI)
+
+        scrape = functools.partial(app.run_scrape_job, Job(handle), handle, scraper)
+    else:
+        scrape = functools.partial(scraper.scrape_profile, handle)
+    try:
+        with pool.lease() as driver:  # launch outside the timed section, like a warm pool
+            pass
+        sampler = _RssSampler([driver])
+        sampler.start()
+        t0 = time.perf_counter()
+        try:
+            rows = scrape()
+        finally:
+            elapsed = time.perf_counter() - t0
+            peak = sampler.stop()
+    finally:
+        pool.close()
+    return len(rows), elapsed, peak
+
+
+def measure(target: str, posts: int, scheduler: ScrollScheduler, lean: bool, long_scroll: bool = False) -> dict:
+    calls = _webdriver_calls()
+    found, elapsed, peak = _run(target, f"fixture_{posts}", scheduler, lean, long_scroll)
+    return {
+        "target": target,
+        "posts": posts,
+        "found": found,
+        "seconds": round(elapsed, 2),
+        # includes the launch/lease commands, which are a constant handful
+        "webdriver_calls": _webdriver_calls() - calls,
+        "peak_rss_mb": round(peak, 1),
+        "posts/s": round(found / elapsed, 1) if elapsed else None,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    ap.add_argument("--targets", nargs="+", choices=["library", "app"], default=["library", "app"])
+    ap.add_argument("--page-size", type=int, default=12, help="posts per feed page")
+    ap.add_argument("--latency-ms", type=int, default=0, help="delay before each feed page")
+    ap.add_argument("--cookie-banner", action="store_true")
+    ap.add_argument("--lean", action="store_true")
+    ap.add_argument("--long-scroll", action="store_true", help="prune harvested tiles / recycle tabs (flat RSS)")
+    args = ap.parse_args()
+
+    # Tiny images keep the fixture from dominating RSS at 10k posts
+    config = FixtureConfig(image_px=64, video_kb=16, page_size=args.page_size,
+                           latency_ms=args.latency_ms, cookie_banner=args.cookie_banner)
+    scheduler = ScrollScheduler(min_pause=0.2, max_pause=2.0, first_wait=0.5, max_idle_rounds=3, jitter=0.0)
+    results = []
+    with FixtureServer(config) as srv:
+        urls.set_base_url(srv.base_url)
+        for posts in args.sizes:
+            for target in args.targets:
+                results.append(measure(target, posts, scheduler, args.lean, args.long_scroll))
+                print(f"[BENCH] {results[-1]}", flush=True)
+
+    cols = list(results[0])
+    print(" | ".join(f"{c:>15}" for c in cols))
+    for r in results:
+        print(" | ".join(f"{str(r[c]):>15}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
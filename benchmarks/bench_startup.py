@@ -0,0 +1,104 @@
+# benchmarks/bench_startup.py
+"""Streamlit app startup: cold start (fresh interpreter executing app.py, as `streamlit run`
+does on the first request) and rerun latency (the script re-executed in a warm process,
+as on every widget interaction). Pass `--ref` to measure an older app.py side by side.
+
+    python -m benchmarks.bench_startup --runs 5 --reruns 20 --ref HEAD~1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("selenium", "pandas", "pyarrow", "openpyxl")
+
+# Runs in a fresh interpreter; prints timings and which heavy modules the script pulled in
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import streamlit
+t1 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+t2 = time.perf_counter()
+at.run()
+t3 = time.perf_counter()
+reruns = []
+for _ in range(int(sys.argv[2])):
+    t = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - t)
+heavy = [m for m in sys.argv[3].split(",") if m in sys.modules]
+print(json.dumps({"streamlit_s": t1 - t0, "first_run_s": t3 - t2, "reruns": reruns, "heavy": heavy,
+                  "errors": [str(e.value) for e in at.exception]}))
+"""
+
+
+def _probe(script: str, reruns: int) -> Dict:
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", _PROBE, script, str(reruns), ",".join(HEAVY)],
+                         cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["total_s"] = time.perf_counter() - t0
+    return result
+
+
+def measure(label: str, script: str, runs: int, reruns: int) -> Dict:
+    samples = [_probe(script, reruns if i == 0 else 0) for i in range(runs)]
+    first = samples[0]
+    if first["errors"]:
+        print(f"[BENCH] {label}: script raised {first['errors']}", flush=True)
+    return {
+        "app": label,
+        "cold_start_s": round(statistics.median(s["total_s"] for s in samples), 3),
+        "first_run_s": round(statistics.median(s["first_run_s"] for s in samples), 3),
+        "rerun_ms": round(statistics.median(first["reruns"]) * 1000, 1) if first["reruns"] else None,
+        "heavy_imports": ",".join(first["heavy"]) or "-",
+    }
+
+
+def _checkout(ref: str) -> Optional[str]:
+    """Write `ref`'s app.py next to the real one so its imports resolve the same way."""
+    try:
+        source = subprocess.run(["git", "show", f"{ref}:app.py"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[BENCH] Could not read app.py at {ref}: {e}", flush=True)
+        return None
+    path = os.path.join(ROOT, f"_bench_app_{os.getpid()}.py")
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(source)
+    return path
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters per app (median reported)")
+    ap.add_argument("--reruns", type=int, default=20, help="warm reruns timed in the first interpreter")
+    ap.add_argument("--ref", help="git revision whose app.py to measure as well")
+    args = ap.parse_args()
+
+    results = []
+    old = _checkout(args.ref) if args.ref else None
+    try:
+        if old:
+            results.append(measure(args.ref, old, args.runs, args.reruns))
+        results.append(measure("working tree", os.path.join(ROOT, "app.py"), args.runs, args.reruns))
+    finally:
+        if old:
+            os.remove(old)
+
+    cols = list(results[0])
+    print(" | ".join(f"{c:>14}" for c in cols))
+    for r in results:
+        print(" | ".join(f"{str(r[c]):>14}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# benchmarks/bench_tabs.py
+"""Profiles per second and per GB of browser RSS: N browsers with one tab each vs one
+browser with N tabs, scrolling fixture profiles.
+
+    python -m benchmarks.bench_tabs --profiles 12 --parallel 3 --posts 120
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fixture_server import FixtureConfig, FixtureServer
+from scrapers import urls
+from scrapers.driver_pool import browser_rss_mb
+from scrapers.instagram_selenium import _build_driver
+from scrapers.scroll import ScrollScheduler
+from scrapers.tabs import DONE, URLS, TabScheduler
+
+
+class _RssSampler(threading.Thread):
+    """Peak summed RSS of the given drivers, sampled every `interval` seconds."""
+
+    def __init__(self, drivers, interval: float = 0.25):
+        super().__init__(daemon=True)
+        self.drivers, self.interval, self.peak = drivers, interval, 0.0
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.is_set():
+            self.peak = max(self.peak, sum(browser_rss_mb(d) or 0.0 for d in self.drivers))
+            self._halt.wait(self.interval)
+
+    def stop(self) -> float:
+        self._halt.set()
+        self.join()
+        return self.peak
+
+
+def _scrape(driver, handles, tabs: int, scheduler: ScrollScheduler) -> int:
+    posts = 0
+    for _, status, batch in TabScheduler(driver, tabs=tabs, scheduler=scheduler).run(handles):
+        if status == URLS:
+            posts += len(batch)
+        elif status != DONE:
+            print(f"[BENCH] unexpected status {status}", flush=True)
+    return posts
+
+
+def measure(mode: str, handles, parallel: int, scheduler: ScrollScheduler) -> dict:
+    browsers = parallel if mode == "browsers" else 1
+    drivers = [_build_driver(headless=True, lean=True) for _ in range(browsers)]
+    sampler = _RssSampler(drivers)
+    sampler.start()
+    t0 = time.perf_counter()
+    try:
+        if mode == "browsers":
+            shares = [handles[i::browsers] for i in range(browsers)]
+            with ThreadPoolExecutor(max_workers=browsers) as ex:
+                posts = sum(ex.map(lambda a: _scrape(a[0], a[1], 1, scheduler), zip(drivers, shares)))
+        else:
+            posts = _scrape(drivers[0], handles, parallel, scheduler)
+        elapsed = time.perf_counter() - t0
+    finally:
+        peak = sampler.stop()
+        for d in drivers:
+            d.quit()
+    profiles_per_s = len(handles) / elapsed
+    return {
+        "mode": f"{browsers}x{parallel if mode == 'tabs' else 1}",
+        "seconds": round(elapsed, 2),
+        "posts": posts,
+        "profiles/s": round(profiles_per_s, 3),
+        "peak_rss_mb": round(peak, 1),
+        "profiles/s/GB": round(profiles_per_s / (peak / 1024), 3) if peak else None,
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--profiles", type=int, default=12)
+    ap.add_argument("--parallel", type=int, default=3, help="browsers in one mode, tabs in the other")
+    ap.add_argument("--posts", type=int, default=120)
+    args = ap.parse_args()
+
+    scheduler = ScrollScheduler(min_pause=0.3, max_pause=2.0, first_wait=1.0, max_idle_rounds=2, jitter=0.0)
+    handles = [f"fixture_{i}" for i in range(args.profiles)]
+    with FixtureServer(FixtureConfig(posts=args.posts)) as srv:
+        urls.set_base_url(srv.base_url)
+        results = [measure(m, handles, args.parallel, scheduler) for m in ("browsers", "tabs")]
+
+    cols = list(results[0])
+    print(" | ".join(f"{c:>13}" for c in cols))
+    for r in results:
+        print(" | ".join(f"{str(r[c]):>13}" for c in cols))
+
+
+if __name__ == "__main__":
+    main()
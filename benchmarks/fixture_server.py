@@ -0,0 +1,363 @@
+# benchmarks/fixture_server.py
+"""Local stand-in for Instagram: profile grids with infinite scroll, post pages, a login
+flow, cookie banner, login wall, throttling notice and private/empty profiles, for offline
+tests and benchmarks.
+
+    python -m benchmarks.fixture_server --port 8765 --posts 60 --latency-ms 150 --cookie-banner
+
+Handles choose the page: `private_*`, `empty_*` and `throttled_*` show those notices,
+`wall_*` shows a login wall until the browser has logged in at /accounts/login/ (any
+credentials), `recorded_*` serves a grid backed by a recorded GraphQL response (see
+`recorded_payload`), and a trailing `_<n>` sets the post count (`fixture_5000`); anything
+else gets `FixtureConfig.posts` posts.
+Point the scraper at it with INSTAGRAM_BASE_URL or `scrapers.urls.set_base_url(srv.base_url)`.
+"""
+from typing import Dict, Optional
+import argparse
+import hashlib
+import json
+import os
+import re
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _shortcode(i: int) -> str:
+    """11 characters like the real ones; the post index is recoverable from the last six."""
+    return hashlib.md5(str(i).encode()).hexdigest()[:5] + f"{i:06x}"
+
+
+def _post_index(shortcode: str) -> Optional[int]:
+    if not re.fullmatch(r"[0-9a-f]{11}", shortcode):
+        return None
+    i = int(shortcode[5:], 16)
+    return i if _shortcode(i) == shortcode else None
+
+
+def _bmp(width: int, height: int, seed: int) -> bytes:
+    """Uncompressed 24-bit BMP so the browser really has to decode and hold pixels."""
+    row = (width * 3 + 3) & ~3
+    pixels = bytes((seed * 7 + x) % 256 for x in range(row)) * height
+    header = struct.pack("<2sIHHI", b"BM", 54 + len(pixels), 0, 0, 54)
+    info = struct.pack("<IiiHHIIiiII", 40, width, height, 1, 24, 0, len(pixels), 2835, 2835, 0, 0)
+    return header + info + pixels
+
+
+class FixtureConfig:
+    """`page_size` posts are in the HTML and each feed request returns the next batch after
+    `latency_ms`; `page_size=None` renders every post up front. Feed anchors get their href
+    `lazy_href_ms` after they are inserted, like a grid that fills tiles in lazily."""
+
+    def __init__(
+        self,
+        posts: int = 60,
+        image_px: int = 320,
+        video_kb: int = 256,
+        page_size: Optional[int] = 12,
+        latency_ms: int = 0,
+        page_latency_ms: int = 0,
+        lazy_href_ms: int = 50,
+        cookie_banner: bool = False,
+        login_wall: bool = False,
+    ):
+        self.posts = posts
+        self.image_px = image_px
+        self.video_kb = video_kb
+        self.page_size = page_size
+        self.latency_ms = latency_ms
+        self.page_latency_ms = page_latency_ms
+        self.lazy_href_ms = lazy_href_ms
+        self.cookie_banner = cookie_banner
+        self.login_wall = login_wall
+
+    def posts_for(self, handle: str) -> int:
+        m = re.search(r"_(\d+)$", handle)
+        return int(m.group(1)) if m else self.posts
+
+
+def post_fields(i: int) -> Dict:
+    """What the post page for post `i` advertises; enrichment benchmarks compare against this."""
+    kind = "reel" if i % 5 == 0 else "p"
+    return {
+        "shortcode": _shortcode(i),
+        "type": kind,
+        "caption": f"Fixture caption #{i}",
+        "posted_at": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T12:00:00.000Z",
+        "likes": 1000 + i * 7,
+        "comments": i % 97,
+        "media_type": "video" if kind == "reel" else ("carousel" if i % 3 == 0 else "image"),
+    }
+
+
+def _feed_item(i: int, handle: str) -> Dict:
+    """v1-API-shaped media item, so network capture can harvest the fixture feed too."""
+    f = post_fields(i)
+    return {
+        "code": f["shortcode"],
+        "user": {"username": handle},
+        "taken_at": 1704067200 + i * 3600,
+        "media_type": {"image": 1, "video": 2, "carousel": 8}[f["media_type"]],
+        "product_type": "clips" if f["type"] == "reel" else "feed",
+        "like_count": f["likes"],
+        "comment_count": f["comments"],
+        "caption": {"text": f["caption"]},
+    }
+
+
+RECORDED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recorded")
+
+# Posts of the recorded profile timeline that the grid shows; the last one is only in the payload
+RECORDED_GRID = ["/p/Cq1RecA0001/", "/reel/Cq1RecA0002/", "/p/Cq1RecA0003/"]
+
+
+def recorded_payload(handle: str, name: str = "profile_timeline") -> Dict:
+    """Recorded GraphQL response `recorded/<name>.json`, with its owner renamed to `handle`.
+    Besides the profile's posts it holds carousel slides and another account's media."""
+    with open(os.path.join(RECORDED_DIR, f"{name}.json"), encoding="utf-8") as f:
+        return json.loads(f.read().replace("__HANDLE__", handle))
+
+
+def _tile(i: int) -> str:
+    code = _shortcode(i)
+    kind = "reel" if i % 5 == 0 else "p"
+    media = f'<video src="/media/{code}.mp4" autoplay muted loop></video>' if kind == "reel" else ""
+    return f'<a href="/{kind}/{code}/"><img src="/media/{code}.jpg" width="300" height="300">{media}</a>'
+
+
+_PAGE_STYLE = (
+    "@font-face{font-family:F;src:url(/static/font.woff2)}body{font-family:F;margin:0}"
+    "main{display:grid;grid-template-columns:repeat(3,300px);gap:4px}"
+    "main a{display:block;width:300px;height:300px;background:#ddd;overflow:hidden}"
+    "#consent{position:fixed;inset:0;background:rgba(0,0,0,.6);display:flex;align-items:center;justify-content:center}"
+)
+
+# Loads the next feed page whenever the viewport nears the bottom, the way the real grid does
+_GRID_SCRIPT = """
+const cfg = %s, grid = document.querySelector('main');
+let next = cfg.rendered, loading = false;
+const nearBottom = () => window.innerHeight + window.scrollY >= document.body.scrollHeight - 900;
+async function more() {
+  if (loading || next >= cfg.total) return;
+  loading = true;
+  try {
+    const r = await fetch(`/api/v1/feed/user/${cfg.handle}/?max_id=${next}`);
+    const data = await r.json();
+    for (const it of data.items) {
+      const a = document.createElement('a');
+      a.innerHTML = `<img src="/media/${it.code}.jpg" width="300" height="300">`;
+      grid.appendChild(a);
+      const href = `/${it.product_type === 'clips' ? 'reel' : 'p'}/${it.code}/`;
+      setTimeout(() => a.setAttribute('href', href), cfg.lazyMs);
+    }
+    next = data.more_available ? data.next_max_id : cfg.total;
+  } finally {
+    loading = false;
+  }
+  if (nearBottom()) more();
+}
+window.addEventListener('scroll', () => { if (nearBottom()) more(); }, {passive: true});
+if (nearBottom()) more();
+"""
+
+# The recorded grid is static; its data arrives in one GraphQL response, as on first load
+_RECORDED_SCRIPT = "fetch('/graphql/query/?username=' + %s);"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FixtureServer"
+
+    def log_message(self, *args):  # keep benchmark output clean
+        pass
+
+    def _send(self, status: int, body: bytes, ctype: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _html(self, body: str, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, body.encode(), "text/html; charset=utf-8", headers)
+
+    def _cookies(self) -> Dict[str, str]:
+        out = {}
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            if "=" in part:
+                k, v = part.strip().split("=", 1)
+                out[k] = v
+        return out
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip("/") == "/accounts/login":
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            return self._send(302, b"", "text/plain", {
+                "Location": "/", "Set-Cookie": "sessionid=fixture-session; Path=/; Max-Age=86400",
+            })
+        return self._send(404, b"", "text/plain")
+
+    def do_GET(self):
+        cfg = self.server.config
+        url = urlparse(self.path)
+        path = url.path
+        if path.startswith("/media/") and path.endswith(".jpg"):
+            seed = int(hashlib.md5(path.encode()).hexdigest()[:6], 16)
+            return self._send(200, _bmp(cfg.image_px, cfg.image_px, seed), "image/bmp")
+        if path.startswith("/media/") and path.endswith(".mp4"):
+            return self._send(200, b"\0" * (cfg.video_kb * 1024), "video/mp4")
+        if path == "/static/font.woff2":
+            return self._send(200, b"\0" * 64 * 1024, "font/woff2")
+        if path == "/favicon.ico":
+            return self._send(404, b"", "text/plain")
+
+        parts = [p for p in path.split("/") if p]
+        if parts[:4] == ["api", "v1", "feed", "user"] and len(parts) == 5:
+            return self._feed(cfg, parts[4], int((parse_qs(url.query).get("max_id") or ["0"])[0]))
+        if parts == ["graphql", "query"]:
+            handle = (parse_qs(url.query).get("username") or ["recorded"])[0]
+            return self._send(200, json.dumps(recorded_payload(handle)).encode(), "application/json")
+        if cfg.page_latency_ms:
+            time.sleep(cfg.page_latency_ms / 1000)
+        if not parts:
+            return self._html("<!doctype html><html><head><title>fixture</title></head><body><main>home</main></body></html>")
+        if parts == ["accounts", "login"]:
+            return self._html(self._login_page())
+        if len(parts) == 2 and parts[0] in ("p", "reel"):
+            i = _post_index(parts[1])
+            if i is None:
+                return self._html("<html><body>Sorry, this page isn't available.</body></html>", status=404)
+            return self._html(self._post_page(i))
+        return self._html(self._profile_page(cfg, parts[0]))
+
+    def _feed(self, cfg: FixtureConfig, handle: str, start: int) -> None:
+        if cfg.latency_ms:
+            time.sleep(cfg.latency_ms / 1000)
+        total = cfg.posts_for(handle)
+        end = min(total, start + (cfg.page_size or total))
+        body = {
+            "items": [_feed_item(i, handle) for i in range(start, end)],
+            "next_max_id": end,
+            "more_available": end < total,
+        }
+        self._send(200, json.dumps(body).encode(), "application/json")
+
+    def _login_page(self) -> str:
+        return (
+            "<!doctype html><html><head><title>Login</title></head><body>"
+            '<form method="post" action="/accounts/login/">'
+            '<input name="username"><input name="password" type="password">'
+            '<button type="submit">Log in</button></form></body></html>'
+        )
+
+    def _page(self, body: str, script: str = "") -> str:
+        consent = ""
+        if self.server.config.cookie_banner and "consent" not in self._cookies():
+            consent = (
+                '<div id="consent" role="dialog"><div>'
+                "<button onclick=\"document.cookie='consent=1; path=/';"
+                "document.getElementById('consent').remove()\">Allow all cookies</button>"
+                "</div></div>"
+            )
+        return (
+            f"<!doctype html><html><head><title>fixture</title><style>{_PAGE_STYLE}</style></head>"
+            f"<body>{body}{consent}{f'<script>{script}</script>' if script else ''}</body></html>"
+        )
+
+    def _profile_page(self, cfg: FixtureConfig, handle: str) -> str:
+        logged_in = "sessionid" in self._cookies()
+        if (cfg.login_wall or handle.startswith("wall_")) and not logged_in:
+            return self._page('<div role="dialog"><h2>Log in to see more</h2>'
+                              '<input name="username"><input name="password" type="password"></div>')
+        if handle.startswith("throttled_"):
+            return self._page("<h2>Please wait a few minutes before you try again.</h2>")
+        if handle.startswith("private_"):
+            return self._page(f"<header>{handle}</header><h2>This account is private</h2>")
+        if handle.startswith("empty_"):
+            return self._page(f"<header>{handle}</header><h2>No posts yet</h2>")
+        if handle.startswith("recorded_"):
+            tiles = "".join(f'<a href="{path}"><img width="300" height="300"></a>' for path in RECORDED_GRID)
+            return self._page(f"<header>{handle}</header><main>{tiles}</main>", _RECORDED_SCRIPT % json.dumps(handle))
+        total = cfg.posts_for(handle)
+        rendered = total if cfg.page_size is None else min(total, cfg.page_size)
+        tiles = "".join(_tile(i) for i in range(rendered))
+        script = _GRID_SCRIPT % json.dumps(
+            {"handle": handle, "total": total, "rendered": rendered, "lazyMs": cfg.lazy_href_ms})
+        return self._page(f"<header>{handle}</header><main>{tiles}</main>", script)
+
+    def _post_page(self, i: int) -> str:
+        f = post_fields(i)
+        code = f["shortcode"]
+        desc = f'{f["likes"]:,} likes, {f["comments"]} comments - fixture on {f["posted_at"][:10]}: "{f["caption"]}"'
+        ld = {
+            "@context": "https://schema.org",
+            "@type": "VideoObject" if f["media_type"] == "video" else "ImageObject",
+            "uploadDate": f["posted_at"],
+            "caption": f["caption"],
+            "interactionStatistic": [
+                {"interactionType": "http://schema.org/LikeAction", "userInteractionCount": f["likes"]},
+                {"interactionType": "http://schema.org/CommentAction", "userInteractionCount": f["comments"]},
+            ],
+        }
+        video = f'<meta property="og:video" content="/media/{code}.mp4">' if f["media_type"] == "video" else ""
+        body = f'<video src="/media/{code}.mp4" muted></video>' if f["media_type"] == "video" else f'<img src="/media/{code}.jpg">'
+        if f["media_type"] == "carousel":
+            body += '<button aria-label="Next">&gt;</button>'
+        return (
+            "<!doctype html><html><head><title>fixture post</title>"
+            f'<meta property="og:description" content="{desc.replace(chr(34), "&quot;")}">{video}'
+            f'<script type="application/ld+json">{json.dumps(ld)}</script></head>'
+            f'<body><main><article>{body}<time datetime="{f["posted_at"]}">{f["posted_at"][:10]}</time>'
+            "</article></main></body></html>"
+        )
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """`with FixtureServer() as srv: driver.get(srv.base_url + "/someone/")`"""
+
+    daemon_threads = True
+
+    def __init__(self, config: Optional[FixtureConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.config = config or FixtureConfig()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Serve a local Instagram-like site.")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--posts", type=int, default=60, help="posts for handles without a _<n> suffix")
+    ap.add_argument("--page-size", type=int, default=12, help="posts per feed page (0 = render all up front)")
+    ap.add_argument("--latency-ms", type=int, default=0, help="delay before each feed page")
+    ap.add_argument("--page-latency-ms", type=int, default=0, help="delay before each HTML page")
+    ap.add_argument("--cookie-banner", action="store_true")
+    ap.add_argument("--login-wall", action="store_true", help="require login for every profile")
+    args = ap.parse_args()
+    config = FixtureConfig(
+        posts=args.posts, page_size=args.page_size or None, latency_ms=args.latency_ms,
+        page_latency_ms=args.page_latency_ms, cookie_banner=args.cookie_banner, login_wall=args.login_wall,
+    )
+    srv = FixtureServer(config, port=args.port)
+    print(f"Serving fixture at {srv.base_url}/<handle>/ (posts at /p/<shortcode>/)", flush=True)
+    srv.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,97 @@
+import warnings
+from typing import Iterable, Iterator, Optional, Set
+
 import pandas as pd
 from dateutil import parser
 
+DATE_COLUMNS = ["created_at", "date", "timestamp", "posted_at"]
+NUMERIC_COLUMNS = ["likes", "comments", "retweets", "replies", "views", "shares"]
+KEY_COLUMN = "shortcode"
+
 def _try_parse_dt(x):
     try:
         return parser.parse(str(x))
     except Exception:
         return x
 
-def clean_dataframe_basic(df: pd.DataFrame) -> pd.DataFrame:
-    if df is None or df.empty:
-        return df
-    # Trim string columns
+def _parse_dates(s: pd.Series) -> pd.Series:
+    """Vectorized parse; only cells pandas can't handle go through dateutil, once per distinct value."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    parsed = pd.Series(pd.NaT, index=s.index)
+    # Numbers keep the per-value dateutil behaviour (pandas would read them as epoch nanoseconds)
+    if not pd.api.types.is_numeric_dtype(s):
+        try:
+            with warnings.catch_warnings():
+                # format is inferred from the first value; cells in other formats come back NaT
+                warnings.simplefilter("ignore", UserWarning)
+                parsed = pd.to_datetime(s, errors="coerce", cache=True)
+        except (TypeError, ValueError):
+            pass  # e.g. mixed tz-aware / naive values: everything takes the per-value path
+    leftover = parsed.isna() & s.notna()
+    if not leftover.any():
+        return parsed
+    out = parsed.astype(object)
+    rest = s[leftover]
+    lookup = {v: _try_parse_dt(v) for v in pd.unique(rest)}
+    out[leftover] = rest.map(lookup)
+    return out
+
+def _clean_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # Shallow copy: replaced columns don't leak back into the caller's frame
+    df = df.copy(deep=False)
+    # Trim string columns (missing values stay missing)
     for c in df.columns:
         if pd.api.types.is_string_dtype(df[c]):
-            df[c] = df[c].astype(str).str.strip()
+            df[c] = df[c].str.strip()
     # Parse common datetime columns
-    for key in ["created_at", "date", "timestamp", "posted_at"]:
+    for key in DATE_COLUMNS:
         if key in df.columns:
-            df[key] = df[key].map(_try_parse_dt)
+            df[key] = _parse_dates(df[key])
     # Numeric coercions
-    for key in ["likes", "comments", "retweets", "replies", "views", "shares"]:
+    for key in NUMERIC_COLUMNS:
         if key in df.columns:
             df[key] = pd.to_numeric(df[key], errors='coerce')
-    # Deduplicate and sort by date if present
-    df = df.drop_duplicates()
-    for key in ["created_at", "date", "timestamp", "posted_at"]:
+    return df
+
+def _duplicate_mask(df: pd.DataFrame, key: Optional[str]) -> pd.Series:
+    """Rows repeating an earlier key (rows without a key are never dropped); full-row check otherwise."""
+    if key and key in df.columns:
+        return df.duplicated(subset=[key]) & df[key].notna()
+    return df.duplicated()
+
+def _sort_by_date(df: pd.DataFrame) -> pd.DataFrame:
+    for key in DATE_COLUMNS:
         if key in df.columns:
             try:
-                df = df.sort_values(by=key, ascending=True)
+                df = df.sort_values(by=key, ascending=True, kind="stable")
                 break
             except Exception:
                 pass
-    return df.reset_index(drop=True)
\ No newline at end of file
+    return df
+
+def clean_dataframe_basic(df: pd.DataFrame, key: Optional[str] = KEY_COLUMN) -> pd.DataFrame:
+    """Trim strings, parse dates, coerce counts, dedup on `key` (shortcode), sort by date."""
+    if df is None or df.empty:
+        return df
+    df = _clean_columns(df)
+    df = df[~_duplicate_mask(df, key)]
+    df = _sort_by_date(df)
+    return df.reset_index(drop=True)
+
+def clean_dataframe_chunks(chunks: Iterable[pd.DataFrame], key: Optional[str] = KEY_COLUMN) -> Iterator[pd.DataFrame]:
+    """Chunked variant for inputs too big for memory (e.g. `pd.read_csv(..., chunksize=...)`).
+
+    Dedup on `key` holds across chunks; rows are kept in input order (no global date sort).
+    """
+    seen: Set = set()
+    for chunk in chunks:
+        if chunk is None or chunk.empty:
+            continue
+        chunk = _clean_columns(chunk)
+        chunk = chunk[~_duplicate_mask(chunk, key)]
+        if key and key in chunk.columns:
+            keys = chunk[key]
+            chunk = chunk[~keys.isin(seen) | keys.isna()]
+            seen.update(chunk[key].dropna())
+        yield chunk.reset_index(drop=True)
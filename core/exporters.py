@@ -1,12 +1,174 @@
 import io
+import math
+import os
+import zlib
+from datetime import datetime
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
 import pandas as pd
 
-def df_to_csv_bytes(df: pd.DataFrame) -> bytes:
-    return df.to_csv(index=False).encode("utf-8")
+from core.sinks import DEFAULT_FIELDS
+
+Frames = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+
+CHUNK_ROWS = 50_000
+
+
+def _chunks(frames: Frames, chunksize: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """A DataFrame is sliced into `chunksize` views; any iterable of frames passes through."""
+    if isinstance(frames, pd.DataFrame):
+        for start in range(0, max(len(frames), 1), chunksize):
+            yield frames.iloc[start:start + chunksize]
+    else:
+        yield from frames
+
+
+def _gzip(parts: Iterable[bytes]) -> Iterator[bytes]:
+    """Stream-compress byte chunks into one gzip member."""
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for part in parts:
+        out = z.compress(part)
+        if out:
+            yield out
+    yield z.flush()
+
+
+# ----------------------------
+# Byte streams (CSV / JSONL)
+# ----------------------------
+
+def iter_csv_bytes(frames: Frames, chunksize: int = CHUNK_ROWS, compress: bool = False) -> Iterator[bytes]:
+    def parts():
+        header = True
+        for chunk in _chunks(frames, chunksize):
+            if header or len(chunk):
+                yield chunk.to_csv(index=False, header=header).encode("utf-8")
+            header = False
+    return _gzip(parts()) if compress else parts()
+
+
+def iter_jsonl_bytes(frames: Frames, chunksize: int = CHUNK_ROWS, compress: bool = False) -> Iterator[bytes]:
+    def parts():
+        for chunk in _chunks(frames, chunksize):
+            if len(chunk):
+                text = chunk.to_json(orient="records", lines=True, date_format="iso", force_ascii=False)
+                yield (text if text.endswith("\n") else text + "\n").encode("utf-8")
+    return _gzip(parts()) if compress else parts()
+
+
+def _write_stream(parts: Iterable[bytes], dest: Union[str, BinaryIO]) -> None:
+    if isinstance(dest, (str, os.PathLike)):
+        with open(dest, "wb") as fh:
+            for part in parts:
+                fh.write(part)
+    else:
+        for part in parts:
+            dest.write(part)
+
+
+# ----------------------------
+# Parquet / XLSX
+# ----------------------------
+
+# Arrow types for post fields whose first chunk holds only nulls (other such columns: string)
+_PARQUET_TYPES = {"likes": "int64", "comments": "int64", "views": "int64"}
+
+
+def _parquet_schema(pa, schema):
+    """`schema` with null-typed fields (all-None columns, e.g. likes or caption when the first
+    chunk has none) promoted to the field's declared type, so later chunks with values fit."""
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.type_for_alias(_PARQUET_TYPES.get(field.name, "string"))))
+    return schema
+
+
+def write_parquet(frames: Frames, dest: Union[str, BinaryIO], chunksize: int = CHUNK_ROWS,
+                  compression: str = "zstd") -> None:
+    """One row group per chunk. The first chunk fixes the schema (all-null columns promoted,
+    see `_parquet_schema`) and later chunks are cast to it; no chunks at all still writes a
+    valid, empty file with the default post fields."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow") from e
+
+    writer, schema = None, None
+    try:
+        for chunk in _chunks(frames, chunksize):
+            if writer is None:
+                schema = _parquet_schema(pa, pa.Table.from_pandas(chunk, preserve_index=False).schema)
+                writer = pq.ParquetWriter(dest, schema, compression=compression)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        if writer is None:
+            schema = _parquet_schema(pa, pa.schema([(f, pa.null()) for f in DEFAULT_FIELDS]))
+            writer = pq.ParquetWriter(dest, schema, compression=compression)
+            writer.write_table(schema.empty_table())
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _xlsx_cell(v):
+    if v is None or v is pd.NaT or (isinstance(v, float) and math.isnan(v)):
+        return None
+    if isinstance(v, pd.Timestamp):
+        v = v.to_pydatetime()
+    if isinstance(v, datetime) and v.tzinfo is not None:
+        return v.replace(tzinfo=None)  # Excel has no time zones
+    return v
+
+
+def write_xlsx(frames: Frames, dest: Union[str, BinaryIO], sheet_name: str = "data",
+               chunksize: int = CHUNK_ROWS) -> None:
+    """openpyxl write-only mode: rows go straight to the zip stream instead of a cell tree."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    header = False
+    for chunk in _chunks(frames, chunksize):
+        if not header:
+            ws.append([str(c) for c in chunk.columns])
+            header = True
+        for row in chunk.itertuples(index=False, name=None):
+            ws.append([_xlsx_cell(v) for v in row])
+    wb.save(dest)
+
+
+# ----------------------------
+# Entry points
+# ----------------------------
+
+def export(frames: Frames, dest: Union[str, BinaryIO], fmt: Optional[str] = None, chunksize: int = CHUNK_ROWS) -> None:
+    """Write `frames` chunk by chunk; `fmt` (csv, csv.gz, jsonl, jsonl.gz, parquet, xlsx) defaults to the file extension."""
+    if fmt is None:
+        name = str(dest).lower()
+        fmt = next((f for f in ("csv.gz", "jsonl.gz", "csv", "jsonl", "parquet", "xlsx") if name.endswith("." + f)), "csv")
+    if fmt in ("csv", "csv.gz"):
+        _write_stream(iter_csv_bytes(frames, chunksize, compress=fmt.endswith(".gz")), dest)
+    elif fmt in ("jsonl", "jsonl.gz"):
+        _write_stream(iter_jsonl_bytes(frames, chunksize, compress=fmt.endswith(".gz")), dest)
+    elif fmt == "parquet":
+        write_parquet(frames, dest, chunksize)
+    elif fmt == "xlsx":
+        write_xlsx(frames, dest, chunksize=chunksize)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def df_to_csv_bytes(df: pd.DataFrame, compress: bool = False) -> bytes:
+    return b"".join(iter_csv_bytes(df, compress=compress))
+
+
+def df_to_xlsx_bytes(df: pd.DataFrame, sheet_name: str = "data") -> bytes:
+    buf = io.BytesIO()
+    write_xlsx(df, buf, sheet_name=sheet_name)
+    return buf.getvalue()
+
 
-def df_to_xlsx_bytes(df: pd.DataFrame) -> bytes:
+def df_to_parquet_bytes(df: pd.DataFrame) -> bytes:
     buf = io.BytesIO()
-    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="data")
-    buf.seek(0)
-    return buf.read()
\ No newline at end of file
+    write_parquet(df, buf)
+    return buf.getvalue()
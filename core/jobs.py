@@ -0,0 +1,108 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core import metrics
+
+
+class Job:
+    """One background run; `progress` is a small dict the worker keeps updating."""
+
+    def __init__(self, key: str):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = "queued"  # queued | running | done | failed
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None  # whatever the runner returned (rows, a PostSet, ...)
+        self.error: Optional[str] = None
+        self.cached = False
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(self, **progress) -> None:
+        with self._lock:
+            self.progress.update(progress)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "id": self.id, "key": self.key, "status": self.status, "cached": self.cached,
+                "progress": dict(self.progress), "error": self.error,
+                "elapsed": (self.finished_at or time.time()) - self.created_at,
+            }
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+
+class JobManager:
+    """Runs `runner(job, key, **kwargs)` on a bounded worker pool, off the caller's thread.
+
+    Submitting a key that is already queued/running returns that job, and results are
+    cached per key for `ttl` seconds, so concurrent or repeated requests share one run.
+    Failed runs and empty results (a blocked or unloaded page looks the same as a profile
+    without posts) are not cached, so the next request tries again.
+    """
+
+    def __init__(self, runner: Callable[..., List[Dict]], workers: int = 1, ttl: float = 3600):
+        self._runner = runner
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="job")
+        self.ttl = ttl
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[str, Job] = {}
+        self._cache: Dict[str, Tuple[float, List[Dict]]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: str, refresh: bool = False, **kwargs) -> Job:
+        with self._lock:
+            self._prune()
+            active = self._active.get(key)
+            if active is not None:
+                return active
+            job = Job(key)
+            self._jobs[job.id] = job
+            hit = None if refresh else self._cache.get(key)
+            if hit is not None:
+                job.status, job.result, job.cached = "done", hit[1], True
+                job.finished_at = time.time()
+                job.progress["collected"] = len(hit[1])
+                metrics.incr("jobs_total", status="cached")
+                return job
+            self._active[key] = job
+        self._executor.submit(self._run, job, kwargs)
+        return job
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id) if job_id else None
+
+    def _run(self, job: Job, kwargs: Dict) -> None:
+        job.status = "running"
+        try:
+            result = self._runner(job, job.key, **kwargs)
+            if result:
+                with self._lock:
+                    self._cache[job.key] = (time.time(), result)
+            job.result, job.status = result, "done"
+        except Exception as e:
+            job.error, job.status = f"{type(e).__name__}: {e}", "failed"
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._active.pop(job.key, None)
+            metrics.incr("jobs_total", status=job.status)
+            metrics.log_event("job", key=job.key, status=job.status, error=job.error,
+                              seconds=round(job.finished_at - job.created_at, 3))
+            metrics.flush()
+
+    def _prune(self) -> None:
+        now = time.time()
+        self._cache = {k: v for k, v in self._cache.items() if now - v[0] < self.ttl}
+        self._jobs = {
+            i: j for i, j in self._jobs.items()
+            if not j.finished or now - (j.finished_at or now) < self.ttl
+        }
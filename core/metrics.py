@@ -0,0 +1,310 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+PREFIX = "scraper_"
+
+_HELP = {
+    "phase_seconds": "Wall time per scrape phase (driver_launch, login, profile_load, page_state, ...)",
+    "phase_errors_total": "Phases that ended with an exception",
+    "webdriver_call_seconds": "WebDriver commands sent, and their round-trip time, by command",
+    "webdriver_errors_total": "WebDriver commands that raised, by command",
+    "anchors_seen_total": "Post/reel URLs collected from profile grids",
+    "scrolls_total": "Grid scroll steps",
+    "idle_rounds_total": "Scroll steps after which the grid had not grown",
+    "profiles_total": "Profiles visited, by outcome",
+    "page_states_total": "Profile page classifications, by final state",
+    "logins_total": "Session setups, by how they were satisfied",
+    "driver_recycles_total": "Pooled browsers quit on checkin, by reason",
+    "enrich_fetches_total": "Post pages visited for enrichment, by result",
+    "jobs_total": "Background scrape jobs, by final status",
+    "queue_tasks_total": "Work-queue task transitions (claimed, done, retried, failed, released, expired, stale)",
+    "queue_tasks": "Work-queue tasks per status, as of the last stats() call",
+    "grid_tiles_pruned_total": "Harvested grid tiles replaced by spacers in long-scroll mode",
+    "long_scroll_recycles_total": "Tabs or browsers recycled mid-scroll, by reason and scope",
+    "account_cooldowns_total": "Accounts benched after a login wall or throttling, by reason",
+    "account_tokens": "Scrape budget left on an account right after it was handed out",
+    "account_wait_seconds": "Time a scrape waited for any account to have budget",
+    "renderer_heap_mb": "JS heap of the last measured renderer (CDP Performance.getMetrics)",
+    "renderer_dom_nodes": "DOM nodes of the last measured renderer",
+    "process_rss_mb": "Resident memory of this Python process",
+    "browser_rss_mb": "Resident memory of the last sampled browser process tree",
+    "browser_rss_peak_mb": "Largest browser process tree RSS sampled so far",
+}
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Registry:
+    """Thread-safe in-process counters, gauges and (count/sum/max) summaries."""
+
+    def __init__(self, prefix: str = PREFIX):
+        self.prefix = prefix
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._gauges: Dict[Tuple[str, Labels], float] = {}
+        self._summaries: Dict[Tuple[str, Labels], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1.0, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[(name, _labels(labels))] = value
+
+    def set_max(self, name: str, value: float, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._gauges[key] = max(self._gauges.get(key, value), value)
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            s = self._summaries.get(key)
+            if s is None:
+                self._summaries[key] = [1, value, value]
+            else:
+                s[0] += 1
+                s[1] += value
+                s[2] = max(s[2], value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Flat rows (metric, labels, kind, value / count, sum, max), e.g. for a table."""
+        with self._lock:
+            rows = [{"metric": n, "labels": dict(l), "kind": "counter", "value": v}
+                    for (n, l), v in self._counters.items()]
+            rows += [{"metric": n, "labels": dict(l), "kind": "gauge", "value": v}
+                     for (n, l), v in self._gauges.items()]
+            rows += [{"metric": n, "labels": dict(l), "kind": "summary", "count": int(s[0]), "sum": s[1], "max": s[2]}
+                     for (n, l), s in self._summaries.items()]
+        return sorted(rows, key=lambda r: (r["metric"], sorted(r["labels"].items())))
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        def fmt(name: str, labels: Labels, value: float) -> str:
+            inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            return f"{self.prefix}{name}{{{inner}}} {value:.6g}" if inner else f"{self.prefix}{name} {value:.6g}"
+
+        with self._lock:
+            families: Dict[str, Tuple[str, List[str]]] = {}
+            for (name, labels), v in self._counters.items():
+                families.setdefault(name, ("counter", []))[1].append(fmt(name, labels, v))
+            for (name, labels), v in self._gauges.items():
+                families.setdefault(name, ("gauge", []))[1].append(fmt(name, labels, v))
+            for (name, labels), (count, total, peak) in self._summaries.items():
+                lines = families.setdefault(name, ("summary", []))[1]
+                lines.append(fmt(name + "_count", labels, count))
+                lines.append(fmt(name + "_sum", labels, total))
+                families.setdefault(name + "_max", ("gauge", []))[1].append(fmt(name + "_max", labels, peak))
+
+        out = []
+        for name in sorted(families):
+            kind, lines = families[name]
+            if name in _HELP:
+                out.append(f"# HELP {self.prefix}{name} {_HELP[name]}")
+            out.append(f"# TYPE {self.prefix}{name} {kind}")
+            out.extend(sorted(lines))
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def incr(name: str, value: float = 1.0, **labels) -> None:
+    REGISTRY.incr(name, value, **labels)
+
+
+def gauge(name: str, value: float, **labels) -> None:
+    REGISTRY.set(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    REGISTRY.observe(name, value, **labels)
+
+
+# ----------------------------
+# Structured logs / spans
+# ----------------------------
+
+_log_lock = threading.Lock()
+_local = threading.local()
+
+
+def log_event(event: str, **fields) -> None:
+    """One JSON line per event when SCRAPER_LOG_JSON is set ("1" = stdout, otherwise a file path)."""
+    target = os.getenv("SCRAPER_LOG_JSON", "")
+    if target in ("", "0"):
+        return
+    line = json.dumps({"ts": round(time.time(), 3), "event": event, "thread": threading.current_thread().name,
+                       **fields}, default=str)
+    with _log_lock:
+        if target in ("1", "true", "stdout"):
+            print(line, flush=True)
+        else:
+            with open(target, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+
+
+@contextmanager
+def span(phase: str, log: bool = True, **fields) -> Iterator[Dict[str, Any]]:
+    """Time a phase into `phase_seconds{phase=...}`; `fields` (and anything the block adds
+    to the yielded dict) only go to the JSON log, so they never become label values."""
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    info: Dict[str, Any] = dict(fields)
+    parent = stack[-1] if stack else None
+    stack.append(phase)
+    status = "ok"
+    t0 = time.perf_counter()
+    try:
+        yield info
+    except GeneratorExit:
+        status = "closed"
+        raise
+    except BaseException as e:
+        status = "error"
+        info.setdefault("error", f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        seconds = time.perf_counter() - t0
+        stack.pop()
+        REGISTRY.observe("phase_seconds", seconds, phase=phase)
+        if status == "error":
+            REGISTRY.incr("phase_errors_total", phase=phase)
+        if log:
+            log_event("span", phase=phase, parent=parent, seconds=round(seconds, 4), status=status, **info)
+
+
+# ----------------------------
+# WebDriver / memory
+# ----------------------------
+
+def instrument_driver(driver):
+    """Count and time every WebDriver command this driver sends (wraps `driver.execute`)."""
+    if getattr(driver, "_metrics_instrumented", False):
+        return driver
+    execute = driver.execute
+
+    def timed_execute(command, params=None):
+        t0 = time.perf_counter()
+        try:
+            return execute(command, params)
+        except Exception:
+            REGISTRY.incr("webdriver_errors_total", command=command)
+            raise
+        finally:
+            REGISTRY.observe("webdriver_call_seconds", time.perf_counter() - t0, command=command)
+
+    driver.execute = timed_execute
+    driver._metrics_instrumented = True
+    return driver
+
+
+def _process_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def sample_memory(browser_mb: Optional[float] = None) -> None:
+    """Record this process's RSS and, when given, a browser tree RSS (see driver_pool.browser_rss_mb)."""
+    rss = _process_rss_mb()
+    if rss is not None:
+        REGISTRY.set("process_rss_mb", rss)
+    if browser_mb is not None:
+        REGISTRY.set("browser_rss_mb", browser_mb)
+        REGISTRY.set_max("browser_rss_peak_mb", browser_mb)
+
+
+# ----------------------------
+# Exposition
+# ----------------------------
+
+def write_prometheus(path: Optional[str] = None) -> Optional[str]:
+    """Atomically write the text format to `path` (default SCRAPER_METRICS_FILE), e.g. for
+    node_exporter's textfile collector. Returns the path written, if any."""
+    path = path or os.getenv("SCRAPER_METRICS_FILE")
+    if not path:
+        return None
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(REGISTRY.render_prometheus())
+    os.replace(tmp, path)
+    return path
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = REGISTRY.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def serve_prometheus(port: Optional[int] = None, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve GET /metrics on `port` (default SCRAPER_METRICS_PORT) from a daemon thread; idempotent."""
+    global _server
+    if port is None:
+        port = int(os.getenv("SCRAPER_METRICS_PORT", "0")) or None
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+            print(f"[METRICS] Serving http://{host}:{port}/metrics", flush=True)
+        return _server
+
+
+def flush() -> None:
+    """Write the metrics file if one is configured; cheap no-op otherwise."""
+    try:
+        write_prometheus()
+    except OSError as e:
+        print(f"[METRICS] Could not write metrics file: {e}", flush=True)
+
+
+atexit.register(flush)
@@ -0,0 +1,170 @@
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.sinks import DEFAULT_FIELDS, Sink
+
+# Stored per post on top of the sink fields: when it was last scraped and first seen (epoch seconds)
+FIELDS = DEFAULT_FIELDS + ["scraped_at", "first_seen"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    handle     TEXT NOT NULL,
+    shortcode  TEXT NOT NULL,
+    type       TEXT,
+    post_url   TEXT,
+    posted_at  TEXT,
+    likes      INTEGER,
+    comments   INTEGER,
+    views      INTEGER,
+    media_type TEXT,
+    caption    TEXT,
+    scraped_at REAL,
+    first_seen REAL,
+    PRIMARY KEY (handle, shortcode)
+);
+CREATE INDEX IF NOT EXISTS posts_by_shortcode ON posts (shortcode);
+CREATE INDEX IF NOT EXISTS posts_by_handle_time ON posts (handle, scraped_at, shortcode);
+CREATE INDEX IF NOT EXISTS posts_by_handle_type_time ON posts (handle, type, scraped_at, shortcode);
+CREATE INDEX IF NOT EXISTS posts_by_type_time ON posts (type, scraped_at, shortcode);
+CREATE INDEX IF NOT EXISTS posts_by_time ON posts (scraped_at, shortcode);
+"""
+
+# Sort keys callers may ask for; each is served by one of the indexes above (read backwards
+# for "newest", which is why its tie-break runs the same direction)
+ORDERS = {
+    "newest": "scraped_at DESC, shortcode DESC",
+    "oldest": "scraped_at, shortcode",
+    "shortcode": "shortcode",
+}
+
+
+class ResultStore(Sink):
+    """Every scraped post, one row per (handle, shortcode), in an indexed SQLite file.
+
+    Writes upsert through one connection (a re-scrape refreshes `scraped_at` and any
+    metadata it found, `first_seen` is kept). Reads open their own short-lived
+    connections, so views and exports can page through the history while a scrape is
+    still writing to it, without loading it into memory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        self.path = path or os.getenv("SCRAPER_RESULTS_DB", os.path.join(".scraper_data", "results.db"))
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._con = self._connect(check_same_thread=False)
+        self._migrate()
+        self._con.executescript(_SCHEMA)
+        cols = ", ".join(FIELDS)
+        updates = ", ".join(
+            f"{f} = COALESCE(excluded.{f}, {f})" for f in FIELDS if f not in ("handle", "shortcode", "first_seen"))
+        updates += ", first_seen = COALESCE(first_seen, excluded.first_seen)"
+        self._sql = (f"INSERT INTO posts ({cols}) VALUES ({', '.join('?' for _ in FIELDS)}) "
+                     f"ON CONFLICT (handle, shortcode) DO UPDATE SET {updates}")
+
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        con = sqlite3.connect(self.path, timeout=30, **kwargs)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def _migrate(self) -> None:
+        """A posts table written by core.sinks.SqliteSink lacks the time columns: add them."""
+        have = {r[1] for r in self._con.execute("PRAGMA table_info(posts)")}
+        if have:
+            for col in ("scraped_at", "first_seen"):
+                if col not in have:
+                    self._con.execute(f"ALTER TABLE posts ADD COLUMN {col} REAL")
+            self._con.commit()
+
+    def _write(self, rows: List[Dict]) -> None:
+        now = time.time()
+        params = [
+            tuple(now if f in ("scraped_at", "first_seen") else r.get(f) for f in FIELDS)
+            for r in rows if r.get("handle") and r.get("shortcode")
+        ]
+        self._con.executemany(self._sql, params)
+        self._con.commit()
+
+    def close(self) -> None:
+        self._con.close()
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+
+    @staticmethod
+    def _where(handle: Optional[str] = None, type: Optional[str] = None, shortcode: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None) -> Tuple[str, list]:
+        """WHERE clause for the filters that are set; `shortcode` matches as a (case-sensitive) prefix."""
+        clauses, params = [], []
+        if handle:
+            clauses.append("handle = ?"); params.append(handle)
+        if type:
+            clauses.append("type = ?"); params.append(type)
+        if shortcode:
+            # A range on the raw text: case-sensitive like shortcodes, and served by posts_by_shortcode
+            clauses.append("shortcode >= ?"); params.append(shortcode)
+            if ord(shortcode[-1]) < 0x10FFFF:
+                clauses.append("shortcode < ?"); params.append(shortcode[:-1] + chr(ord(shortcode[-1]) + 1))
+        if since is not None:
+            clauses.append("scraped_at >= ?"); params.append(since)
+        if until is not None:
+            clauses.append("scraped_at < ?"); params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _columns(columns: Optional[List[str]]) -> str:
+        columns = [c for c in (columns or FIELDS) if c in FIELDS] or FIELDS
+        # Times come back as ISO text (UTC), ready to show or export
+        return ", ".join(f"datetime({c}, 'unixepoch') AS {c}" if c in ("scraped_at", "first_seen") else c
+                         for c in columns)
+
+    def count(self, **filters) -> int:
+        where, params = self._where(**filters)
+        with closing(self._connect()) as con:
+            return con.execute(f"SELECT COUNT(*) FROM posts{where}", params).fetchone()[0]
+
+    def query(self, limit: int = 50, offset: int = 0, order: str = "newest",
+              columns: Optional[List[str]] = None, **filters) -> List[Dict]:
+        """One page of rows matching `filters` (handle, type, shortcode prefix, since, until)."""
+        where, params = self._where(**filters)
+        order_by = ORDERS.get(order, ORDERS["newest"])
+        # The offset is walked in the index alone; only the page's rows are read from the table
+        sql = (f"SELECT {self._columns(columns)} FROM posts WHERE rowid IN "
+               f"(SELECT rowid FROM posts{where} ORDER BY {order_by} LIMIT ? OFFSET ?) ORDER BY {order_by}")
+        with closing(self._connect()) as con:
+            con.row_factory = sqlite3.Row
+            return [dict(r) for r in con.execute(sql, (*params, limit, offset))]
+
+    def frames(self, chunksize: int = 50_000, order: str = "newest", columns: Optional[List[str]] = None,
+               **filters) -> Iterator:
+        """Everything matching `filters` as DataFrames of up to `chunksize` rows, read from a
+        cursor as they are consumed; pass straight to core.exporters for bounded-memory exports."""
+        import pandas as pd
+
+        where, params = self._where(**filters)
+        sql = f"SELECT {self._columns(columns)} FROM posts{where} ORDER BY {ORDERS.get(order, ORDERS['newest'])}"
+        with closing(self._connect()) as con:
+            cur = con.execute(sql, params)
+            names = [d[0] for d in cur.description]
+            empty = True
+            while True:
+                batch = cur.fetchmany(chunksize)
+                if not batch:
+                    break
+                empty = False
+                yield pd.DataFrame.from_records(batch, columns=names)
+            if empty:
+                yield pd.DataFrame(columns=names)  # so exports still get a header row
+
+    def handles(self) -> List[Dict]:
+        """Stored handles with their post count and last scrape time, most recent first."""
+        with closing(self._connect()) as con:
+            cur = con.execute(
+                "SELECT handle, COUNT(*), datetime(MAX(scraped_at), 'unixepoch') FROM posts "
+                "GROUP BY handle ORDER BY MAX(scraped_at) DESC"
+            )
+            return [{"handle": h, "posts": n, "last_scraped": t} for h, n, t in cur]
@@ -0,0 +1,107 @@
+import csv
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+# Column order for tabular sinks; keys outside this list are ignored by CSV/SQLite
+DEFAULT_FIELDS = [
+    "handle", "type", "shortcode", "post_url",
+    "posted_at", "likes", "comments", "views", "media_type", "caption",
+]
+
+
+class Sink:
+    """Incremental row writer: every `write()` call is flushed before it returns.
+
+    Sinks are thread-safe and usable as context managers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def write(self, rows: Iterable[Dict]) -> int:
+        rows = list(rows)
+        if rows:
+            with self._lock:
+                self._write(rows)
+        return len(rows)
+
+    def _write(self, rows: List[Dict]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonlSink(Sink):
+    def __init__(self, path: str):
+        super().__init__()
+        self._fh = open(path, "a", encoding="utf-8")
+
+    def _write(self, rows: List[Dict]) -> None:
+        self._fh.write("".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in rows))
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class CsvSink(Sink):
+    """Appends to a CSV file, writing the header only when the file is new/empty."""
+
+    def __init__(self, path: str, fields: Optional[List[str]] = None):
+        super().__init__()
+        self.fields = fields or DEFAULT_FIELDS
+        fresh = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._fh = open(path, "a", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._fh, fieldnames=self.fields, extrasaction="ignore")
+        if fresh:
+            self._writer.writeheader()
+
+    def _write(self, rows: List[Dict]) -> None:
+        self._writer.writerows(rows)
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class SqliteSink(Sink):
+    """Upserts rows into `table`, keyed by (handle, shortcode), committing per write."""
+
+    def __init__(self, path: str, table: str = "posts", fields: Optional[List[str]] = None):
+        super().__init__()
+        self.table = table
+        self.fields = fields or DEFAULT_FIELDS
+        self._con = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        cols = ", ".join(f'"{f}"' for f in self.fields)
+        self._con.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({cols}, PRIMARY KEY (handle, shortcode))')
+        self._con.commit()
+        placeholders = ", ".join("?" for _ in self.fields)
+        self._sql = f'INSERT OR REPLACE INTO "{table}" ({cols}) VALUES ({placeholders})'
+
+    def _write(self, rows: List[Dict]) -> None:
+        self._con.executemany(self._sql, [tuple(r.get(f) for f in self.fields) for r in rows])
+        self._con.commit()
+
+    def close(self) -> None:
+        self._con.close()
+
+
+def open_sink(path: str) -> Sink:
+    """Pick a sink from the file extension: .csv, .db/.sqlite/.sqlite3, else JSONL."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return CsvSink(path)
+    if ext in (".db", ".sqlite", ".sqlite3"):
+        return SqliteSink(path)
+    return JsonlSink(path)
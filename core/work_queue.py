@@ -0,0 +1,248 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Callable, Dict, Iterable, List, Optional
+
+from core import metrics
+
+# Task states. A running task whose lease runs out goes back to queued (or to failed
+# once it has used up its attempts), so work held by a crashed worker is not lost.
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Task:
+    """One claimed handle. `token` identifies this claim: heartbeats and results from a
+    worker whose lease has since expired (and been re-claimed) are ignored."""
+
+    def __init__(self, id: int, handle: str, attempts: int, token: str, lease_until: float):
+        self.id = id
+        self.handle = handle
+        self.attempts = attempts
+        self.token = token
+        self.lease_until = lease_until
+
+    def __repr__(self) -> str:
+        return f"Task({self.handle!r}, attempt {self.attempts})"
+
+
+class WorkQueue:
+    """Durable, lease-based queue of handles shared by workers on any number of nodes.
+
+    `claim` hands a queued handle to one worker for `lease` seconds; the worker keeps it
+    with `heartbeat` and ends it with `complete`, `fail` or `release`. Leases that run
+    out are requeued by the next `claim`. Backends implement the underscore methods.
+    """
+
+    def __init__(self, lease: float = 300.0, max_attempts: int = 3, clock: Callable[[], float] = time.time):
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.clock = clock  # wall clock: leases are compared across processes and hosts
+
+    def put(self, handles: Iterable[str]) -> int:
+        """Enqueue handles; ones already queued or running are left alone, finished ones
+        are queued again. Returns how many were (re)queued."""
+        return self._put(list(dict.fromkeys(h for h in handles if h)))
+
+    def claim(self, worker: str) -> Optional[Task]:
+        """Lease the oldest queued handle to `worker`; None when nothing is queued."""
+        task = self._claim(worker, uuid.uuid4().hex)
+        if task:
+            metrics.incr("queue_tasks_total", outcome="claimed")
+        return task
+
+    def heartbeat(self, task: Task) -> bool:
+        """Extend the lease; False if it was lost (expired and requeued), so stop working on it."""
+        ok = self._finish(task, RUNNING, lease_until=self.clock() + self.lease)
+        if ok:
+            task.lease_until = self.clock() + self.lease
+        return ok
+
+    def complete(self, task: Task, result: Optional[Dict] = None) -> bool:
+        ok = self._finish(task, DONE, result=result)
+        metrics.incr("queue_tasks_total", outcome="done" if ok else "stale")
+        return ok
+
+    def fail(self, task: Task, error: str) -> bool:
+        """Record an error; the handle is retried until it has had `max_attempts` claims."""
+        status = FAILED if task.attempts >= self.max_attempts else QUEUED
+        ok = self._finish(task, status, error=error)
+        metrics.incr("queue_tasks_total", outcome=("failed" if status == FAILED else "retried") if ok else "stale")
+        return ok
+
+    def release(self, task: Task) -> bool:
+        """Hand the task back unfinished (worker shutting down) without using up an attempt."""
+        ok = self._finish(task, QUEUED, attempts=task.attempts - 1)
+        metrics.incr("queue_tasks_total", outcome="released" if ok else "stale")
+        return ok
+
+    def stats(self) -> Dict[str, int]:
+        """Tasks per state."""
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update(self._stats())
+        for state, n in counts.items():
+            metrics.gauge("queue_tasks", n, status=state)
+        return counts
+
+    def tasks(self, status: Optional[str] = None) -> List[Dict]:
+        raise NotImplementedError
+
+    def _put(self, handles: List[str]) -> int:
+        raise NotImplementedError
+
+    def _claim(self, worker: str, token: str) -> Optional[Task]:
+        raise NotImplementedError
+
+    def _finish(self, task: Task, status: str, **fields) -> bool:
+        """Move `task` to `status` if `task.token` still holds the lease."""
+        raise NotImplementedError
+
+    def _stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id          INTEGER PRIMARY KEY,
+    handle      TEXT NOT NULL UNIQUE,
+    status      TEXT NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    worker      TEXT,
+    token       TEXT,
+    lease_until REAL,
+    enqueued_at REAL NOT NULL,
+    started_at  REAL,
+    finished_at REAL,
+    result      TEXT,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, id);
+CREATE INDEX IF NOT EXISTS tasks_by_lease ON tasks (status, lease_until);
+"""
+
+
+class SqliteQueue(WorkQueue):
+    """WorkQueue in one SQLite file (WAL mode). Every worker process on a host, or on
+    hosts sharing a volume with working file locks, may open the same file; claims
+    run in `BEGIN IMMEDIATE` transactions, so a handle goes to exactly one worker."""
+
+    def __init__(self, path: Optional[str] = None, **kwargs):
+        """`path` defaults to SCRAPER_QUEUE (a path or sqlite:// URL), else `.scraper_data/queue.db`."""
+        super().__init__(**kwargs)
+        if path is None and os.getenv("SCRAPER_QUEUE"):
+            scheme, sep, rest = os.environ["SCRAPER_QUEUE"].partition("://")
+            if sep and scheme != "sqlite":
+                raise ValueError(f"SCRAPER_QUEUE names a {scheme!r} queue, not a SQLite one")
+            path = _url_path(rest) if sep else scheme
+        self.path = path or os.path.join(".scraper_data", "queue.db")
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with closing(self._connect()) as con:
+            con.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; writes open their own BEGIN IMMEDIATE so the write lock is taken up front
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def _put(self, handles: List[str]) -> int:
+        now = self.clock()
+        with closing(self._connect()) as con:
+            con.execute("BEGIN IMMEDIATE")
+            before = con.total_changes
+            con.executemany(
+                "INSERT INTO tasks (handle, status, enqueued_at) VALUES (?, 'queued', ?) "
+                "ON CONFLICT (handle) DO UPDATE SET status = 'queued', attempts = 0, token = NULL, "
+                "enqueued_at = excluded.enqueued_at, error = NULL WHERE status IN ('done', 'failed')",
+                [(h, now) for h in handles],
+            )
+            con.execute("COMMIT")
+            return con.total_changes - before
+
+    def _claim(self, worker: str, token: str) -> Optional[Task]:
+        now = self.clock()
+        with closing(self._connect()) as con:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                # Leases that ran out belong to crashed or stuck workers: back in line, or failed
+                expired = con.execute(
+                    "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                    "token = NULL, error = 'lease expired on ' || worker, finished_at = ? "
+                    "WHERE status = 'running' AND lease_until < ?",
+                    (self.max_attempts, now, now),
+                ).rowcount
+                row = con.execute(
+                    "SELECT id, handle, attempts FROM tasks WHERE status = 'queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row:
+                    con.execute(
+                        "UPDATE tasks SET status = 'running', attempts = attempts + 1, worker = ?, token = ?, "
+                        "lease_until = ?, started_at = ?, finished_at = NULL WHERE id = ?",
+                        (worker, token, now + self.lease, now, row[0]),
+                    )
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+        if expired:
+            print(f"[QUEUE] Requeued {expired} task(s) with expired leases", flush=True)
+            metrics.incr("queue_tasks_total", expired, outcome="expired")
+        if not row:
+            return None
+        return Task(row[0], row[1], row[2] + 1, token, now + self.lease)
+
+    def _finish(self, task: Task, status: str, **fields) -> bool:
+        sets = {"status": status}
+        if status != RUNNING:
+            sets.update(token=None, lease_until=None, finished_at=self.clock())
+        if "result" in fields:
+            sets["result"] = json.dumps(fields.pop("result"), default=str)
+        sets.update(fields)
+        assignments = ", ".join(f"{k} = ?" for k in sets)
+        with closing(self._connect()) as con:
+            cur = con.execute(
+                f"UPDATE tasks SET {assignments} WHERE id = ? AND token = ? AND status = 'running'",
+                (*sets.values(), task.id, task.token),
+            )
+            return cur.rowcount == 1
+
+    def _stats(self) -> Dict[str, int]:
+        with closing(self._connect()) as con:
+            return dict(con.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"))
+
+    def tasks(self, status: Optional[str] = None) -> List[Dict]:
+        """Task rows (handle, status, attempts, worker, times, result, error), oldest first."""
+        sql = ("SELECT handle, status, attempts, worker, lease_until, enqueued_at, started_at, finished_at, "
+               "result, error FROM tasks")
+        with closing(self._connect()) as con:
+            con.row_factory = sqlite3.Row
+            cur = con.execute(sql + " WHERE status = ? ORDER BY id" if status else sql + " ORDER BY id",
+                              (status,) if status else ())
+            rows = [dict(r) for r in cur]
+        for r in rows:
+            r["result"] = json.loads(r["result"]) if r["result"] else None
+        return rows
+
+
+def _url_path(rest: str) -> str:
+    # sqlite:///relative.db and sqlite:////abs/path.db, as in SQLAlchemy URLs
+    return rest[1:] if rest.startswith("/") else rest
+
+
+# Backends by URL scheme; register others (e.g. a Redis or Postgres WorkQueue) here
+BACKENDS: Dict[str, Callable[..., WorkQueue]] = {"sqlite": SqliteQueue}
+
+
+def open_queue(url: Optional[str] = None, **kwargs) -> WorkQueue:
+    """Queue from a URL such as `sqlite:///data/queue.db` or a plain file path (SQLite);
+    default SCRAPER_QUEUE, else `.scraper_data/queue.db`."""
+    url = url or os.getenv("SCRAPER_QUEUE", "")
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        return SqliteQueue(url or None, **kwargs)
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unsupported queue backend {scheme!r} (known: {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[scheme](_url_path(rest), **kwargs)
@@ -0,0 +1,213 @@
+# scrapers/accounts.py
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+from core import metrics
+
+# Scrape outcomes reported back to the pool; anything but OK puts the account on cooldown
+OK, LOGIN_WALL, THROTTLED = "ok", "login_required", "throttled"
+
+
+# Not an account outcome: the scraper itself gave up on the grid (e.g. out of browser recycles)
+INCOMPLETE = "incomplete"
+
+
+class Blocked(Exception):
+    """A profile scrape was stopped before the end of its grid; `reason` is LOGIN_WALL,
+    THROTTLED or INCOMPLETE. Rows delivered before it are valid, but the profile is not
+    complete."""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__({LOGIN_WALL: "login wall", THROTTLED: "throttling",
+                          INCOMPLETE: "grid not scrolled to the end"}.get(reason, reason))
+
+
+class TokenBucket:
+    """`per_minute` tokens per minute, holding at most `burst`. Not locked: AccountPool
+    guards its buckets. Time comes from `clock`, so tests can drive it."""
+
+    def __init__(self, per_minute: float, burst: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.burst = max(1.0, burst)
+        self.clock = clock
+        self._tokens = self.burst
+        self._at = clock()
+
+    def tokens(self) -> float:
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._at) * self.rate)
+        self._at = now
+        return self._tokens
+
+    def take(self) -> bool:
+        if self.tokens() < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0.0 if one is now)."""
+        missing = 1.0 - self.tokens()
+        return max(0.0, missing / self.rate) if self.rate else float("inf")
+
+    def drain(self) -> None:
+        self.tokens()
+        self._tokens = 0.0
+
+
+class Account:
+    """One login with its own budget and cooldown state."""
+
+    def __init__(self, username: str, password: str, bucket: TokenBucket):
+        self.username = username
+        self.password = password
+        self.bucket = bucket
+        self.cooldown_until = 0.0
+        self.strikes = 0  # consecutive blocked scrapes; each doubles the next cooldown
+        self.scrapes = 0
+        self.last_used = float("-inf")
+
+    def __repr__(self) -> str:
+        return f"Account({self.username!r})"
+
+
+class AccountPool:
+    """Rotates scrapes across several Instagram logins.
+
+    Every account has a token bucket (`per_minute` profile visits, up to `burst` at once).
+    `acquire` hands out the account with the most tokens left, skipping accounts on
+    cooldown, and waits when none has a token. Reporting LOGIN_WALL or THROTTLED for an
+    account empties its bucket and benches it for `cooldown` seconds, doubling with each
+    consecutive block up to `max_cooldown`; an OK report clears the strikes.
+    """
+
+    def __init__(
+        self,
+        accounts: Iterable[Tuple[str, str]],
+        per_minute: float = 2.0,
+        burst: float = 3.0,
+        cooldown: float = 900.0,
+        max_cooldown: float = 6 * 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.accounts = [Account(u, p, TokenBucket(per_minute, burst, clock)) for u, p in accounts]
+        if not self.accounts:
+            raise ValueError("AccountPool needs at least one account")
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, path: Optional[str] = None, **overrides) -> Optional["AccountPool"]:
+        """Accounts from INSTAGRAM_ACCOUNTS ("user:pass,user2:pass2") and `path` or
+        SCRAPER_ACCOUNTS_FILE (one user:pass per line, or a JSON list of {"username",
+        "password"}), else the single INSTAGRAM_USERNAME / INSTAGRAM_PASSWORD pair; None
+        when no credentials are set. Budget and cooldown from SCRAPER_ACCOUNT_RATE /
+        SCRAPER_ACCOUNT_BURST / SCRAPER_ACCOUNT_COOLDOWN."""
+        pairs = parse_accounts(os.getenv("INSTAGRAM_ACCOUNTS", ""))
+        path = path or os.getenv("SCRAPER_ACCOUNTS_FILE")
+        if path:
+            pairs += load_accounts(path)
+        if not pairs and os.getenv("INSTAGRAM_USERNAME") and os.getenv("INSTAGRAM_PASSWORD"):
+            pairs = [(os.environ["INSTAGRAM_USERNAME"], os.environ["INSTAGRAM_PASSWORD"])]
+        if not pairs:
+            return None
+        kwargs = {}
+        for name, key in (("per_minute", "SCRAPER_ACCOUNT_RATE"), ("burst", "SCRAPER_ACCOUNT_BURST"),
+                          ("cooldown", "SCRAPER_ACCOUNT_COOLDOWN")):
+            if os.getenv(key):
+                kwargs[name] = float(os.environ[key])
+        kwargs.update(overrides)
+        return cls(pairs, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def acquire(self, timeout: Optional[float] = None) -> Account:
+        """Take a token from the ready account with the most budget left, waiting for one
+        if needed. Raises TimeoutError if that would take longer than `timeout` seconds."""
+        deadline = None if timeout is None else self._clock() + timeout
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                ready = [a for a in self.accounts if a.cooldown_until <= now]
+                # Most tokens first; on a tie the account that has rested longest
+                best = max(ready, key=lambda a: (a.bucket.tokens(), -a.last_used), default=None)
+                if best is not None and best.bucket.take():
+                    best.last_used = now
+                    metrics.gauge("account_tokens", best.bucket.tokens(), account=best.username)
+                    if waited:
+                        metrics.observe("account_wait_seconds", waited)
+                    return best
+                # Buckets refill during a cooldown: an account is next usable at the later of the two
+                wait = min(max(a.cooldown_until - now, a.bucket.wait_time()) for a in self.accounts)
+                # At least 1 ms: float rounding can otherwise leave it a hair short forever
+                wait = max(wait, 0.001)
+            if deadline is not None and now + wait > deadline:
+                raise TimeoutError(f"no account available within {timeout:.0f}s")
+            self._sleep(wait)
+            waited += wait
+
+    def report(self, account: Account, outcome: str) -> None:
+        """Record how a scrape on `account` went: OK, LOGIN_WALL or THROTTLED."""
+        with self._lock:
+            if outcome == OK:
+                account.strikes = 0
+                account.scrapes += 1
+                return
+            seconds = min(self.cooldown * 2 ** account.strikes, self.max_cooldown)
+            account.strikes += 1
+            account.cooldown_until = self._clock() + seconds
+            account.bucket.drain()
+        print(f"[ACCOUNTS] {account.username}: {outcome}; cooling down for {seconds:.0f}s", flush=True)
+        metrics.incr("account_cooldowns_total", reason=outcome)
+
+    def available(self) -> int:
+        """Accounts not on cooldown right now."""
+        with self._lock:
+            now = self._clock()
+            return sum(a.cooldown_until <= now for a in self.accounts)
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            now = self._clock()
+            return [{
+                "account": a.username,
+                "tokens": round(a.bucket.tokens(), 2),
+                "cooldown_s": round(max(a.cooldown_until - now, 0.0), 1),
+                "strikes": a.strikes,
+                "scrapes": a.scrapes,
+            } for a in self.accounts]
+
+
+def _pairs(items: Iterable[str]) -> List[Tuple[str, str]]:
+    pairs = []
+    for item in items:
+        user, sep, pwd = item.strip().partition(":")
+        if sep and user and pwd:
+            pairs.append((user, pwd))
+    return pairs
+
+
+def parse_accounts(text: str) -> List[Tuple[str, str]]:
+    """"user:pass" items separated by commas or newlines, as in INSTAGRAM_ACCOUNTS
+    (passwords may contain ':' but not ','; use an accounts file for those)."""
+    return _pairs(text.replace("\n", ",").split(","))
+
+
+def load_accounts(path: str) -> List[Tuple[str, str]]:
+    """One user:pass per line (the password is the rest of the line, commas included),
+    or a JSON list of {"username", "password"}."""
+    with open(path, encoding="utf-8") as fh:
+        text = fh.read()
+    if text.lstrip().startswith("["):
+        return [(a["username"], a["password"]) for a in json.loads(text)]
+    return _pairs(text.splitlines())
@@ -0,0 +1,301 @@
+# scrapers/batch.py
+"""Scrape many profiles in parallel.
+
+    python -m scrapers.batch handles.txt --workers 4 --rate 20 --out posts.jsonl --resume
+"""
+from typing import Callable, Dict, Iterable, List, Optional
+import argparse
+import functools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core import metrics
+from core.sinks import open_sink
+from scrapers.accounts import AccountPool, Blocked
+from scrapers.checkpoint import CheckpointStore
+from scrapers.driver_pool import DriverPool
+from scrapers.enrich import Enricher
+from scrapers.instagram_selenium import InstagramScraperSelenium, _new_session_driver, _normalize_instagram_input
+from scrapers.known_index import KnownIndex
+from scrapers.rate_limit import RateLimiter
+
+# Rows are enriched (post pages visited) in groups of up to this size before they are
+# written; with --resume, they are marked delivered only once written
+ENRICH_BATCH = 24
+
+
+def read_handles(path: str) -> List[str]:
+    """One handle/URL per line (commas also split); blank lines and #comments are ignored."""
+    handles = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.split("#", 1)[0]
+            handles.extend(h.strip() for h in line.split(",") if h.strip())
+    return handles
+
+
+def scrape_batch(
+    handles: Iterable[str],
+    workers: Optional[int] = None,
+    per_minute: Optional[float] = None,
+    out_path: Optional[str] = None,
+    on_result: Optional[Callable[[Dict], None]] = None,
+    capture_network: bool = False,
+    lean: bool = False,
+    incremental: bool = False,
+    resume: bool = False,
+    enrich_workers: int = 0,
+    tabs: int = 1,
+    long_scroll: Optional[bool] = None,
+    accounts: Optional[AccountPool] = None,
+) -> List[Dict]:
+    """Scrape `handles` on up to `workers` browsers at once.
+
+    Each worker thread leases its own driver from a pool sized to `workers`, and
+    profile visits are paced to `per_minute` across all workers (the account's limit).
+    Post rows stream into `out_path` (.jsonl, .csv or .db/.sqlite) as they are found;
+    with `incremental`, only posts not seen in earlier runs are scraped and written, and
+    with `resume`, profiles interrupted in an earlier run skip rows already written.
+    With `enrich_workers`, each post page is also visited (on its own pool of that many
+    browsers) to fill in caption, timestamp, media type and counts before rows are written.
+    With `tabs` > 1, each browser scrolls that many profiles at once in separate tabs
+    (known posts are skipped but do not stop scrolling early). `long_scroll` bounds
+    browser memory on very long grids (scrapers.long_scroll; not used with tabs).
+    With `accounts` (default: INSTAGRAM_ACCOUNTS / SCRAPER_ACCOUNTS_FILE when set), each
+    profile goes to the login with the most budget left, on that login's own browser
+    pool, and `per_minute` caps all accounts together.
+    Returns one status dict per handle: handle, status, posts, seconds, error.
+    """
+    handles = list(dict.fromkeys(_normalize_instagram_input(h) or h for h in handles))
+    # With tabs, each browser takes several profiles at once, so fewer browsers are needed
+    workers = max(1, min(workers or os.cpu_count() or 1, -(-len(handles) // max(1, tabs)) or 1))
+    if accounts is None and (os.getenv("INSTAGRAM_ACCOUNTS") or os.getenv("SCRAPER_ACCOUNTS_FILE")):
+        accounts = AccountPool.from_env()
+    # Several accounts: the scraper opens a pool per login, each big enough for every worker
+    # (any of them may pick the same account), and closes them with close()
+    factory = functools.partial(_new_session_driver, capture_network=capture_network, lean=lean)
+    pool = DriverPool(factory=factory, size=workers) if accounts is None else None
+    scraper = InstagramScraperSelenium(pool=pool, capture_network=capture_network, lean=lean,
+                                       long_scroll=long_scroll, accounts=accounts,
+                                       account_pool_size=workers if accounts is not None else None)
+    limiter = RateLimiter(per_minute)
+    index = KnownIndex() if incremental else None
+    checkpoint = CheckpointStore() if resume else None
+    sink = open_sink(out_path) if out_path else None
+    enricher = Enricher(workers=enrich_workers) if enrich_workers else None
+
+    def emit(handle: str, rows: List[Dict]) -> None:
+        if enricher:
+            rows = enricher.enrich(rows)
+            # The scraper stored these rows before enrichment; upserting fills in the new fields
+            if scraper.store:
+                scraper.store.write([{"handle": handle, **row} for row in rows])
+        # Written (and flushed) as soon as possible so a crash loses little already found
+        if sink:
+            sink.write([{"handle": handle, **row} for row in rows])
+
+    def run_one(handle: str) -> Dict:
+        status = {"handle": handle, "status": "ok", "posts": 0, "seconds": 0.0, "error": None}
+        if not _normalize_instagram_input(handle):
+            status["status"] = "invalid"
+            return status
+        limiter.acquire()
+        t0 = time.monotonic()
+        try:
+            known = index.shortcodes(handle) if index else set()
+            pending: List[Dict] = []
+            # Indexed only once the grid was scrolled to its end: a later incremental run stops
+            # at the first known post, so indexing a partial scrape would hide the posts past it
+            found: List[Dict] = []
+
+            def flush() -> None:
+                # Also called by iter_profile before it checkpoints rows, so none is skipped unwritten
+                if pending:
+                    emit(handle, list(pending))
+                    pending.clear()
+
+            rows = scraper.iter_profile(handle, stop_when_known=known or None, checkpoint=checkpoint, flush=flush)
+            for row in rows:
+                if row["shortcode"] in known:
+                    continue
+                pending.append(row)
+                if index:
+                    found.append(row)
+                status["posts"] += 1
+                if len(pending) >= (ENRICH_BATCH if enricher else 1):
+                    flush()
+            flush()
+            if index:
+                index.add(handle, found)
+            if not status["posts"]:
+                status["status"] = "empty"
+        except Blocked as e:
+            # Rows found before the block are kept (and checkpointed); the profile is not done
+            flush()
+            status["status"], status["error"] = "error", f"Blocked: {e}"
+        except Exception as e:
+            status["status"], status["error"] = "error", f"{type(e).__name__}: {e}"
+        status["seconds"] = round(time.monotonic() - t0, 2)
+        return status
+
+    results = []
+    report_lock = threading.Lock()
+
+    def report(status: Dict) -> None:
+        with report_lock:
+            results.append(status)
+            print(
+                f"[BATCH] {len(results)}/{len(handles)} {status['handle']}: {status['status']} "
+                f"({status['posts']} posts, {status['seconds']}s)",
+                flush=True,
+            )
+            if on_result:
+                on_result(status)
+            metrics.flush()
+
+    feed_lock = threading.Lock()
+    feed_iter = iter(handles)
+
+    def run_tabs() -> None:
+        """One browser, `tabs` profiles at a time, pulling handles from the shared feed."""
+        from scrapers.tabs import DONE, EMPTY, LOGIN_REQUIRED, PRIVATE, THROTTLED, URLS
+
+        running: Dict[str, Dict] = {}  # status dicts of profiles open in a tab
+        started: Dict[str, float] = {}
+        skip: Dict[str, set] = {}
+        pending: Dict[str, List[Dict]] = {}
+        found: Dict[str, List[Dict]] = {}  # rows to index once the profile is done (see run_one)
+
+        def feed():
+            while True:
+                with feed_lock:
+                    handle = next(feed_iter, None)
+                if handle is None:
+                    return
+                if not _normalize_instagram_input(handle):
+                    report({"handle": handle, "status": "invalid", "posts": 0, "seconds": 0.0, "error": None})
+                    continue
+                running[handle] = {"handle": handle, "status": "ok", "posts": 0, "seconds": 0.0, "error": None}
+                started[handle] = time.monotonic()
+                skip[handle] = (index.shortcodes(handle) if index else set()) | (
+                    checkpoint.load(handle) if checkpoint else set())
+                yield handle
+
+        def flush(handle: str) -> None:
+            rows = pending.pop(handle, [])
+            if rows:
+                emit(handle, rows)
+                if checkpoint:
+                    checkpoint.record(handle, [r["shortcode"] for r in rows])
+
+        def finish(handle: str, state: str, error: Optional[str] = None) -> None:
+            status = running.pop(handle)
+            rows = found.pop(handle, [])
+            if state == DONE:
+                status["status"] = "ok" if status["posts"] else "empty"
+                if index:
+                    index.add(handle, rows)
+                if checkpoint:
+                    checkpoint.complete(handle)
+            elif state in (EMPTY, PRIVATE):
+                status["status"] = "empty"
+            elif state in (LOGIN_REQUIRED, THROTTLED):
+                # Tab states share their values with the account outcomes Blocked carries
+                status["status"], status["error"] = "error", f"Blocked: {Blocked(state)}"
+            else:
+                status["status"], status["error"] = "error", error or state
+            status["seconds"] = round(time.monotonic() - started.pop(handle), 2)
+            report(status)
+
+        try:
+            for handle, state, rows in scraper.iter_profiles(feed(), tabs=tabs, limiter=limiter):
+                if state == URLS:
+                    rows = [r for r in rows if r["shortcode"] not in skip[handle]]
+                    running[handle]["posts"] += len(rows)
+                    pending.setdefault(handle, []).extend(rows)
+                    if index:
+                        found.setdefault(handle, []).extend(rows)
+                    if len(pending[handle]) >= (ENRICH_BATCH if enricher else 1):
+                        flush(handle)
+                    continue
+                flush(handle)
+                finish(handle, state)
+        except Exception as e:
+            # The browser died: every profile still open in one of its tabs failed
+            for handle in list(running):
+                finish(handle, "error", f"{type(e).__name__}: {e}")
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrape") as ex:
+            if tabs > 1:
+                for fut in [ex.submit(run_tabs) for _ in range(workers)]:
+                    fut.result()
+            else:
+                futures = [ex.submit(run_one, h) for h in handles]
+                for fut in as_completed(futures):
+                    report(fut.result())
+    finally:
+        if pool:
+            pool.close()
+        scraper.close()
+        if enricher:
+            enricher.close()
+        if sink:
+            sink.close()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Scrape post URLs for many Instagram profiles in parallel.")
+    ap.add_argument("handles", nargs="+", help="handles/profile URLs, or a file of them (one per line)")
+    ap.add_argument("-w", "--workers", type=int, default=None, help="parallel browsers (default: CPU count)")
+    ap.add_argument("-r", "--rate", type=float, default=None, help="max profile visits per minute (all accounts together)")
+    ap.add_argument("-o", "--out", default="posts.jsonl", help="file rows stream into: .jsonl, .csv or .db/.sqlite")
+    ap.add_argument("--status", default=None, help="optional JSONL file for per-profile status/timing")
+    ap.add_argument("--network", action="store_true", help="also harvest post metadata from the grid's JSON responses")
+    ap.add_argument("--lean", action="store_true", help="block images/media/fonts/trackers in the browsers")
+    ap.add_argument("--incremental", action="store_true", help="stop at posts already scraped in earlier runs")
+    ap.add_argument("--resume", action="store_true", help="continue profiles interrupted in an earlier run")
+    ap.add_argument("--metrics-port", type=int, default=None,
+                    help="serve Prometheus metrics on this port while running (or SCRAPER_METRICS_PORT)")
+    ap.add_argument("--tabs", type=int, default=1, help="profiles scrolled at once per browser, one tab each")
+    ap.add_argument("--enrich", type=int, default=0, metavar="N",
+                    help="visit each post page on N extra browsers for caption/timestamp/counts")
+    ap.add_argument("--long-scroll", action="store_true", default=None,
+                    help="prune harvested tiles and recycle tabs to bound memory on very long grids")
+    ap.add_argument("--accounts", default=None, metavar="FILE",
+                    help="rotate across the logins in FILE (user:pass per line); see SCRAPER_ACCOUNT_RATE")
+    args = ap.parse_args(argv)
+
+    handles = []
+    for h in args.handles:
+        handles.extend(read_handles(h) if os.path.isfile(h) else [h])
+
+    metrics.serve_prometheus(args.metrics_port)
+    status_fh = open(args.status, "a", encoding="utf-8") if args.status else None
+
+    def log_status(status: Dict) -> None:
+        if status_fh:
+            status_fh.write(json.dumps(status) + "\n")
+            status_fh.flush()
+
+    try:
+        results = scrape_batch(handles, workers=args.workers, per_minute=args.rate,
+                               out_path=args.out, on_result=log_status,
+                               capture_network=args.network, lean=args.lean,
+                               incremental=args.incremental, resume=args.resume,
+                               enrich_workers=args.enrich, tabs=args.tabs, long_scroll=args.long_scroll,
+                               accounts=AccountPool.from_env(path=args.accounts) if args.accounts else None)
+    finally:
+        if status_fh:
+            status_fh.close()
+    failed = sum(1 for r in results if r["status"] == "error")
+    print(f"[BATCH] Done: {len(results) - failed} ok/empty, {failed} failed", flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+# scrapers/checkpoint.py
+from typing import Iterable, Optional, Set
+import json
+import os
+import re
+
+
+class CheckpointStore:
+    """Append-only per-handle log of shortcodes already delivered to the consumer.
+
+    An interrupted profile resumes with those shortcodes skipped; the log is removed
+    once the profile completes.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("SCRAPER_CHECKPOINT_DIR", os.path.join(".scraper_data", "checkpoints"))
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, handle: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9._-]", "_", handle) + ".jsonl")
+
+    def load(self, handle: str) -> Set[str]:
+        done: Set[str] = set()
+        try:
+            with open(self._path(handle), encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        done.update(json.loads(line))
+                    except ValueError:
+                        continue  # torn line from a crash mid-write; those rows are re-emitted
+        except OSError:
+            pass
+        return done
+
+    def record(self, handle: str, shortcodes: Iterable[str]) -> None:
+        codes = [c for c in shortcodes if c]
+        if not codes:
+            return
+        with open(self._path(handle), "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(codes) + "\n")
+
+    def complete(self, handle: str) -> None:
+        try:
+            os.remove(self._path(handle))
+        except OSError:
+            pass
@@ -0,0 +1,262 @@
+# scrapers/driver_pool.py
+from typing import Callable, Dict, List, Optional
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+
+from core import metrics
+
+
+# ----------------------------
+# Health / memory probes
+# ----------------------------
+
+def _is_alive(driver: webdriver.Chrome) -> bool:
+    """Cheap round trip that fails once the browser or its session is gone."""
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+def browser_rss_mb(driver: webdriver.Chrome) -> Optional[float]:
+    """Resident memory of chromedriver and every browser process under it (Linux /proc only)."""
+    try:
+        root = driver.service.process.pid
+    except Exception:
+        return None
+    if not os.path.isdir("/proc"):
+        return None
+
+    children: Dict[int, List[int]] = {}
+    rss_kb: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status") as fh:
+                ppid, rss = 0, 0
+                for line in fh:
+                    if line.startswith("PPid:"):
+                        ppid = int(line.split()[1])
+                    elif line.startswith("VmRSS:"):
+                        rss = int(line.split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+        rss_kb[int(entry)] = rss
+
+    total, stack = 0, [root]
+    while stack:
+        pid = stack.pop()
+        total += rss_kb.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total / 1024.0
+
+
+# ----------------------------
+# Pool
+# ----------------------------
+
+class _Slot:
+    __slots__ = ("driver", "uses", "created_at")
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+
+class DriverPool:
+    """Keeps up to `size` pre-launched, already logged-in Chrome drivers alive for reuse.
+
+    `factory` must return a ready-to-scrape driver (built and, if possible, logged in).
+    Drivers are recycled after `max_uses` checkouts or once the browser tree grows past
+    `max_memory_mb`, and dead sessions are evicted instead of being handed out.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], webdriver.Chrome],
+        size: int = 1,
+        max_uses: int = 20,
+        max_memory_mb: Optional[float] = None,
+    ):
+        self._factory = factory
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self._idle: List[_Slot] = []
+        self._busy: Dict[int, _Slot] = {}
+        self._launching = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # -- lifecycle --------------------------------------------------------
+
+    def warm(self, n: Optional[int] = None, background: bool = False) -> None:
+        """Pre-launch drivers until `n` (default: `size`) are alive."""
+        if background:
+            threading.Thread(target=self.warm, args=(n,), daemon=True).start()
+            return
+        target = min(self.size, n or self.size)
+        while True:
+            with self._cond:
+                if self._closed or len(self._idle) + len(self._busy) + self._launching >= target:
+                    return
+                self._launching += 1
+            slot = self._launch()
+            with self._cond:
+                self._launching -= 1
+                if slot is not None:
+                    self._idle.append(slot)
+                self._cond.notify_all()
+            if slot is None:
+                return
+
+    def close(self) -> None:
+        """Quit every idle driver; busy ones are quit when checked back in."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for slot in idle:
+            self._quit(slot)
+
+    # -- checkout / checkin ------------------------------------------------
+
+    def checkout(self, timeout: Optional[float] = None) -> webdriver.Chrome:
+        """Hand out a healthy driver, launching one if the pool has room."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            slot, launch = None, False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("DriverPool is closed")
+                    if self._idle:
+                        slot = self._idle.pop()
+                        break
+                    if len(self._busy) + self._launching < self.size:
+                        self._launching += 1
+                        launch = True
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("No driver available from pool")
+                    self._cond.wait(remaining)
+
+            if launch:
+                slot = self._launch()
+                with self._cond:
+                    self._launching -= 1
+                    self._cond.notify_all()
+                if slot is None:
+                    raise RuntimeError("Driver factory failed to launch a browser")
+            elif not _is_alive(slot.driver):
+                print("[POOL] Evicting dead driver", flush=True)
+                self._quit(slot)
+                with self._cond:
+                    self._cond.notify_all()
+                continue
+
+            slot.uses += 1
+            with self._cond:
+                self._busy[id(slot.driver)] = slot
+            return slot.driver
+
+    def checkin(self, driver: webdriver.Chrome, discard: bool = False) -> None:
+        """Return a driver; it is quit instead when broken, worn out or over the memory cap."""
+        with self._cond:
+            slot = self._busy.pop(id(driver), None)
+        if slot is None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
+
+        reason, kind = None, None
+        rss = browser_rss_mb(driver) if not discard else None
+        metrics.sample_memory(rss)
+        if discard:
+            reason, kind = "discarded by caller", "discarded"
+        elif self._closed:
+            reason, kind = "pool closed", "closed"
+        elif self.max_uses and slot.uses >= self.max_uses:
+            reason, kind = f"reached {slot.uses} uses", "max_uses"
+        elif not _is_alive(driver):
+            reason, kind = "session dead", "dead"
+        elif self.max_memory_mb and rss is not None and rss > self.max_memory_mb:
+            reason, kind = f"RSS {rss:.0f} MB over {self.max_memory_mb:.0f} MB", "memory"
+
+        if reason:
+            print(f"[POOL] Recycling driver ({reason})", flush=True)
+            metrics.incr("driver_recycles_total", reason=kind)
+            self._quit(slot)
+        with self._cond:
+            if not reason:
+                self._idle.append(slot)
+            self._cond.notify_all()
+
+    def renew(self, driver: webdriver.Chrome) -> webdriver.Chrome:
+        """Quit a checked-out driver and launch its replacement in the same slot.
+
+        An open lease stays valid: it checks in whichever driver the slot holds when it ends.
+        """
+        with self._cond:
+            slot = self._busy.pop(id(driver), None)
+        if slot is None:
+            raise ValueError("driver is not checked out from this pool")
+        print("[POOL] Replacing a leased driver", flush=True)
+        metrics.incr("driver_recycles_total", reason="renewed")
+        self._quit(slot)
+        fresh = self._factory()  # on failure the slot is simply gone, freeing its capacity
+        slot.driver, slot.uses, slot.created_at = fresh, 1, time.monotonic()
+        with self._cond:
+            self._busy[id(fresh)] = slot
+        return fresh
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """`with pool.lease() as driver:` — discards the driver if the block raises.
+
+        A generator closed early (GeneratorExit) returns its driver to the pool as healthy.
+        """
+        driver = self.checkout(timeout=timeout)
+        with self._cond:
+            slot = self._busy.get(id(driver))
+        failed = False
+        try:
+            yield driver
+        except GeneratorExit:
+            raise
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            # renew() may have swapped the slot's driver while the lease was open
+            self.checkin(slot.driver if slot is not None else driver, discard=failed)
+
+    # -- internals ---------------------------------------------------------
+
+    def _launch(self) -> Optional[_Slot]:
+        try:
+            return _Slot(self._factory())
+        except Exception as e:
+            print(f"[POOL] Driver launch failed: {e}", flush=True)
+            return None
+
+    @staticmethod
+    def _quit(slot: _Slot) -> None:
+        try:
+            slot.driver.quit()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"idle": len(self._idle), "busy": len(self._busy), "launching": self._launching}
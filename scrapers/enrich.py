@@ -0,0 +1,259 @@
+# scrapers/enrich.py
+from typing import Dict, Iterable, List, Optional
+import functools
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from urllib.parse import urlparse
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from core import metrics
+from scrapers.driver_pool import DriverPool
+from scrapers.rate_limit import RateLimiter
+
+
+ENRICHED_FIELDS = ("caption", "posted_at", "media_type", "likes", "comments", "views")
+
+# Everything the parser needs from a post page, in one round trip
+_POST_PROBE = """
+const meta = (n) => {
+  const el = document.querySelector(`meta[property="${n}"]`) || document.querySelector(`meta[name="${n}"]`);
+  return el ? el.getAttribute('content') : null;
+};
+const t = document.querySelector('article time[datetime], main time[datetime], time[datetime]');
+return {
+  og_description: meta('og:description'),
+  og_title: meta('og:title'),
+  og_type: meta('og:type'),
+  og_video: meta('og:video') || meta('og:video:secure_url'),
+  description: meta('description'),
+  time: t ? t.getAttribute('datetime') : null,
+  ld_json: Array.from(document.querySelectorAll('script[type="application/ld+json"]')).map(s => s.textContent),
+  has_video: !!document.querySelector('article video, main video'),
+  carousel: !!document.querySelector('article button[aria-label="Next"], main button[aria-label="Next"]'),
+};
+"""
+
+
+# ----------------------------
+# Parsing
+# ----------------------------
+
+def _to_int(text: str) -> Optional[int]:
+    """'1,234' / '1.2K' / '3M' -> int."""
+    m = re.match(r"^\s*([\d.,]+)\s*([KkMmBb]?)\s*$", text or "")
+    if not m:
+        return None
+    num, suffix = m.group(1), m.group(2).upper()
+    if suffix:
+        value = float(num.replace(",", ""))
+        return int(value * {"K": 1e3, "M": 1e6, "B": 1e9}[suffix])
+    return int(re.sub(r"[.,]", "", num))
+
+
+def _count_before(text: str, word: str) -> Optional[int]:
+    m = re.search(r"([\d.,]+\s*[KkMmBb]?)\s+" + word, text or "")
+    return _to_int(m.group(1)) if m else None
+
+
+def _from_ld_json(blobs: List[str], out: Dict) -> None:
+    for blob in blobs or []:
+        try:
+            data = json.loads(blob)
+        except ValueError:
+            continue
+        for node in data if isinstance(data, list) else [data]:
+            if not isinstance(node, dict):
+                continue
+            out.setdefault("posted_at", node.get("uploadDate") or node.get("dateCreated") or node.get("datePublished"))
+            out.setdefault("caption", node.get("caption") or node.get("articleBody") or node.get("description"))
+            if node.get("@type") == "VideoObject":
+                out.setdefault("media_type", "video")
+            stats = node.get("interactionStatistic") or []
+            for s in stats if isinstance(stats, list) else [stats]:
+                kind = str((s or {}).get("interactionType", ""))
+                n = (s or {}).get("userInteractionCount")
+                if not isinstance(n, int):
+                    continue
+                if "Like" in kind:
+                    out.setdefault("likes", n)
+                elif "Comment" in kind:
+                    out.setdefault("comments", n)
+                elif "Watch" in kind:
+                    out.setdefault("views", n)
+
+
+def parse_post_page(probe: Dict) -> Dict:
+    """Fields from a post page probe; missing values are simply left out.
+
+    og:description looks like: '1,234 likes, 56 comments - someone on March 3, 2024: "caption"'.
+    """
+    out: Dict = {}
+    desc = probe.get("og_description") or probe.get("description") or ""
+    for field, word in (("likes", "likes?"), ("comments", "comments?"), ("views", "(?:views|plays)")):
+        n = _count_before(desc, word)
+        if n is not None:
+            out[field] = n
+    m = re.search(r':\s*["“](.*)["”]\s*\.?\s*$', desc, re.S)
+    if m:
+        out["caption"] = m.group(1).strip()
+    if probe.get("time"):
+        out["posted_at"] = probe["time"]
+
+    if probe.get("og_video") or probe.get("has_video") or (probe.get("og_type") or "").startswith("video"):
+        out["media_type"] = "video"
+    elif probe.get("carousel"):
+        out["media_type"] = "carousel"
+
+    _from_ld_json(probe.get("ld_json") or [], out)
+    if desc or probe.get("time") or probe.get("og_title"):
+        out.setdefault("media_type", "image")
+    return {k: v for k, v in out.items() if v is not None}
+
+
+# ----------------------------
+# Cache
+# ----------------------------
+
+class EnrichmentCache:
+    """Shortcode -> enriched fields, in SQLite, so a post is fetched at most once."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("SCRAPER_ENRICH_DB", os.path.join(".scraper_data", "enriched.db"))
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with closing(self._connect()) as con, con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS enriched ("
+                "shortcode TEXT PRIMARY KEY, fields TEXT NOT NULL, fetched_at REAL NOT NULL) WITHOUT ROWID"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def get_many(self, shortcodes: Iterable[str]) -> Dict[str, Dict]:
+        codes = list(shortcodes)
+        found: Dict[str, Dict] = {}
+        with closing(self._connect()) as con:
+            for i in range(0, len(codes), 500):
+                part = codes[i:i + 500]
+                sql = f"SELECT shortcode, fields FROM enriched WHERE shortcode IN ({','.join('?' * len(part))})"
+                for code, fields in con.execute(sql, part):
+                    found[code] = json.loads(fields)
+        return found
+
+    def put(self, shortcode: str, fields: Dict) -> None:
+        with closing(self._connect()) as con, con:
+            con.execute(
+                "INSERT OR REPLACE INTO enriched (shortcode, fields, fetched_at) VALUES (?, ?, ?)",
+                (shortcode, json.dumps(fields), time.time()),
+            )
+
+
+# ----------------------------
+# Fetcher
+# ----------------------------
+
+def _fetch_post(driver: webdriver.Chrome, url: str, timeout: float) -> Dict:
+    driver.get(url)
+    deadline = time.monotonic() + timeout
+    fields: Dict = {}
+    while True:
+        fields = parse_post_page(driver.execute_script(_POST_PROBE) or {})
+        # The timestamp renders last; don't wait past the deadline for it
+        if "posted_at" in fields or time.monotonic() >= deadline:
+            return fields
+        time.sleep(0.3)
+
+
+class Enricher:
+    """Visits post URLs on a bounded set of drivers and fills in ENRICHED_FIELDS.
+
+    Requests are paced per host (`per_host_per_minute`), failures are retried with
+    exponential backoff, and results are cached by shortcode.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[DriverPool] = None,
+        workers: int = 2,
+        per_host_per_minute: Optional[float] = 30,
+        retries: int = 2,
+        timeout: float = 12.0,
+        cache: Optional[EnrichmentCache] = None,
+    ):
+        if pool is None:
+            from scrapers.instagram_selenium import _new_session_driver
+            pool = DriverPool(factory=functools.partial(_new_session_driver, lean=True), size=workers)
+        self.pool = pool
+        self.workers = workers
+        self.per_host_per_minute = per_host_per_minute
+        self.retries = retries
+        self.timeout = timeout
+        self.cache = cache or EnrichmentCache()
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._limiters_lock = threading.Lock()
+
+    def _limiter(self, url: str) -> RateLimiter:
+        host = urlparse(url).netloc
+        with self._limiters_lock:
+            if host not in self._limiters:
+                self._limiters[host] = RateLimiter(self.per_host_per_minute)
+            return self._limiters[host]
+
+    def _fetch(self, row: Dict) -> Dict:
+        url = row["post_url"]
+        for attempt in range(self.retries + 1):
+            self._limiter(url).acquire()
+            try:
+                with self.pool.lease() as driver, metrics.span("post_enrich", log=False):
+                    fields = _fetch_post(driver, url, self.timeout)
+                if fields:
+                    self.cache.put(row["shortcode"], fields)
+                    metrics.incr("enrich_fetches_total", result="ok")
+                    return fields
+                error = "no post data on page"
+                metrics.incr("enrich_fetches_total", result="empty")
+            except WebDriverException as e:
+                error = f"{type(e).__name__}: {e.msg if hasattr(e, 'msg') else e}"
+                metrics.incr("enrich_fetches_total", result="error")
+            except (RuntimeError, TimeoutError) as e:
+                # No browser to lease (launch failed, pool closed or exhausted): the row stays un-enriched
+                error = f"{type(e).__name__}: {e}"
+                metrics.incr("enrich_fetches_total", result="error")
+            if attempt < self.retries:
+                time.sleep(min(2 ** attempt, 30))
+        print(f"[ENRICH] Giving up on {url}: {error}", flush=True)
+        return {}
+
+    def enrich(self, rows: Iterable[Dict]) -> List[Dict]:
+        """Rows with ENRICHED_FIELDS merged in; cached posts are not fetched again."""
+        rows = list(rows)
+        cached = self.cache.get_many(r["shortcode"] for r in rows if r.get("shortcode"))
+        todo = [r for r in rows if r.get("shortcode") and r["shortcode"] not in cached and r.get("post_url")]
+        print(f"[ENRICH] {len(rows)} rows: {len(rows) - len(todo)} cached/skipped, {len(todo)} to fetch", flush=True)
+
+        fetched: Dict[str, Dict] = {}
+        if todo:
+            with ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix="enrich") as ex:
+                for row, fields in zip(todo, ex.map(self._fetch, todo)):
+                    fetched[row["shortcode"]] = fields
+
+        out = []
+        for r in rows:
+            fields = cached.get(r.get("shortcode")) or fetched.get(r.get("shortcode")) or {}
+            # Values already on the row (e.g. from network capture) win over page-scraped ones
+            out.append({**fields, **{k: v for k, v in r.items() if v is not None}})
+        return out
+
+    def close(self) -> None:
+        self.pool.close()
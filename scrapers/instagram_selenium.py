@@ -1,10 +1,12 @@
 # scrapers/instagram_selenium.py
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Set, Tuple
 import os
 import re
 import time
 import random
-from urllib.parse import urlparse
+import atexit
+import functools
+import threading
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -14,30 +16,35 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
+from core import metrics
+from core.result_store import ResultStore
+from scrapers.accounts import (INCOMPLETE as STOPPED_EARLY, LOGIN_WALL, OK as ACCOUNT_OK,
+                               THROTTLED as ACCOUNT_THROTTLED, Account, AccountPool, Blocked)
+from scrapers.checkpoint import CheckpointStore
+from scrapers.driver_pool import DriverPool, browser_rss_mb
+from scrapers.known_index import KnownIndex
+from scrapers.lean import apply_lean_blocking, apply_lean_options
+from scrapers.long_scroll import LongScroll
+from scrapers.network_capture import NetworkHarvester, enable_network_capture, posted_by
+from scrapers.page_collector import drain_new_urls
+from scrapers.page_state import (EMPTY, GRID, LOGIN, PRIVATE, THROTTLED as PAGE_THROTTLED, TIMEOUT,
+                                 wait_for_page_state)
+from scrapers.post_set import PostSet
+from scrapers.rate_limit import RateLimiter
+from scrapers.scroll import ScrollScheduler
+from scrapers.session_store import SessionStore, is_logged_in
+from scrapers.urls import login_url, normalize_handle, post_url, profile_url as _profile_url
+
 
 # ----------------------------
 # Utilities
 # ----------------------------
 
-def _normalize_instagram_input(raw: str) -> Optional[str]:
-    """Accepts @user / user / https://instagram.com/user and returns 'user'."""
-    if not raw:
-        return None
-    text = raw.strip()
-    if text.startswith("@"):
-        text = text[1:]
-    if text.startswith("http://") or text.startswith("https://"):
-        try:
-            p = urlparse(text)
-            seg = (p.path or "").strip("/").split("/")[0]
-            if seg:
-                text = seg
-        except Exception:
-            pass
-    return text if re.match(r"^[A-Za-z0-9._]{1,100}$", text) else None
+# Kept under its old name for existing callers
+_normalize_instagram_input = normalize_handle
 
 
-def _build_driver(headless: bool = True) -> webdriver.Chrome:
+def _build_driver(headless: bool = True, capture_network: bool = False, lean: bool = False) -> webdriver.Chrome:
     """Build a Chrome driver that works reliably on small containers (Render free tier)."""
     chrome_options = Options()
     if headless:
@@ -65,49 +72,43 @@ def _build_driver(headless: bool = True) -> webdriver.Chrome:
         "AppleWebKit(537.36) (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
     )
 
+    # Skip images/media/fonts and cap caches; only link hrefs are needed
+    if lean:
+        apply_lean_options(chrome_options)
+
+    # Buffer CDP network events so JSON responses can be harvested while scrolling
+    if capture_network:
+        enable_network_capture(chrome_options)
+
     # Explicit paths for Render’s apt packages
     chrome_options.binary_location = os.getenv("CHROME_BIN", "/usr/bin/chromium")
     service = Service(os.getenv("CHROMEDRIVER", "/usr/bin/chromedriver"))
 
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    try:
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    except Exception:
-        pass
-    return driver
-
-
-def _dismiss_cookie_banner(driver: webdriver.Chrome):
-    """Try to accept/close cookie banners that block the grid."""
-    candidates = [
-        '//button//*[contains(text(),"Allow all cookies")]/ancestor::button',
-        '//button//*[contains(text(),"Allow All")]/ancestor::button',
-        '//button//*[contains(text(),"Only allow essential cookies")]/ancestor::button',
-        '//button[contains(text(),"Allow all cookies")]',
-        '//button[contains(text(),"Allow All")]',
-        '//button[contains(text(),"Only allow essential cookies")]',
-        '//div[@role="dialog"]//button[contains(text(),"Accept")]',
-    ]
-    for xp in candidates:
+    with metrics.span("driver_launch", lean=lean, capture_network=capture_network):
+        driver = metrics.instrument_driver(webdriver.Chrome(service=service, options=chrome_options))
         try:
-            btn = WebDriverWait(driver, 3).until(EC.element_to_be_clickable((By.XPATH, xp)))
-            btn.click()
-            time.sleep(1.2)
-            print("[SCRAPER] Cookie banner dismissed", flush=True)
-            break
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         except Exception:
             pass
+        if lean:
+            apply_lean_blocking(driver)
+    return driver
 
 
 def _login(driver: webdriver.Chrome, username: str, password: str) -> None:
     """Log in to Instagram (for public reliability and private profiles)."""
+    with metrics.span("login"):
+        _login_steps(driver, username, password)
+
+
+def _login_steps(driver: webdriver.Chrome, username: str, password: str) -> None:
     print("[SCRAPER] Logging in…", flush=True)
     try:
-        driver.get("https://www.instagram.com/accounts/login/")
+        driver.get(login_url())
     except WebDriverException as e:
         print(f"[SCRAPER] driver.get(login) crashed: {e}", flush=True)
         time.sleep(2)
-        driver.get("https://www.instagram.com/accounts/login/")
+        driver.get(login_url())
 
     time.sleep(random.uniform(3.5, 5.5))
     wait = WebDriverWait(driver, 30)
@@ -143,78 +144,254 @@ def _login(driver: webdriver.Chrome, username: str, password: str) -> None:
     print("[SCRAPER] Login step complete", flush=True)
 
 
-def _collect_post_urls(driver: webdriver.Chrome, handle: str, max_idle_scrolls: int = 10) -> List[str]:
-    """Scroll the profile grid, collecting /p/ (posts) and /reel/ (reels)."""
-    profile_url = f"https://www.instagram.com/{handle}/"
+# One lock per login, so browsers of different accounts can log in at the same time
+_login_locks: Dict[str, threading.Lock] = {}
+_login_locks_guard = threading.Lock()
+
+
+def _login_lock(username: str) -> threading.Lock:
+    with _login_locks_guard:
+        return _login_locks.setdefault(username, threading.Lock())
+
+
+def _ensure_login(driver: webdriver.Chrome, username: str, password: str,
+                  store: Optional[SessionStore] = None, force: bool = False) -> None:
+    """Reuse a stored session when it is still valid, otherwise log in and store the new one."""
+    store = store or SessionStore()
+    # Serialized per account so parallel workers restore the first worker's session instead of all logging in
+    with _login_lock(username):
+        if force:
+            store.discard(username)
+        else:
+            with metrics.span("session_restore") as info:
+                info["restored"] = store.restore(driver, username)
+            if info["restored"]:
+                metrics.incr("logins_total", result="restored")
+                return
+        _login(driver, username, password)
+        if is_logged_in(driver):
+            store.save(driver, username)
+            metrics.incr("logins_total", result="fresh")
+        else:
+            metrics.incr("logins_total", result="failed")
+
+
+LOGIN_REQUIRED = "__LOGIN_REQUIRED__"
+THROTTLED = "__THROTTLED__"
+INCOMPLETE = "__INCOMPLETE__"
+# Sentinel batches that end a scrape early, and the Blocked reason each one raises
+_STOPS = ([LOGIN_REQUIRED], [THROTTLED], [INCOMPLETE])
+_BLOCK_REASONS = {LOGIN_REQUIRED: LOGIN_WALL, THROTTLED: ACCOUNT_THROTTLED, INCOMPLETE: STOPPED_EARLY}
+
+
+def _iter_post_urls(driver: webdriver.Chrome, handle: str,
+                    scheduler: Optional[ScrollScheduler] = None,
+                    harvester: Optional[NetworkHarvester] = None,
+                    stop_when_known: Optional[Set[str]] = None,
+                    long_scroll: Optional[LongScroll] = None) -> Iterator[List[str]]:
+    """Scroll the profile grid, yielding each batch of newly seen /p/ (posts) and /reel/ (reels) URLs.
+
+    Yields [LOGIN_REQUIRED] (login wall) or [THROTTLED] ("Please wait a few minutes") once
+    and stops if Instagram blocks the visit, or [INCOMPLETE] if long-scroll recycling could
+    not bring the grid back before its end. With a `harvester`, shortcodes seen only in
+    the page's JSON responses, and posted by `handle`, are yielded last and their metadata
+    is left in `harvester.media`. With `stop_when_known`, scrolling stops as soon as a
+    freshly loaded batch holds only shortcodes from that set. With `long_scroll`, harvested
+    tiles are pruned and the tab (or browser) is recycled to stay within its memory budget.
+    """
+    profile_url = _profile_url(handle)
     print(f"[SCRAPER] Visiting: {profile_url}", flush=True)
+    if harvester:
+        harvester.start()
 
-    try:
-        driver.get(profile_url)
-    except WebDriverException as e:
-        print(f"[SCRAPER] driver.get(profile) crashed: {e}", flush=True)
-        time.sleep(2)
-        driver.get(profile_url)
-
-    time.sleep(random.uniform(3, 5))
-    _dismiss_cookie_banner(driver)
-
-    # If a login wall appears, signal to caller
-    try:
-        WebDriverWait(driver, 6).until(EC.presence_of_element_located((By.NAME, "username")))
+    t_start = time.perf_counter()
+    with metrics.span("profile_load", handle=handle):
+        try:
+            driver.get(profile_url)
+        except WebDriverException as e:
+            print(f"[SCRAPER] driver.get(profile) crashed: {e}", flush=True)
+            time.sleep(2)
+            driver.get(profile_url)
+
+    # One probe, polled: cookie banner (clicked away), login wall, private, empty or grid
+    state = wait_for_page_state(driver, timeout=20)
+    if state == LOGIN:
         print("[SCRAPER] Login wall detected on profile page", flush=True)
-        return ["__LOGIN_REQUIRED__"]
-    except Exception:
-        pass
+        metrics.incr("profiles_total", outcome="login_required")
+        yield [LOGIN_REQUIRED]
+        return
+    if state == PAGE_THROTTLED:
+        print("[SCRAPER] Throttled: Instagram asks to wait before trying again", flush=True)
+        metrics.incr("profiles_total", outcome="throttled")
+        yield [THROTTLED]
+        return
+    if state == PRIVATE:
+        print("[SCRAPER] Private account", flush=True)
+        metrics.incr("profiles_total", outcome="private"); return
+    if state == EMPTY:
+        print("[SCRAPER] No posts yet", flush=True)
+        metrics.incr("profiles_total", outcome="empty"); return
+    if state == TIMEOUT:
+        # No grid in time: nudge lazy loading once and let the scroll loop decide
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
 
-    # Private / no-posts checks
-    if driver.find_elements(By.XPATH, '//*[contains(text(),"This account is private")]'):
-        print("[SCRAPER] Private account", flush=True); return []
-    if driver.find_elements(By.XPATH, '//*[contains(text(),"No posts yet")]'):
-        print("[SCRAPER] No posts yet", flush=True); return []
+    # Keyed by shortcode, so /p/X and /<user>/p/X count once
+    seen = PostSet()
 
-    # Wait for anchors to appear
-    try:
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, 'a[href*="/p/"], a[href*="/reel/"]'))
+    def capture() -> List[str]:
+        # One round trip: the in-page observer hands over only URLs not seen before
+        new = [u for u in drain_new_urls(driver) if seen.add_url(u)]
+        metrics.incr("anchors_seen_total", len(new))
+        if harvester:
+            harvester.poll()
+        return new
+
+    def only_known(batch: List[str]) -> bool:
+        return stop_when_known is not None and bool(batch) and all(
+            _url_to_row(u)["shortcode"] in stop_when_known for u in batch
         )
-    except TimeoutException:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)
 
-    post_urls = set()
-    prev_count, idle = 0, 0
+    batch = capture()
+    print(f"[SCRAPER] Initial anchors found: {len(batch)}", flush=True)
+    if batch:
+        yield batch
+
+    # Each step scrolls and waits for the grid to grow and settle; it ends after a few idle rounds
+    policy = scheduler or ScrollScheduler.from_env()
+    scroller = policy.start(driver)
+    scrolls = fresh = 0
+    if long_scroll:
+        long_scroll.prepare(driver)
+    while not only_known(batch) and scroller.step() is not None:
+        scrolls += 1
+        batch = capture()
+        print(f"[SCRAPER] Collected so far: {len(seen)} (idle rounds: {scroller.idle})", flush=True)
+        if scrolls % 25 == 0:
+            metrics.sample_memory(browser_rss_mb(driver))
+        if batch:
+            fresh += len(batch)
+            yield batch
+        reason = long_scroll.check(driver, scrolls, progressed=fresh > 0) if long_scroll else None
+        if reason:
+            if harvester:
+                harvester.poll()
+            driver = long_scroll.recycle(driver, profile_url, reason)
+            if driver is None:
+                metrics.incr("profiles_total", outcome="incomplete")
+                yield [INCOMPLETE]
+                return
+            state = wait_for_page_state(driver, timeout=20)
+            # A fresh browser may have come back without the session, or been throttled
+            if state in (LOGIN, PAGE_THROTTLED):
+                print(f"[SCRAPER] {'Login wall' if state == LOGIN else 'Throttled'} after recycling", flush=True)
+                yield [LOGIN_REQUIRED if state == LOGIN else THROTTLED]
+                return
+            if state not in (GRID, TIMEOUT):
+                # Private/empty here means the reload failed, not that the profile ends here
+                print("[SCRAPER] Grid did not come back after recycling; stopping", flush=True)
+                metrics.incr("profiles_total", outcome="incomplete")
+                yield [INCOMPLETE]
+                return
+            if harvester:
+                harvester.driver = driver
+                harvester.start()
+            # A fresh page starts at the top: scroll back down, skipping what was already harvested
+            scroller = policy.start(driver)
+            fresh = 0
+    if only_known(batch):
+        print("[SCRAPER] Reached already-known posts; stopping early", flush=True)
+
+    if harvester:
+        harvester.poll()
+        extra = [post_url(m.get("media_type", ""), c) for c, m in harvester.media.items()
+                 if posted_by(m, handle) and seen.add(c, "reel" if m.get("media_type") == "reel" else "post")]
+        print(f"[SCRAPER] Network metadata for {len(harvester.media)} posts", flush=True)
+        if extra:
+            yield extra
+
+    print(f"[SCRAPER] Final posts: {len(seen)}", flush=True)
+    metrics.incr("profiles_total", outcome="ok" if seen else "no_urls")
+    metrics.log_event("profile", handle=handle, posts=len(seen), scrolls=scrolls, idle_rounds=scroller.idle,
+                      recycles=long_scroll.recycles if long_scroll else 0,
+                      seconds=round(time.perf_counter() - t_start, 3))
+    metrics.flush()
+
+
+def _collect_post_urls(driver: webdriver.Chrome, handle: str, **kwargs) -> List[str]:
+    """All post/reel URLs for `handle`, sorted; [LOGIN_REQUIRED], [THROTTLED] or [INCOMPLETE]
+    when the scrape stopped early."""
+    posts = PostSet()
+    for batch in _iter_post_urls(driver, handle, **kwargs):
+        if batch in _STOPS:
+            return batch
+        posts.update(batch)
+    return list(posts.sort().urls())
+
+
+def _url_to_row(url: str, media: Optional[Dict[str, Dict]] = None) -> Dict:
+    kind = "post" if "/p/" in url else ("reel" if "/reel/" in url else "unknown")
+    m = re.search(r"/(p|reel)/([^/]+)/?", url)
+    shortcode = m.group(2) if m else None
+    row = {"type": kind, "shortcode": shortcode, "post_url": url}
+    if media and shortcode in media:
+        # Network-harvested fields: posted_at, likes, comments, views, media_type, caption
+        row.update({k: v for k, v in media[shortcode].items() if k not in ("shortcode", "owner")})
+    return row
+
 
-    def capture() -> int:
-        anchors = driver.find_elements(By.CSS_SELECTOR, 'a[href*="/p/"], a[href*="/reel/"]')
-        for a in anchors:
-            href = a.get_attribute("href")
-            if href and ("/p/" in href or "/reel/" in href):
-                post_urls.add(href.split("?")[0])
-        return len(anchors)
+# ----------------------------
+# Driver pool
+# ----------------------------
 
-    n0 = capture()
-    print(f"[SCRAPER] Initial anchors found: {n0}", flush=True)
+def _new_session_driver(headless: bool = True, capture_network: bool = False, lean: bool = False,
+                        account: Optional[Account] = None) -> webdriver.Chrome:
+    """Pool factory: launch a browser and log it in as `account`, or with the
+    INSTAGRAM_USERNAME / INSTAGRAM_PASSWORD credentials when set."""
+    if account:
+        user, pwd = account.username, account.password
+    else:
+        user = os.getenv("INSTAGRAM_USERNAME", "")
+        pwd = os.getenv("INSTAGRAM_PASSWORD", "")
+    driver = _build_driver(headless=headless, capture_network=capture_network, lean=lean)
+    try:
+        # 🔐 Login first if credentials are available (most reliable on Render)
+        if user and pwd:
+            _ensure_login(driver, user, pwd)
+        else:
+            print("[SCRAPER] No credentials set; attempting public scrape", flush=True)
+    except Exception:
+        driver.quit()
+        raise
+    return driver
 
-    while True:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(random.uniform(2.0, 3.6))
-        capture()
-        curr = len(post_urls)
-        print(f"[SCRAPER] Collected so far: {curr}", flush=True)
-        idle = idle + 1 if curr == prev_count else 0
-        prev_count = curr
-        if idle >= max_idle_scrolls:
-            break
 
-    print(f"[SCRAPER] Final posts: {len(post_urls)}", flush=True)
-    return sorted(post_urls)
+_default_pools: Dict[tuple, DriverPool] = {}
+_default_pool_lock = threading.Lock()
 
 
-def _url_to_row(url: str) -> Dict:
-    kind = "post" if "/p/" in url else ("reel" if "/reel/" in url else "unknown")
-    m = re.search(r"/(p|reel)/([^/]+)/?", url)
-    shortcode = m.group(2) if m else None
-    return {"type": kind, "shortcode": shortcode, "post_url": url}
+def _session_pool(size: Optional[int] = None, **driver_options) -> DriverPool:
+    """A pool of `size` (default SCRAPER_POOL_SIZE) session drivers, recycled per
+    SCRAPER_POOL_MAX_USES / SCRAPER_POOL_MAX_MB."""
+    max_mb = os.getenv("SCRAPER_POOL_MAX_MB")
+    return DriverPool(
+        factory=functools.partial(_new_session_driver, **driver_options),
+        size=size or int(os.getenv("SCRAPER_POOL_SIZE", "1")),
+        max_uses=int(os.getenv("SCRAPER_POOL_MAX_USES", "20")),
+        max_memory_mb=float(max_mb) if max_mb else None,
+    )
+
+
+def get_default_pool(**driver_options) -> DriverPool:
+    """Process-wide pool per driver configuration (e.g. capture_network=True, or one
+    `account=` of an AccountPool), sized by SCRAPER_POOL_SIZE / SCRAPER_POOL_MAX_USES /
+    SCRAPER_POOL_MAX_MB."""
+    key = tuple(sorted(driver_options.items()))
+    with _default_pool_lock:
+        pool = _default_pools.get(key)
+        if pool is None:
+            pool = _default_pools[key] = _session_pool(**driver_options)
+            atexit.register(pool.close)
+        return pool
 
 
 # ----------------------------
@@ -222,34 +399,259 @@ def _url_to_row(url: str) -> Dict:
 # ----------------------------
 
 class InstagramScraperSelenium:
-    def scrape_profile(self, handle_or_url: str) -> List[Dict]:
+    def __init__(self, pool: Optional[DriverPool] = None, scheduler: Optional[ScrollScheduler] = None,
+                 capture_network: bool = False, lean: bool = False, long_scroll: Optional[bool] = None,
+                 accounts: Optional[AccountPool] = None, store: Optional[ResultStore] = None,
+                 account_pool_size: Optional[int] = None):
+        """`capture_network` also reads the grid's JSON responses over CDP to fill in
+        posted_at / likes / comments / views / media_type / caption where available.
+        `lean` runs browsers that block images, media, fonts and trackers. `long_scroll`
+        (default: SCRAPER_LONG_SCROLL=1) keeps very long grids within a memory budget by
+        pruning harvested tiles and recycling the tab or browser (scrapers.long_scroll).
+        `accounts` rotates scrapes across several logins, each with its own browser pool
+        and budget (scrapers.accounts); without an explicit `pool` it is read from
+        INSTAGRAM_ACCOUNTS / SCRAPER_ACCOUNTS_FILE when either is set. Those pools are the
+        process-wide ones (SCRAPER_POOL_SIZE browsers each) unless `account_pool_size` is
+        given: then this scraper opens its own, of that size, and `close()` quits them. Rows are also written
+        to `store` as they are found (default: a ResultStore at SCRAPER_RESULTS_DB, if set)."""
+        self.capture_network = capture_network
+        self.lean = lean
+        self.long_scroll = os.getenv("SCRAPER_LONG_SCROLL", "") == "1" if long_scroll is None else long_scroll
+        rotation = os.getenv("INSTAGRAM_ACCOUNTS") or os.getenv("SCRAPER_ACCOUNTS_FILE")
+        if accounts is None and pool is None and rotation:
+            accounts = AccountPool.from_env()
+        self.accounts = accounts
+        if store is None and os.getenv("SCRAPER_RESULTS_DB"):
+            store = ResultStore()
+        self.store = store
+        self.pool = pool or get_default_pool(capture_network=capture_network, lean=lean)
+        self.scheduler = scheduler or ScrollScheduler.from_env()
+        self.account_pool_size = account_pool_size
+        self._account_pools: Dict[str, DriverPool] = {}
+        self._account_pools_lock = threading.Lock()
+
+    def _pool_for(self, account: Optional[Account]) -> DriverPool:
+        if account is None:
+            return self.pool
+        if not self.account_pool_size:
+            return get_default_pool(capture_network=self.capture_network, lean=self.lean, account=account)
+        with self._account_pools_lock:
+            pool = self._account_pools.get(account.username)
+            if pool is None:
+                pool = self._account_pools[account.username] = _session_pool(
+                    self.account_pool_size, capture_network=self.capture_network, lean=self.lean, account=account)
+            return pool
+
+    def close(self) -> None:
+        """Quit the browsers of the per-account pools this scraper opened (`account_pool_size`)."""
+        with self._account_pools_lock:
+            pools, self._account_pools = list(self._account_pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def warm(self, background: bool = False) -> None:
+        """Launch (and log in) browsers ahead of the first scrape; with accounts, only the
+        first account's, so a small container does not start one browser per login."""
+        self._pool_for(self.accounts.accounts[0] if self.accounts else None).warm(background=background)
+
+    def _scrape_on(self, driver: webdriver.Chrome, pool: DriverPool, handle: str, delivered: Set[str],
+                   checkpoint: Optional[CheckpointStore], stop_when_known: Optional[Set[str]],
+                   flush: Optional[Callable[[], None]] = None) -> Iterator[Dict]:
+        """One pass over the grid, yielding undelivered rows. Returns (block, driver): block is
+        LOGIN_REQUIRED or THROTTLED if Instagram blocked the visit, INCOMPLETE if the grid was
+        given up before its end, else None, and driver
+        is the live browser, which long-scroll recycling may have swapped for a fresh one."""
+        harvester = NetworkHarvester(driver) if self.capture_network else None
+        long_scroll = LongScroll(renew=pool.renew, lean=self.lean) if self.long_scroll else None
+        batches = _iter_post_urls(driver, handle, scheduler=self.scheduler, harvester=harvester,
+                                  stop_when_known=stop_when_known, long_scroll=long_scroll)
+        for batch in batches:
+            if batch in _STOPS:
+                return batch[0], (long_scroll and long_scroll.driver) or driver
+            media = harvester.media if harvester else None
+            rows = [r for r in (_url_to_row(u, media) for u in batch) if r["shortcode"] not in delivered]
+            yield from rows
+            codes = [r["shortcode"] for r in rows]
+            delivered.update(codes)
+            if self.store:
+                self.store.write([{"handle": handle, **r} for r in rows])
+            if checkpoint:
+                # Only mark the batch delivered once the consumer has written what it buffered
+                if flush:
+                    flush()
+                checkpoint.record(handle, codes)
+        return None, (long_scroll and long_scroll.driver) or driver
+
+    def _scrape_rotating(self, handle: str, delivered: Set[str], checkpoint: Optional[CheckpointStore],
+                         stop_when_known: Optional[Set[str]], flush: Optional[Callable[[], None]]) -> Iterator[Dict]:
+        """Scrape on the account with the most budget left. A blocked account is put on
+        cooldown and the next one takes over, while any is still available; returns the
+        last block (or None)."""
+        blocked = None
+        for attempt in range(len(self.accounts)):
+            if attempt and not self.accounts.available():
+                print("[SCRAPER] Every account is cooling down", flush=True)
+                break
+            account = self.accounts.acquire()
+            print(f"[SCRAPER] Scraping {handle} as {account.username}", flush=True)
+            pool = self._pool_for(account)
+            with pool.lease() as driver:
+                blocked, driver = yield from self._scrape_on(driver, pool, handle, delivered, checkpoint,
+                                                             stop_when_known, flush)
+                # A login wall may only mean a stale stored session: log in afresh once before benching
+                if blocked == LOGIN_REQUIRED:
+                    _ensure_login(driver, account.username, account.password, force=True)
+                    blocked, driver = yield from self._scrape_on(driver, pool, handle, delivered, checkpoint,
+                                                                 stop_when_known, flush)
+            # Giving up on a long grid is no fault of the account, and another would fare no better
+            self.accounts.report(account, ACCOUNT_OK if blocked in (None, INCOMPLETE) else _BLOCK_REASONS[blocked])
+            if blocked in (None, INCOMPLETE):
+                break
+        return blocked
+
+    def iter_profile(self, handle_or_url: str, stop_when_known: Optional[Set[str]] = None,
+                     checkpoint: Optional[CheckpointStore] = None,
+                     flush: Optional[Callable[[], None]] = None) -> Iterator[Dict]:
+        """Yield rows as the grid reveals them, instead of returning a list at the end.
+
+        With a `checkpoint`, shortcodes already delivered by an interrupted run are skipped
+        and the checkpoint is cleared once the profile is finished. Each grid batch is
+        recorded there once its last row has been consumed; a consumer that buffers rows
+        passes `flush`, which is called first and must write out everything yielded so far.
+
+        Raises Blocked after the last row if a login wall, throttling or a grid that could not
+        be scrolled to its end stopped the scrape (the checkpoint is kept, so a later run
+        resumes the profile).
+        """
         handle = _normalize_instagram_input(handle_or_url)
         if not handle:
             print("[SCRAPER] Invalid handle", flush=True)
-            return []
-
-        user = os.getenv("INSTAGRAM_USERNAME", "")
-        pwd = os.getenv("INSTAGRAM_PASSWORD", "")
-
-        driver = _build_driver(headless=True)
+            return
+
+        delivered = checkpoint.load(handle) if checkpoint else set()
+        if delivered:
+            print(f"[SCRAPER] Resuming {handle}: {len(delivered)} posts already delivered", flush=True)
+
+        if self.accounts:
+            blocked = yield from self._scrape_rotating(handle, delivered, checkpoint, stop_when_known, flush)
+        else:
+            user = os.getenv("INSTAGRAM_USERNAME", "")
+            pwd = os.getenv("INSTAGRAM_PASSWORD", "")
+            # Drivers come from the pool already launched (and logged in when credentials exist)
+            with self.pool.lease() as driver:
+                blocked, driver = yield from self._scrape_on(driver, self.pool, handle, delivered, checkpoint,
+                                                             stop_when_known, flush)
+                # If a login wall somehow appeared, the stored session is stale: log in afresh once
+                if blocked == LOGIN_REQUIRED and user and pwd:
+                    _ensure_login(driver, user, pwd, force=True)
+                    blocked, driver = yield from self._scrape_on(driver, self.pool, handle, delivered,
+                                                                 checkpoint, stop_when_known, flush)
+
+        if blocked:
+            error = Blocked(_BLOCK_REASONS[blocked])
+            print(f"[SCRAPER] Stopped early: {error}", flush=True)
+            raise error
+        if checkpoint:
+            checkpoint.complete(handle)
+
+    def iter_profiles(self, handles_or_urls: Iterable[str], tabs: int = 3,
+                      limiter: Optional[RateLimiter] = None) -> Iterator[Tuple[str, str, List[Dict]]]:
+        """Scrape several profiles on one leased browser, `tabs` grids at a time.
+
+        Yields (handle, status, rows) as in scrapers.tabs.TabScheduler.run, with rows in
+        place of URLs; rows also go to `store`. Profile visits are paced by `limiter` when
+        given. Invalid handles are skipped; network capture is not available in this mode.
+        With `accounts`, one account is taken for the whole browser session and put on
+        cooldown afterwards if any profile ended behind a login wall or throttling.
+        """
+        from scrapers.tabs import LOGIN_REQUIRED as TAB_LOGIN_REQUIRED, THROTTLED as TAB_THROTTLED, TabScheduler
+
+        if self.capture_network:
+            print("[SCRAPER] Network capture is not supported with tabs; collecting URLs only", flush=True)
+
+        def valid_handles() -> Iterator[str]:
+            for raw in handles_or_urls:
+                handle = _normalize_instagram_input(raw)
+                if handle:
+                    yield handle
+                else:
+                    print(f"[SCRAPER] Invalid handle: {raw!r}", flush=True)
+
+        account = self.accounts.acquire() if self.accounts else None
+        if account:
+            user, pwd = account.username, account.password
+        else:
+            user = os.getenv("INSTAGRAM_USERNAME", "")
+            pwd = os.getenv("INSTAGRAM_PASSWORD", "")
+        relogged: Set[str] = set()
+        blocked = None
         try:
-            # 🔐 Login first if credentials are available (most reliable on Render)
-            if user and pwd:
-                _login(driver, user, pwd)
-            else:
-                print("[SCRAPER] No credentials set; attempting public scrape", flush=True)
-
-            urls = _collect_post_urls(driver, handle, max_idle_scrolls=10)
-
-            # If a login wall somehow appeared, retry once after login
-            if urls == ["__LOGIN_REQUIRED__"] and user and pwd:
-                _login(driver, user, pwd)
-                urls = _collect_post_urls(driver, handle, max_idle_scrolls=10)
+            with self._pool_for(account).lease() as driver:
+                scheduler = TabScheduler(driver, tabs=tabs, scheduler=self.scheduler, lean=self.lean,
+                                         limiter=limiter)
+                for handle, status, urls in scheduler.run(valid_handles()):
+                    # Same recovery as iter_profile: a login wall means the stored session went stale
+                    if status == TAB_LOGIN_REQUIRED and user and pwd and handle not in relogged:
+                        relogged.add(handle)
+                        # On the browser the tabs are running in now, not necessarily the leased one
+                        _ensure_login(scheduler.driver, user, pwd, force=True)
+                        scheduler.requeue(handle)
+                        continue
+                    if status == TAB_LOGIN_REQUIRED:
+                        blocked = LOGIN_WALL
+                    elif status == TAB_THROTTLED:
+                        blocked = ACCOUNT_THROTTLED
+                    rows = [_url_to_row(u) for u in urls]
+                    if self.store and rows:
+                        self.store.write([{"handle": handle, **r} for r in rows])
+                    yield handle, status, rows
+        finally:
+            if account:
+                self.accounts.report(account, blocked or ACCOUNT_OK)
 
-            if not urls or urls == ["__LOGIN_REQUIRED__"]:
-                print("[SCRAPER] No URLs collected", flush=True)
-                return []
+    def _rows_until_blocked(self, handle_or_url: str) -> Iterator[Dict]:
+        """iter_profile, ending quietly (with what was found) if the scrape was blocked."""
+        try:
+            yield from self.iter_profile(handle_or_url)
+        except Blocked:
+            pass
 
-            return [_url_to_row(u) for u in urls]
-        finally:
-            driver.quit()
+    def scrape_profile(self, handle_or_url: str) -> List[Dict]:
+        """Every row found, sorted by URL; a blocked scrape returns what it got so far
+        (use iter_profile to tell a block apart)."""
+        rows = list(self._rows_until_blocked(handle_or_url))
+        if not rows:
+            print("[SCRAPER] No URLs collected", flush=True)
+        return sorted(rows, key=lambda r: r["post_url"])
+
+    def collect_profile(self, handle_or_url: str) -> PostSet:
+        """Like scrape_profile, but into a compact PostSet (type + shortcode only; any
+        network-captured fields are dropped). Use for large profiles and batches."""
+        posts = PostSet.from_rows(self._rows_until_blocked(handle_or_url))
+        if not posts:
+            print("[SCRAPER] No URLs collected", flush=True)
+        return posts.sort()
+
+    def scrape_profile_incremental(self, handle_or_url: str, index: Optional[KnownIndex] = None) -> Dict[str, List[Dict]]:
+        """Scroll only until already-known posts show up.
+
+        Returns {"new": rows not seen in earlier runs, "all": every known row for the
+        handle, newest first}. The per-handle index lives in SQLite (SCRAPER_INDEX_DB).
+        Raises Blocked, leaving the index untouched, if the scrape did not reach the end.
+        """
+        handle = _normalize_instagram_input(handle_or_url)
+        if not handle:
+            print("[SCRAPER] Invalid handle", flush=True)
+            return {"new": [], "all": []}
+
+        index = index or KnownIndex()
+        known = index.shortcodes(handle)
+        # First run for a handle: nothing to stop at, so this is a full scrape
+        rows = list(self.iter_profile(handle, stop_when_known=known or None))
+        new = [r for r in rows if r["shortcode"] not in known]
+        index.add(handle, new)
+        print(f"[SCRAPER] {len(new)} new posts for {handle} ({len(known)} already known)", flush=True)
+
+        fresh = {r["shortcode"]: r for r in rows}
+        merged = [fresh.get(r["shortcode"], r) for r in index.rows(handle)]
+        return {"new": new, "all": merged}
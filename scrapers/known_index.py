@@ -0,0 +1,62 @@
+# scrapers/known_index.py
+from typing import Dict, Iterable, List, Optional, Set
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS known_posts (
+    handle     TEXT NOT NULL,
+    shortcode  TEXT NOT NULL,
+    type       TEXT,
+    post_url   TEXT,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (handle, shortcode)
+) WITHOUT ROWID;
+"""
+
+
+class KnownIndex:
+    """Per-handle index of shortcodes already scraped, kept in SQLite.
+
+    Connections are opened per call, so one index can be shared by worker threads.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("SCRAPER_INDEX_DB", os.path.join(".scraper_data", "known.db"))
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with closing(self._connect()) as con, con:
+            con.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def shortcodes(self, handle: str) -> Set[str]:
+        with closing(self._connect()) as con:
+            return {r[0] for r in con.execute("SELECT shortcode FROM known_posts WHERE handle = ?", (handle,))}
+
+    def add(self, handle: str, rows: Iterable[Dict]) -> int:
+        """Record rows (type/shortcode/post_url dicts); returns how many were not known yet."""
+        now = time.time()
+        params = [(handle, r["shortcode"], r.get("type"), r.get("post_url"), now) for r in rows if r.get("shortcode")]
+        with closing(self._connect()) as con, con:
+            before = con.total_changes
+            con.executemany(
+                "INSERT OR IGNORE INTO known_posts (handle, shortcode, type, post_url, first_seen) VALUES (?, ?, ?, ?, ?)",
+                params,
+            )
+            return con.total_changes - before
+
+    def rows(self, handle: str) -> List[Dict]:
+        """Everything known for `handle`, newest first."""
+        with closing(self._connect()) as con:
+            cur = con.execute(
+                "SELECT type, shortcode, post_url FROM known_posts WHERE handle = ? ORDER BY first_seen DESC, shortcode",
+                (handle,),
+            )
+            return [{"type": t, "shortcode": c, "post_url": u} for t, c, u in cur]
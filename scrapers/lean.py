@@ -0,0 +1,48 @@
+# scrapers/lean.py
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+
+
+# Matched by Chrome against every request URL ('*' is a wildcard)
+LEAN_BLOCKED_URLS = [
+    # images / video / audio
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.heic*", "*.avif*", "*.ico*",
+    "*.mp4*", "*.m4v*", "*.m4a*", "*.webm*", "*.mp3*",
+    # fonts
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    # Instagram media CDN hosts (post images/videos; static JS/CSS lives on static.cdninstagram.com)
+    "*://scontent*",
+    "*://video*.cdninstagram.com/*", "*://video*.fbcdn.net/*",
+    # third-party analytics / ads
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*connect.facebook.net*", "*facebook.com/tr*", "*graph.facebook.com/logging*",
+]
+
+
+def apply_lean_options(options: Options) -> None:
+    """Chrome prefs/flags that skip images and keep caches and the JS heap small."""
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+        "profile.default_content_setting_values.notifications": 2,
+        "profile.default_content_setting_values.geolocation": 2,
+    })
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--autoplay-policy=user-gesture-required")
+    options.add_argument("--mute-audio")
+    options.add_argument("--disk-cache-size=1048576")
+    options.add_argument("--media-cache-size=1048576")
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--disable-component-update")
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--js-flags=--max-old-space-size=256")
+
+
+def apply_lean_blocking(driver: webdriver.Chrome) -> None:
+    """Block media/font/tracker requests at the network layer for the current tab."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+    except WebDriverException as e:
+        print(f"[SCRAPER] Could not enable URL blocking: {e}", flush=True)
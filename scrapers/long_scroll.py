@@ -0,0 +1,188 @@
+# scrapers/long_scroll.py
+from typing import Callable, Dict, Optional
+import os
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from core import metrics
+from scrapers.driver_pool import browser_rss_mb
+from scrapers.lean import apply_lean_blocking
+from scrapers.scroll import GRID_SELECTOR
+
+# Swaps tiles the in-page collector has already handed over (scrapers.page_collector) and
+# that sit more than `keepPx` above the viewport for empty spacers of the same size, so the
+# layout and scroll position hold while their images, videos and subtrees are freed. A
+# container left holding nothing but spacers collapses into one spacer in turn.
+_PRUNE = """
+const selector = arguments[0], keepPx = arguments[1];
+const c = window.__igCollect;
+if (!c) return 0;
+const spacer = (el) => {
+  const r = el.getBoundingClientRect(), s = document.createElement('div');
+  s.className = '__igSpacer';
+  s.style.cssText = `width:${r.width}px;height:${r.height}px;flex:none;`;
+  el.replaceWith(s);
+  return s;
+};
+let pruned = 0;
+for (const a of document.querySelectorAll(selector)) {
+  const h = a.href && a.href.split('?')[0];
+  if (!h || !c.seen.has(h)) continue;
+  if (a.getBoundingClientRect().bottom > -keepPx) break;  // document order: the rest are lower
+  let s = spacer(a);
+  pruned++;
+  for (let p = s.parentElement; p && p !== document.body && p.getBoundingClientRect().bottom < -keepPx
+       && Array.from(p.children).every((ch) => ch.classList.contains('__igSpacer')); p = s.parentElement) {
+    s = spacer(p);
+  }
+}
+window.__igPruned = (window.__igPruned || 0) + pruned;
+return pruned;
+"""
+
+
+def renderer_metrics(driver: webdriver.Chrome) -> Dict[str, float]:
+    """CDP Performance.getMetrics for the current tab (JSHeapUsedSize, Nodes, ...)."""
+    result = driver.execute_cdp_cmd("Performance.getMetrics", {})
+    return {m["name"]: m["value"] for m in result.get("metrics", [])}
+
+
+class MemoryBudget:
+    """Limits past which a long scroll recycles its tab: renderer JS heap and DOM nodes
+    (CDP Performance.getMetrics) and the browser process tree's RSS, checked every
+    `every` scrolls. A limit of None is not checked."""
+
+    def __init__(
+        self,
+        heap_mb: Optional[float] = 160.0,
+        nodes: Optional[int] = 150_000,
+        rss_mb: Optional[float] = 400.0,
+        every: int = 10,
+    ):
+        self.heap_mb = heap_mb
+        self.nodes = nodes
+        self.rss_mb = rss_mb
+        self.every = max(1, every)
+
+    @classmethod
+    def from_env(cls, **overrides) -> "MemoryBudget":
+        """Defaults overridable via SCRAPER_LONG_SCROLL_HEAP_MB / _RSS_MB (sized for 512 MB containers)."""
+        kwargs = {}
+        if os.getenv("SCRAPER_LONG_SCROLL_HEAP_MB"):
+            kwargs["heap_mb"] = float(os.environ["SCRAPER_LONG_SCROLL_HEAP_MB"])
+        if os.getenv("SCRAPER_LONG_SCROLL_RSS_MB"):
+            kwargs["rss_mb"] = float(os.environ["SCRAPER_LONG_SCROLL_RSS_MB"])
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    def exceeded(self, driver: webdriver.Chrome) -> Optional[str]:
+        """"heap", "nodes" or "rss" when over budget, else None. Raises if the tab is gone."""
+        m = renderer_metrics(driver)
+        heap = m.get("JSHeapUsedSize", 0.0) / 2**20
+        nodes = m.get("Nodes", 0.0)
+        metrics.gauge("renderer_heap_mb", heap)
+        metrics.gauge("renderer_dom_nodes", nodes)
+        rss = browser_rss_mb(driver) if self.rss_mb else None
+        metrics.sample_memory(rss)
+        if self.heap_mb and heap > self.heap_mb:
+            print(f"[SCROLL] JS heap {heap:.0f} MB over {self.heap_mb:.0f} MB", flush=True)
+            return "heap"
+        if self.nodes and nodes > self.nodes:
+            print(f"[SCROLL] {nodes:.0f} DOM nodes over {self.nodes}", flush=True)
+            return "nodes"
+        if rss is not None and rss > self.rss_mb:
+            print(f"[SCROLL] Browser RSS {rss:.0f} MB over {self.rss_mb:.0f} MB", flush=True)
+            return "rss"
+        return None
+
+
+class LongScroll:
+    """Keeps one very long grid scroll inside a memory budget.
+
+    Each round prunes harvested tiles from the DOM; every `budget.every` rounds the
+    renderer is measured. Past the budget, or when the tab crashes, `recycle` reopens the
+    profile in a fresh tab (or a fresh browser from `renew`, when closing tabs no longer
+    brings RSS down or the browser is gone). The caller then scrolls down again with
+    pruning on: posts it already has are skipped, so collection resumes where it stopped.
+    `driver` is the browser in use after the last recycle (None before any), which
+    replaces the caller's once `renew` has quit it.
+    """
+
+    def __init__(
+        self,
+        budget: Optional[MemoryBudget] = None,
+        renew: Optional[Callable[[webdriver.Chrome], webdriver.Chrome]] = None,
+        lean: bool = False,
+        keep_px: int = 2500,
+        max_recycles: int = 10,
+    ):
+        self.budget = budget or MemoryBudget.from_env()
+        self.renew = renew
+        self.lean = lean
+        self.keep_px = keep_px
+        self.max_recycles = max_recycles
+        self.recycles = 0
+        self.pruned = 0
+        self.driver: Optional[webdriver.Chrome] = None
+        self._last_reason: Optional[str] = None
+
+    def prepare(self, driver: webdriver.Chrome) -> None:
+        """Enable CDP performance metrics for the current tab (needed once per tab)."""
+        try:
+            driver.execute_cdp_cmd("Performance.enable", {})
+        except WebDriverException as e:
+            print(f"[SCROLL] Performance metrics unavailable: {e}", flush=True)
+
+    def check(self, driver: webdriver.Chrome, scrolls: int, progressed: bool = True) -> Optional[str]:
+        """After a scroll round: prune, then a recycle reason ("crash", "heap", "nodes", "rss") or None.
+
+        Pass `progressed=False` while a recycled tab is still scrolling back to posts it had
+        already seen: the budget is not enforced then, or the same spot would recycle forever.
+        """
+        try:
+            pruned = driver.execute_script(_PRUNE, GRID_SELECTOR, self.keep_px) or 0
+            if pruned:
+                self.pruned += pruned
+                metrics.incr("grid_tiles_pruned_total", pruned)
+            if not progressed or scrolls % self.budget.every:
+                return None
+            return self.budget.exceeded(driver)
+        except WebDriverException as e:
+            print(f"[SCROLL] Tab unresponsive: {type(e).__name__}", flush=True)
+            return "crash"
+
+    def recycle(self, driver: webdriver.Chrome, url: str, reason: str) -> Optional[webdriver.Chrome]:
+        """Reopen `url` in a fresh tab or browser; None once `max_recycles` is used up."""
+        if self.recycles >= self.max_recycles:
+            print(f"[SCROLL] Recycled {self.recycles} times already; giving up on this grid", flush=True)
+            return None
+        self.recycles += 1
+        # RSS still over right after a fresh tab means the browser itself has grown
+        escalate = self.renew is not None and reason == "rss" and self._last_reason == "rss"
+        self._last_reason = reason
+        scope = "driver" if escalate else "tab"
+        if not escalate:
+            try:
+                old = driver.current_window_handle
+                driver.switch_to.new_window("tab")
+                fresh = driver.current_window_handle
+                driver.switch_to.window(old)
+                driver.close()
+                driver.switch_to.window(fresh)
+                if self.lean:
+                    # Network.setBlockedURLs only covers the target it was sent to
+                    apply_lean_blocking(driver)
+            except WebDriverException as e:
+                if self.renew is None:
+                    raise
+                print(f"[SCROLL] Could not open a fresh tab ({type(e).__name__})", flush=True)
+                scope = "driver"
+        if scope == "driver":
+            driver = self.renew(driver)
+            self.driver = driver
+        print(f"[SCROLL] Recycled {scope} ({reason}); resuming", flush=True)
+        metrics.incr("long_scroll_recycles_total", reason=reason, scope=scope)
+        self.prepare(driver)
+        driver.get(url)
+        return driver
@@ -0,0 +1,190 @@
+# scrapers/network_capture.py
+from typing import Any, Dict, Iterator, Optional
+import base64
+import json
+from datetime import datetime, timezone
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+
+
+_MEDIA_TYPES = {1: "image", 2: "video", 8: "carousel"}
+_TYPENAMES = {
+    "GraphImage": "image", "XDTGraphImage": "image",
+    "GraphVideo": "video", "XDTGraphVideo": "video",
+    "GraphSidecar": "carousel", "XDTGraphSidecar": "carousel",
+}
+# Carousel children carry shortcodes of their own but are slides, not posts on the grid
+_CHILD_KEYS = ("edge_sidecar_to_children", "carousel_media")
+
+
+def enable_network_capture(options: Options) -> None:
+    """Ask chromedriver to buffer CDP Network.* events in the "performance" log."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+# ----------------------------
+# Payload parsing
+# ----------------------------
+
+def _count(d: Dict, *keys: str) -> Optional[int]:
+    """First integer found under `keys`; GraphQL edges look like {"count": n}."""
+    for k in keys:
+        v = d.get(k)
+        if isinstance(v, dict):
+            v = v.get("count")
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            return int(v)
+    return None
+
+
+def _caption(d: Dict) -> Optional[str]:
+    cap = d.get("caption")
+    if isinstance(cap, dict):
+        return cap.get("text")
+    if isinstance(cap, str):
+        return cap
+    edges = (d.get("edge_media_to_caption") or {}).get("edges") or []
+    if edges and isinstance(edges[0], dict):
+        return (edges[0].get("node") or {}).get("text")
+    return None
+
+
+def _owner(d: Dict) -> Optional[str]:
+    """Username of the account that posted `d` (GraphQL `owner`, v1 `user`)."""
+    for key in ("owner", "user"):
+        who = d.get(key)
+        if isinstance(who, dict) and isinstance(who.get("username"), str):
+            return who["username"]
+    return None
+
+
+def _media_record(d: Dict) -> Optional[Dict]:
+    """Normalize one media node from the web GraphQL or the v1 API, or None if `d` isn't one."""
+    shortcode = d.get("shortcode") or d.get("code")
+    if not isinstance(shortcode, str):
+        return None
+    taken = d.get("taken_at_timestamp") or d.get("taken_at")
+    if not (taken or "media_type" in d or "__typename" in d or "edge_liked_by" in d or "like_count" in d):
+        return None
+
+    if d.get("product_type") == "clips":
+        media_type = "reel"
+    elif d.get("media_type") in _MEDIA_TYPES:
+        media_type = _MEDIA_TYPES[d["media_type"]]
+    else:
+        media_type = _TYPENAMES.get(d.get("__typename"))
+
+    rec = {
+        "shortcode": shortcode,
+        "posted_at": (
+            datetime.fromtimestamp(taken, tz=timezone.utc).isoformat()
+            if isinstance(taken, (int, float)) else None
+        ),
+        "likes": _count(d, "like_count", "edge_liked_by", "edge_media_preview_like"),
+        "comments": _count(d, "comment_count", "edge_media_to_comment", "edge_media_preview_comment"),
+        "views": _count(d, "play_count", "video_view_count", "view_count"),
+        "media_type": media_type,
+        "caption": _caption(d),
+        "owner": _owner(d),
+    }
+    return {k: v for k, v in rec.items() if v is not None}
+
+
+def _walk(node: Any) -> Iterator[Dict]:
+    stack = [node]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            rec = _media_record(cur)
+            if rec:
+                yield rec
+            stack.extend(v for k, v in cur.items() if k not in _CHILD_KEYS)
+        elif isinstance(cur, list):
+            stack.extend(cur)
+
+
+def extract_media(payload: Any) -> Dict[str, Dict]:
+    """All media records found anywhere in a decoded JSON payload (carousel slides aside),
+    keyed by shortcode. Records carry the poster's username as `owner` when the payload has it."""
+    found: Dict[str, Dict] = {}
+    for rec in _walk(payload):
+        # The same post can appear twice (e.g. feed + pinned); keep the richest record
+        prev = found.get(rec["shortcode"])
+        found[rec["shortcode"]] = {**rec, **prev} if prev else rec
+    return found
+
+
+def posted_by(rec: Dict, handle: str) -> bool:
+    """True if media record `rec` names `handle` as its owner. Payloads also carry other
+    accounts' media (suggestions, tagged and related posts), so only these count as posts
+    of the profile when the grid itself never showed them."""
+    return (rec.get("owner") or "").lower() == handle.lower()
+
+
+# ----------------------------
+# Harvester
+# ----------------------------
+
+class NetworkHarvester:
+    """Reads JSON/XHR responses seen by the page via CDP and accumulates media metadata.
+
+    The driver must have been built with `enable_network_capture` so chromedriver
+    buffers Network events; `poll()` should be called regularly so that buffer stays small.
+    """
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.media: Dict[str, Dict] = {}
+        self._pending: Dict[str, str] = {}
+
+    def start(self) -> "NetworkHarvester":
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.get_log("performance")  # drop events from earlier pages (login, etc.)
+        except WebDriverException as e:
+            print(f"[NETWORK] Capture unavailable: {e}", flush=True)
+        return self
+
+    def poll(self) -> int:
+        """Process buffered events; returns how many new shortcodes were learned."""
+        try:
+            entries = self.driver.get_log("performance")
+        except WebDriverException:
+            return 0
+        before = len(self.media)
+        for entry in entries:
+            try:
+                msg = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError, TypeError):
+                continue
+            method, params = msg.get("method"), msg.get("params", {})
+            if method == "Network.responseReceived":
+                resp = params.get("response", {})
+                if "json" in (resp.get("mimeType") or "") or "/graphql" in resp.get("url", "") or "/api/v1/" in resp.get("url", ""):
+                    self._pending[params.get("requestId")] = resp.get("url", "")
+            elif method == "Network.loadingFinished" and params.get("requestId") in self._pending:
+                self._pending.pop(params["requestId"], None)
+                self._ingest(params["requestId"])
+            elif method == "Network.loadingFailed":
+                self._pending.pop(params.get("requestId"), None)
+        return len(self.media) - before
+
+    def _ingest(self, request_id: str) -> None:
+        try:
+            body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except WebDriverException:
+            return  # body already evicted or not retrievable
+        text = body.get("body", "")
+        if body.get("base64Encoded"):
+            text = base64.b64decode(text).decode("utf-8", "replace")
+        # Some endpoints prefix JSON with an anti-hijacking guard
+        if text.startswith("for (;;);"):
+            text = text[len("for (;;);"):]
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            return
+        for code, rec in extract_media(payload).items():
+            self.media[code] = {**self.media.get(code, {}), **rec}
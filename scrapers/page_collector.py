@@ -0,0 +1,48 @@
+# scrapers/page_collector.py
+from typing import List
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from scrapers.scroll import GRID_SELECTOR
+
+
+# Installs (once per document) a MutationObserver that records each newly seen post/reel
+# URL in a page-side buffer, then hands back and clears that buffer. The in-page scan
+# only touches added nodes, so each drain costs O(new posts) rather than O(grid size).
+_INSTALL_AND_DRAIN = """
+const selector = arguments[0];
+let c = window.__igCollect;
+if (!c) {
+  c = window.__igCollect = {seen: new Set(), buffer: []};
+  const take = (a) => {
+    const h = a.href;
+    if (!h || !(h.includes('/p/') || h.includes('/reel/'))) return;
+    const url = h.split('?')[0];
+    if (!c.seen.has(url)) { c.seen.add(url); c.buffer.push(url); }
+  };
+  const scan = (node) => {
+    if (node.nodeType !== 1) return;
+    if (node.matches(selector)) take(node);
+    node.querySelectorAll(selector).forEach(take);
+  };
+  scan(document.documentElement);
+  new MutationObserver((mutations) => {
+    for (const m of mutations) {
+      if (m.type === 'attributes') { scan(m.target); continue; }
+      m.addedNodes.forEach(scan);
+    }
+  }).observe(document.documentElement, {childList: true, subtree: true, attributes: true, attributeFilter: ['href']});
+}
+const out = c.buffer;
+c.buffer = [];
+return out;
+"""
+
+
+def drain_new_urls(driver: webdriver.Chrome) -> List[str]:
+    """Post/reel URLs that appeared since the last drain (installs the collector on first call)."""
+    try:
+        return driver.execute_script(_INSTALL_AND_DRAIN, GRID_SELECTOR) or []
+    except WebDriverException:
+        return []
@@ -0,0 +1,78 @@
+# scrapers/page_state.py
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from core import metrics
+from scrapers.scroll import GRID_SELECTOR
+
+# Probe results. LOGIN, THROTTLED, PRIVATE, EMPTY and GRID are final; the rest mean "ask again".
+LOADING, BANNER, LOGIN, THROTTLED, PRIVATE, EMPTY, GRID, PENDING = (
+    "loading", "banner", "login", "throttled", "private", "empty", "grid", "pending")
+TIMEOUT = "timeout"
+FINAL_STATES = (LOGIN, THROTTLED, PRIVATE, EMPTY, GRID)
+
+COOKIE_BUTTON_XPATHS = [
+    '//button//*[contains(text(),"Allow all cookies")]/ancestor::button',
+    '//button//*[contains(text(),"Allow All")]/ancestor::button',
+    '//button//*[contains(text(),"Only allow essential cookies")]/ancestor::button',
+    '//button[contains(text(),"Allow all cookies")]',
+    '//button[contains(text(),"Allow All")]',
+    '//button[contains(text(),"Only allow essential cookies")]',
+    '//div[@role="dialog"]//button[contains(text(),"Accept")]',
+]
+
+# Classifies the profile page in one round trip, clicking a cookie banner away if one is
+# shown. `window.__igTabNav` is set on a document that is being navigated away from
+# (see scrapers.tabs), so a probe that lands before the new page commits says "loading".
+PAGE_STATE_JS = """
+const selector = arguments[0], banners = arguments[1];
+if (window.__igTabNav || document.readyState === 'loading') return 'loading';
+const x = (xp) => document.evaluate(xp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+for (const xp of banners) {
+  const b = x(xp);
+  if (b) { b.click(); return 'banner'; }
+}
+if (document.querySelector('input[name="username"]')) return 'login';
+if (x('//*[contains(text(),"Please wait a few minutes")]') || x('//*[contains(text(),"Try Again Later")]')) return 'throttled';
+if (x('//*[contains(text(),"This account is private")]')) return 'private';
+if (x('//*[contains(text(),"No posts yet")]')) return 'empty';
+return document.querySelector(selector) ? 'grid' : 'pending';
+"""
+
+
+def probe_page_state(driver: webdriver.Chrome) -> str:
+    """One probe of the current page; LOADING if the script could not run (mid-navigation)."""
+    try:
+        return driver.execute_script(PAGE_STATE_JS, GRID_SELECTOR, COOKIE_BUTTON_XPATHS) or PENDING
+    except WebDriverException:
+        return LOADING
+
+
+def wait_for_page_state(driver: webdriver.Chrome, timeout: float = 20.0, poll: float = 0.25) -> str:
+    """Poll the probe until the page settles into a final state, or TIMEOUT.
+
+    Replaces fixed waits for each possible outcome: a public profile returns GRID as
+    soon as its first post links render, and a banner costs one click instead of a
+    round of XPath timeouts.
+    """
+    with metrics.span("page_state") as info:
+        deadline = time.monotonic() + timeout
+        polls = banners = 0
+        state = PENDING
+        while True:
+            state = probe_page_state(driver)
+            polls += 1
+            if state == BANNER:
+                banners += 1
+                print("[SCRAPER] Cookie banner dismissed", flush=True)
+            if state in FINAL_STATES or time.monotonic() >= deadline:
+                break
+            # Give a dismissed banner's dialog a moment to animate away
+            time.sleep(poll * 2 if state == BANNER else poll)
+        if state not in FINAL_STATES:
+            state = TIMEOUT
+        info.update(state=state, polls=polls, banners=banners)
+    metrics.incr("page_states_total", state=state)
+    return state
@@ -0,0 +1,196 @@
+# scrapers/post_set.py
+import re
+from array import array
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator
+
+from scrapers.urls import post_url
+
+# One-byte type codes; the index into TYPES is what's stored per post
+TYPES = ("unknown", "post", "reel")
+_TYPE_CODES = {name: code for code, name in enumerate(TYPES)}
+_URL_RE = re.compile(r"/(p|reel)/([A-Za-z0-9_-]+)")
+
+
+class PostSet:
+    """Post/reel shortcodes kept in flat buffers instead of URL strings and row dicts.
+
+    Shortcodes sit back to back in one bytearray with int32 offsets (Arrow's string
+    layout), types are one byte each, and a small open-addressing table keyed by shortcode
+    makes `add` a set insert: roughly 25 bytes per post instead of a few hundred. URLs and
+    row dicts are rebuilt on demand; `to_arrow` / `to_pandas` wrap the buffers without
+    copying them (only the optional `post_url` column is computed).
+    """
+
+    def __init__(self, urls: Iterable[str] = ()):
+        self._data = bytearray()
+        self._offsets = array("i", [0])
+        self._types = bytearray()
+        self._slots = array("i", [0]) * 16  # row + 1 per occupied slot, 0 = empty
+        for url in urls:
+            self.add_url(url)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> "PostSet":
+        """Collect `_url_to_row`-style dicts (only type and shortcode are kept)."""
+        posts = cls()
+        for row in rows:
+            if row.get("shortcode"):
+                posts.add(row["shortcode"], row.get("type", "post"))
+        return posts
+
+    # ----------------------------
+    # Building
+    # ----------------------------
+
+    def add(self, shortcode: str, kind: str = "post") -> bool:
+        """Insert a shortcode; False if it is already present (the first type seen wins)."""
+        code = shortcode.encode()
+        slot = self._find(code)
+        if self._slots[slot]:
+            return False
+        row = len(self._types)
+        self._append(code, _TYPE_CODES.get(kind, 0))
+        self._slots[slot] = row + 1
+        if 2 * (row + 1) > len(self._slots):
+            self._rehash(4 * len(self._slots))
+        return True
+
+    def add_url(self, url: str) -> bool:
+        """Insert the shortcode of a /p/ or /reel/ URL; False for duplicates and other URLs."""
+        m = _URL_RE.search(url)
+        if not m:
+            return False
+        return self.add(m.group(2), "reel" if m.group(1) == "reel" else "post")
+
+    def update(self, urls: Iterable[str]) -> int:
+        """Add many URLs; returns how many were new."""
+        return sum(self.add_url(u) for u in urls)
+
+    def sort(self) -> "PostSet":
+        """Reorder in place by URL (posts before reels, then shortcode), like `sorted(urls)`."""
+        reel = _TYPE_CODES["reel"]
+        # One bytes key per post: (reel?, type) then the shortcode, so a plain sort orders by URL
+        keys = sorted(bytes((t == reel, t)) + self._code(r) for r, t in enumerate(self._types))
+        # New buffers rather than in-place writes: frames already handed out keep their data
+        offsets = array("i", [0])
+        offsets.extend(accumulate(len(k) - 2 for k in keys))
+        self._offsets = offsets
+        self._data = bytearray(b"".join(k[2:] for k in keys))
+        self._types = bytearray(k[1] for k in keys)
+        self._rehash(len(self._slots))
+        return self
+
+    # ----------------------------
+    # Reading
+    # ----------------------------
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def __contains__(self, shortcode: object) -> bool:
+        return isinstance(shortcode, str) and bool(self._slots[self._find(shortcode.encode())])
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.shortcode(r) for r in range(len(self)))
+
+    def shortcode(self, row: int) -> str:
+        return self._code(row).decode()
+
+    def kind(self, row: int) -> str:
+        return TYPES[self._types[row]]
+
+    def url(self, row: int) -> str:
+        return post_url(self.kind(row), self.shortcode(row))
+
+    def urls(self) -> Iterator[str]:
+        return (self.url(r) for r in range(len(self)))
+
+    def rows(self) -> Iterator[Dict]:
+        """The same dicts `_url_to_row` builds, one at a time."""
+        for r in range(len(self)):
+            code = self.shortcode(r)
+            yield {"type": self.kind(r), "shortcode": code, "post_url": post_url(self.kind(r), code)}
+
+    # ----------------------------
+    # Columnar views
+    # ----------------------------
+
+    def to_arrow(self, urls: bool = True):
+        """pyarrow Table (type as a dictionary column); shortcodes and types are zero-copy."""
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+        except ImportError as e:
+            raise RuntimeError("Arrow conversion needs pyarrow: pip install pyarrow") from e
+        n = len(self)
+        codes = pa.StringArray.from_buffers(n, pa.py_buffer(self._offsets), pa.py_buffer(self._data))
+        indices = pa.Array.from_buffers(pa.int8(), n, [None, pa.py_buffer(self._types)])
+        columns = {"type": pa.DictionaryArray.from_arrays(indices, pa.array(TYPES)), "shortcode": codes}
+        if urls:
+            prefixes = pa.array([post_url(kind, "")[:-1] for kind in TYPES])
+            columns["post_url"] = pc.binary_join_element_wise(pc.take(prefixes, indices), codes, "/", "")
+        return pa.table(columns)
+
+    def to_pandas(self, urls: bool = True):
+        """DataFrame with type/shortcode/post_url columns. With pyarrow the type (categorical)
+        and shortcode (Arrow-backed) columns share this set's buffers; without it they are copied."""
+        import numpy as np
+        import pandas as pd
+
+        # codes are valid by construction, so skip the O(n) check (and the copy it implies)
+        types = pd.Categorical.from_codes(np.frombuffer(self._types, dtype=np.int8), categories=list(TYPES),
+                                          validate=False)
+        try:
+            table = self.to_arrow(urls=urls)
+        except RuntimeError:
+            columns = {"type": types, "shortcode": list(self)}
+            if urls:
+                columns["post_url"] = list(self.urls())
+            return pd.DataFrame(columns)
+        columns = {"type": types, "shortcode": pd.arrays.ArrowExtensionArray(table.column("shortcode"))}
+        if urls:
+            columns["post_url"] = pd.arrays.ArrowExtensionArray(table.column("post_url"))
+        return pd.DataFrame(columns, copy=False)
+
+    # ----------------------------
+    # Internals
+    # ----------------------------
+
+    def _code(self, row: int) -> bytes:
+        return bytes(self._data[self._offsets[row]:self._offsets[row + 1]])
+
+    def _find(self, code: bytes) -> int:
+        """Slot holding `code`, or the empty slot where it would go (linear probing)."""
+        mask = len(self._slots) - 1
+        slot = hash(code) & mask
+        while True:
+            row = self._slots[slot]
+            if not row or self._code(row - 1) == code:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _append(self, code: bytes, kind: int) -> None:
+        try:
+            self._data += code
+            self._offsets.append(len(self._data))
+            self._types.append(kind)
+        except BufferError:
+            # A view from to_arrow()/to_pandas() pins the buffers: detach from it and retry
+            self._data = bytearray(self._data[:self._offsets[len(self._types)]])
+            self._offsets = array("i", self._offsets[:len(self._types) + 1])
+            self._types = bytearray(self._types)
+            self._append(code, kind)
+
+    def _rehash(self, size: int) -> None:
+        self._slots = array("i", [0]) * size
+        mask = size - 1
+        for row in range(len(self)):
+            slot = hash(self._code(row)) & mask
+            while self._slots[slot]:
+                slot = (slot + 1) & mask
+            self._slots[slot] = row + 1
+
+    def __repr__(self) -> str:
+        return f"PostSet({len(self)} posts)"
+
@@ -0,0 +1,37 @@
+# scrapers/rate_limit.py
+from typing import Optional
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe pacer allowing at most `per_minute` acquisitions per minute (None = unlimited)."""
+
+    def __init__(self, per_minute: Optional[float] = None):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until the next slot is free; returns the seconds spent waiting."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def try_acquire(self) -> float:
+        """Non-blocking acquire: 0.0 if a slot was taken, else the seconds until one frees up."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                return self._next - now
+            self._next = now + self.interval
+        return 0.0
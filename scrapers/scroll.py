@@ -0,0 +1,205 @@
+# scrapers/scroll.py
+from typing import Dict, Optional
+import os
+import random
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from core import metrics
+
+
+GRID_SELECTOR = 'a[href*="/p/"], a[href*="/reel/"]'
+
+# Page-side activity tracking shared by the blocking and the polled scroll scripts
+_INSTRUMENT = """
+if (!window.__igScroll) {
+  const s = window.__igScroll = {inflight: 0, lastNet: 0, lastMutation: 0};
+  const busy = () => { s.lastNet = performance.now(); };
+  new MutationObserver(() => { s.lastMutation = performance.now(); })
+    .observe(document.documentElement, {childList: true, subtree: true});
+  const origFetch = window.fetch;
+  if (origFetch) {
+    window.fetch = function () {
+      s.inflight++; busy();
+      return origFetch.apply(this, arguments).finally(() => { s.inflight--; busy(); });
+    };
+  }
+  const origSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    s.inflight++; busy();
+    this.addEventListener('loadend', () => { s.inflight--; busy(); }, {once: true});
+    return origSend.apply(this, arguments);
+  };
+}
+const s = window.__igScroll;
+// Pruned tiles (scrapers.long_scroll) still count, so pruning never looks like growth
+const signature = () => {
+  const a = document.querySelectorAll(selector);
+  return (a.length + (window.__igPruned || 0)) + '|' + (a.length ? a[a.length - 1].getAttribute('href') : '');
+};
+// Settled: the grid changed and the page is quiet, nothing happened at all, or the deadline passed
+const settled = (t0) => {
+  const now = performance.now(), elapsed = now - t0, sig = signature();
+  const quiet = s.inflight <= 0 && now - s.lastMutation >= quietMs && now - s.lastNet >= quietMs;
+  const untouched = s.lastMutation < t0 && s.lastNet < t0;
+  const grew = sig !== prevSig;
+  if ((grew && quiet && elapsed >= minMs) || (untouched && elapsed >= minMs + 2 * quietMs) || elapsed >= maxMs) {
+    const atBottom = window.innerHeight + window.scrollY >= document.body.scrollHeight - 4;
+    return {sig: sig, grew: grew, quiet: quiet, atBottom: atBottom, elapsed: elapsed};
+  }
+  return null;
+};
+"""
+
+# Scrolls to the bottom, then resolves as soon as the grid changed and the page went
+# quiet (no DOM mutations, no in-flight fetch/XHR), or when the deadline passes. If the
+# scroll triggered no request and no mutation at all, it gives up early: end of grid.
+_SCROLL_AND_WAIT = """
+const prevSig = arguments[0], minMs = arguments[1], maxMs = arguments[2], quietMs = arguments[3];
+const selector = arguments[4], done = arguments[arguments.length - 1];
+""" + _INSTRUMENT + """
+window.scrollTo(0, document.body.scrollHeight);
+const t0 = performance.now();
+const tick = () => {
+  const r = settled(t0);
+  if (r) { done(r); } else { setTimeout(tick, 100); }
+};
+tick();
+"""
+
+# Same decision as _SCROLL_AND_WAIT, but returns at once so one driver can interleave
+# several tabs: with `kick` it scrolls and notes the start time, otherwise it reports
+# the settled result or null while the page is still loading.
+_SCROLL_POLL = """
+const prevSig = arguments[0], minMs = arguments[1], maxMs = arguments[2], quietMs = arguments[3];
+const selector = arguments[4], kick = arguments[5];
+""" + _INSTRUMENT + """
+if (kick) {
+  window.scrollTo(0, document.body.scrollHeight);
+  s.t0 = performance.now();
+  return null;
+}
+return settled(s.t0 || 0);
+"""
+
+
+class ScrollScheduler:
+    """Pacing policy for grid scrolling, driven by page signals instead of fixed sleeps.
+
+    Each scroll waits at least `min_pause` seconds (politeness floor) and returns as soon
+    as new anchors arrived and the page is quiet. Rounds with no growth back the deadline
+    off by `backoff` up to `max_pause`; `max_idle_rounds` such rounds end the grid.
+    """
+
+    def __init__(
+        self,
+        min_pause: float = 0.6,
+        max_pause: float = 8.0,
+        first_wait: float = 3.0,
+        quiet: float = 0.4,
+        backoff: float = 1.7,
+        max_idle_rounds: int = 3,
+        jitter: float = 0.4,
+    ):
+        self.min_pause = min_pause
+        self.max_pause = max(max_pause, min_pause)
+        self.first_wait = min(max(first_wait, min_pause), self.max_pause)
+        self.quiet = quiet
+        self.backoff = backoff
+        self.max_idle_rounds = max_idle_rounds
+        self.jitter = jitter
+
+    @classmethod
+    def from_env(cls, **overrides) -> "ScrollScheduler":
+        """Defaults overridable via SCRAPER_SCROLL_MIN_PAUSE / _MAX_PAUSE / _IDLE_ROUNDS."""
+        kwargs = {}
+        if os.getenv("SCRAPER_SCROLL_MIN_PAUSE"):
+            kwargs["min_pause"] = float(os.environ["SCRAPER_SCROLL_MIN_PAUSE"])
+        if os.getenv("SCRAPER_SCROLL_MAX_PAUSE"):
+            kwargs["max_pause"] = float(os.environ["SCRAPER_SCROLL_MAX_PAUSE"])
+        if os.getenv("SCRAPER_SCROLL_IDLE_ROUNDS"):
+            kwargs["max_idle_rounds"] = int(os.environ["SCRAPER_SCROLL_IDLE_ROUNDS"])
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    def start(self, driver: webdriver.Chrome) -> "ScrollSession":
+        """Per-page state; the scheduler itself is shareable across threads."""
+        return ScrollSession(self, driver)
+
+
+class ScrollSession:
+    def __init__(self, policy: ScrollScheduler, driver: webdriver.Chrome):
+        self.policy = policy
+        self.driver = driver
+        self.deadline = policy.first_wait
+        self.idle = 0
+        self.scrolls = 0
+        self.done = False
+        self._sig = ""
+        self._min_pause = policy.min_pause
+        self._begun = 0.0
+        # The async wait must never outlive WebDriver's script timeout
+        driver.set_script_timeout(policy.max_pause + 10)
+
+    def step(self) -> Optional[Dict]:
+        """Scroll once and wait for the grid to settle; None once the end of the grid is reached."""
+        if self.done:
+            return None
+        p = self.policy
+        min_pause = p.min_pause + random.uniform(0, p.jitter)
+        with metrics.span("scroll_wait", log=False):
+            try:
+                r = self.driver.execute_async_script(
+                    _SCROLL_AND_WAIT, self._sig, int(min_pause * 1000), int(self.deadline * 1000),
+                    int(p.quiet * 1000), GRID_SELECTOR,
+                ) or {}
+            except WebDriverException:
+                r = {}
+                time.sleep(min_pause)
+        return self._settle(r)
+
+    def begin(self) -> None:
+        """Non-blocking half of step(): scroll and return; follow with check() until it settles."""
+        self._min_pause = self.policy.min_pause + random.uniform(0, self.policy.jitter)
+        self._begun = time.monotonic()
+        try:
+            self.driver.execute_script(_SCROLL_POLL, self._sig, 0, 0, 0, GRID_SELECTOR, True)
+        except WebDriverException:
+            pass
+
+    def check(self) -> Optional[Dict]:
+        """The step() result once the scroll from begin() has settled, else None (still loading).
+
+        Only call this while the session's tab is the driver's current window.
+        """
+        p = self.policy
+        try:
+            r = self.driver.execute_script(
+                _SCROLL_POLL, self._sig, int(self._min_pause * 1000), int(self.deadline * 1000),
+                int(p.quiet * 1000), GRID_SELECTOR, False,
+            )
+        except WebDriverException:
+            # Page gone or navigating; treat as an empty round once the deadline has passed
+            r = {} if time.monotonic() - self._begun >= self.deadline else None
+        if r is None:
+            return None
+        return self._settle(r)
+
+    def _settle(self, r: Dict) -> Dict:
+        p = self.policy
+        self.scrolls += 1
+        metrics.incr("scrolls_total")
+        if r.get("grew"):
+            self._sig = r["sig"]
+            self.idle = 0
+            self.deadline = p.first_wait
+        else:
+            self.idle += 1
+            metrics.incr("idle_rounds_total")
+            self.deadline = min(self.deadline * p.backoff, p.max_pause)
+            if self.idle >= p.max_idle_rounds:
+                self.done = True
+        r["idle"] = self.idle
+        return r
@@ -0,0 +1,126 @@
+# scrapers/session_store.py
+from typing import Dict, Optional
+import json
+import os
+import re
+import time
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+
+from scrapers.urls import home_url
+
+
+_DUMP_LOCAL_STORAGE = """
+const out = {};
+for (let i = 0; i < window.localStorage.length; i++) {
+  const k = window.localStorage.key(i);
+  out[k] = window.localStorage.getItem(k);
+}
+return out;
+"""
+
+_LOAD_LOCAL_STORAGE = """
+const items = arguments[0] || {};
+for (const k of Object.keys(items)) {
+  try { window.localStorage.setItem(k, items[k]); } catch (e) {}
+}
+"""
+
+
+def is_logged_in(driver: webdriver.Chrome) -> bool:
+    """True when the session cookie is present and no login form is on screen."""
+    try:
+        if not driver.get_cookie("sessionid"):
+            return False
+        return not driver.find_elements(By.NAME, "username")
+    except WebDriverException:
+        return False
+
+
+class SessionStore:
+    """Per-account cookies + localStorage persisted as JSON files under `root`.
+
+    Sessions older than `ttl` seconds (or whose session cookie has expired) are
+    treated as missing, so callers fall back to a fresh login.
+    """
+
+    def __init__(self, root: Optional[str] = None, ttl: Optional[float] = None):
+        self.root = root or os.getenv("SCRAPER_SESSION_DIR", ".sessions")
+        self.ttl = ttl if ttl is not None else float(os.getenv("SCRAPER_SESSION_TTL", str(7 * 24 * 3600)))
+
+    def _path(self, account: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", account.lower())
+        return os.path.join(self.root, f"{safe}.json")
+
+    def save(self, driver: webdriver.Chrome, account: str) -> None:
+        """Snapshot the browser's current authenticated state for `account`."""
+        try:
+            data = {
+                "account": account,
+                "saved_at": time.time(),
+                "cookies": driver.get_cookies(),
+                "local_storage": driver.execute_script(_DUMP_LOCAL_STORAGE) or {},
+            }
+        except WebDriverException as e:
+            print(f"[SESSION] Could not snapshot session: {e}", flush=True)
+            return
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(account)
+        tmp = path + ".tmp"
+        # Cookies are credentials: keep the file private to this user
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+        print(f"[SESSION] Saved session for {account}", flush=True)
+
+    def load(self, account: str) -> Optional[Dict]:
+        """Stored session for `account`, or None if missing, unreadable or expired."""
+        try:
+            with open(self._path(account)) as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+        now = time.time()
+        if self.ttl and now - data.get("saved_at", 0) > self.ttl:
+            return None
+        for c in data.get("cookies", []):
+            if c.get("name") == "sessionid" and c.get("expiry") and c["expiry"] < now:
+                return None
+        return data
+
+    def discard(self, account: str) -> None:
+        try:
+            os.remove(self._path(account))
+        except OSError:
+            pass
+
+    def restore(self, driver: webdriver.Chrome, account: str) -> bool:
+        """Load the stored session into `driver` and check it is still accepted."""
+        data = self.load(account)
+        if not data:
+            return False
+        try:
+            # Cookies can only be set for the domain currently loaded
+            driver.get(home_url())
+            for c in data.get("cookies", []):
+                c = {k: v for k, v in c.items() if k in ("name", "value", "domain", "path", "expiry", "secure", "httpOnly", "sameSite")}
+                try:
+                    driver.add_cookie(c)
+                except WebDriverException:
+                    pass
+            driver.execute_script(_LOAD_LOCAL_STORAGE, data.get("local_storage", {}))
+            driver.get(home_url())
+        except WebDriverException as e:
+            print(f"[SESSION] Restore failed: {e}", flush=True)
+            return False
+
+        if is_logged_in(driver):
+            print(f"[SESSION] Restored session for {account}", flush=True)
+            return True
+        print(f"[SESSION] Stored session for {account} is no longer valid", flush=True)
+        self.discard(account)
+        return False
@@ -0,0 +1,208 @@
+# scrapers/tabs.py
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+import random
+import time
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from core import metrics
+from scrapers.lean import apply_lean_blocking
+from scrapers.page_collector import drain_new_urls
+from scrapers.page_state import (BANNER, EMPTY as PAGE_EMPTY, GRID, LOGIN, PRIVATE as PAGE_PRIVATE,
+                                 THROTTLED as PAGE_THROTTLED, probe_page_state)
+from scrapers.rate_limit import RateLimiter
+from scrapers.scroll import ScrollScheduler, ScrollSession
+from scrapers.urls import profile_url
+
+# Statuses yielded next to each handle
+URLS, DONE, LOGIN_REQUIRED, THROTTLED, PRIVATE, EMPTY, ERROR = (
+    "urls", "done", "login_required", "throttled", "private", "empty", "error")
+
+# Non-blocking navigation: the old document is flagged so a probe that runs before the
+# new page commits can't mistake the previous profile's grid for this one's
+_NAVIGATE = "window.__igTabNav = true; window.location.href = arguments[0];"
+
+
+class _Tab:
+    def __init__(self, window: str):
+        self.window = window
+        self.handle: Optional[str] = None
+        self.phase = "free"  # free -> queued -> loading -> scrolling -> free
+        self.due = 0.0
+        self.deadline = 0.0
+        self.scroll: Optional[ScrollSession] = None
+        self.seen: Set[str] = set()
+
+
+class TabScheduler:
+    """Scrolls several profile grids in one browser, one tab (window) per profile.
+
+    Navigation and scrolling are issued without blocking, so while one grid is waiting
+    for its next page of posts the driver polls or scrolls another tab. Each tab keeps
+    the pacing of `scheduler` (politeness floor, backoff, idle rounds) on its own.
+    Network capture is not supported here; `lean` re-applies URL blocking per tab.
+    """
+
+    def __init__(
+        self,
+        driver: webdriver.Chrome,
+        tabs: int = 3,
+        scheduler: Optional[ScrollScheduler] = None,
+        lean: bool = False,
+        limiter: Optional[RateLimiter] = None,
+        page_timeout: float = 20.0,
+        poll: float = 0.1,
+    ):
+        self.driver = driver
+        self.tabs = max(1, tabs)
+        self.scheduler = scheduler or ScrollScheduler.from_env()
+        self.lean = lean
+        self.limiter = limiter
+        self.page_timeout = page_timeout
+        self.poll = poll
+        self._current: Optional[str] = None
+        self._retry: List[str] = []
+
+    def requeue(self, handle: str) -> None:
+        """Visit `handle` again once a tab is free (e.g. after logging in anew)."""
+        self._retry.append(handle)
+
+    def run(self, handles: Iterable[str]) -> Iterator[Tuple[str, str, List[str]]]:
+        """Yield (handle, status, urls) as tabs make progress.
+
+        status is URLS for each batch of newly seen post/reel URLs, then exactly one of
+        DONE, LOGIN_REQUIRED, THROTTLED, PRIVATE, EMPTY or ERROR per handle. `handles` is
+        consumed lazily, one whenever a tab frees up.
+        """
+        pending = iter(handles)
+        exhausted = False
+        tabs = self._open_tabs()
+        try:
+            while True:
+                for tab in tabs:
+                    if tab.phase != "free":
+                        continue
+                    handle = self._retry.pop(0) if self._retry else None
+                    if handle is None and not exhausted:
+                        handle = next(pending, None)
+                        exhausted = handle is None
+                    if handle is not None:
+                        self._assign(tab, handle)
+                active = [t for t in tabs if t.phase != "free"]
+                if not active:
+                    return
+                tab = min(active, key=lambda t: t.due)
+                wait = tab.due - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                try:
+                    yield from self._advance(tab)
+                except WebDriverException as e:
+                    print(f"[TABS] {tab.handle}: {type(e).__name__}", flush=True)
+                    yield tab.handle, ERROR, []
+                    tab.phase = "free"
+        finally:
+            self._close_tabs(tabs)
+
+    # ----------------------------
+    # Tabs
+    # ----------------------------
+
+    def _open_tabs(self) -> List[_Tab]:
+        tabs = [_Tab(self.driver.current_window_handle)]
+        for _ in range(self.tabs - 1):
+            # Separate windows rather than background tabs: hidden pages get their timers and
+            # IntersectionObservers throttled, which stalls lazy-loading grids
+            self.driver.switch_to.new_window("window")
+            if self.lean:
+                # Network.setBlockedURLs only covers the target it was sent to
+                apply_lean_blocking(self.driver)
+            tabs.append(_Tab(self.driver.current_window_handle))
+        self._current = tabs[-1].window
+        return tabs
+
+    def _close_tabs(self, tabs: List[_Tab]) -> None:
+        for tab in tabs[1:]:
+            try:
+                self._switch(tab)
+                self.driver.close()
+            except WebDriverException:
+                pass
+        try:
+            self.driver.switch_to.window(tabs[0].window)
+            self._current = tabs[0].window
+        except WebDriverException:
+            pass
+
+    def _switch(self, tab: _Tab) -> None:
+        if self._current != tab.window:
+            self.driver.switch_to.window(tab.window)
+            self._current = tab.window
+
+    # ----------------------------
+    # Per-tab state machine
+    # ----------------------------
+
+    def _assign(self, tab: _Tab, handle: str) -> None:
+        tab.handle, tab.phase, tab.scroll, tab.seen = handle, "queued", None, set()
+        tab.due = time.monotonic()
+
+    def _advance(self, tab: _Tab) -> Iterator[Tuple[str, str, List[str]]]:
+        now = time.monotonic()
+        if tab.phase == "queued":
+            wait = self.limiter.try_acquire() if self.limiter else 0.0
+            if wait > 0:
+                tab.due = now + wait
+                return
+            self._switch(tab)
+            url = profile_url(tab.handle)
+            print(f"[TABS] Visiting: {url}", flush=True)
+            self.driver.execute_script(_NAVIGATE, url)
+            tab.phase, tab.deadline = "loading", now + self.page_timeout
+            tab.due = now + random.uniform(1.0, 2.0)
+            return
+
+        self._switch(tab)
+        if tab.phase == "loading":
+            state = probe_page_state(self.driver)
+            if state in (LOGIN, PAGE_THROTTLED, PAGE_PRIVATE, PAGE_EMPTY):
+                status = {LOGIN: LOGIN_REQUIRED, PAGE_THROTTLED: THROTTLED, PAGE_PRIVATE: PRIVATE,
+                          PAGE_EMPTY: EMPTY}[state]
+                print(f"[TABS] {tab.handle}: {status}", flush=True)
+                metrics.incr("profiles_total", outcome=status)
+                yield tab.handle, status, []
+                tab.phase = "free"
+                return
+            if state != GRID and now < tab.deadline:
+                tab.due = now + (0.5 if state == BANNER else 0.25)
+                return
+            # Grid is up (or never showed up in time: scroll anyway, like the sequential path)
+            tab.scroll = self.scheduler.start(self.driver)
+            tab.phase = "scrolling"
+            yield from self._drain(tab)
+            tab.scroll.begin()
+            tab.due = now + tab.scroll.policy.min_pause
+            return
+
+        # scrolling
+        r = tab.scroll.check()
+        if r is None:
+            tab.due = now + self.poll
+            return
+        yield from self._drain(tab)
+        if tab.scroll.done:
+            print(f"[TABS] {tab.handle}: {len(tab.seen)} posts", flush=True)
+            metrics.incr("profiles_total", outcome="ok" if tab.seen else "no_urls")
+            yield tab.handle, DONE, []
+            tab.phase = "free"
+            return
+        tab.scroll.begin()
+        tab.due = time.monotonic() + tab.scroll.policy.min_pause
+
+    def _drain(self, tab: _Tab) -> Iterator[Tuple[str, str, List[str]]]:
+        new = [u for u in drain_new_urls(self.driver) if u not in tab.seen]
+        metrics.incr("anchors_seen_total", len(new))
+        if new:
+            tab.seen.update(new)
+            yield tab.handle, URLS, new
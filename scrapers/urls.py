@@ -0,0 +1,49 @@
+# scrapers/urls.py
+import os
+import re
+from typing import Optional
+from urllib.parse import urlparse
+
+# Point at a local stand-in (fixture server) instead of the real site, e.g. http://127.0.0.1:8765
+BASE_URL = os.getenv("INSTAGRAM_BASE_URL", "https://www.instagram.com").rstrip("/")
+
+
+def set_base_url(url: str) -> None:
+    """Retarget every URL helper, e.g. at a fixture server started after import."""
+    global BASE_URL
+    BASE_URL = url.rstrip("/")
+
+
+def home_url() -> str:
+    return f"{BASE_URL}/"
+
+
+def login_url() -> str:
+    return f"{BASE_URL}/accounts/login/"
+
+
+def profile_url(handle: str) -> str:
+    return f"{BASE_URL}/{handle}/"
+
+
+def post_url(kind: str, shortcode: str) -> str:
+    """URL for a shortcode; `kind` is "reel" for reels, anything else maps to /p/."""
+    return f"{BASE_URL}/{'reel' if kind == 'reel' else 'p'}/{shortcode}/"
+
+
+def normalize_handle(raw: str) -> Optional[str]:
+    """Accepts @user / user / https://instagram.com/user and returns 'user' (None if invalid)."""
+    if not raw:
+        return None
+    text = raw.strip()
+    if text.startswith("@"):
+        text = text[1:]
+    if text.startswith("http://") or text.startswith("https://"):
+        try:
+            p = urlparse(text)
+            seg = (p.path or "").strip("/").split("/")[0]
+            if seg:
+                text = seg
+        except Exception:
+            pass
+    return text if re.match(r"^[A-Za-z0-9._]{1,100}$", text) else None
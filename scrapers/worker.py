@@ -0,0 +1,232 @@
+# scrapers/worker.py
+"""Headless queue worker: several of these, on one host or many, share one backlog of
+handles (core.work_queue) and stream post rows into a sink.
+
+    python -m scrapers.worker add handles.txt
+    python -m scrapers.worker run --out posts.db --lean
+    python -m scrapers.worker status
+"""
+from typing import Callable, Dict, Iterable, List, Optional
+import argparse
+import os
+import signal
+import socket
+import threading
+import time
+
+from core import metrics
+from core.sinks import Sink, open_sink
+from core.work_queue import Task, WorkQueue, open_queue
+from scrapers.accounts import INCOMPLETE, Blocked
+
+
+# Rows are written to the sink in groups of up to this many (and whenever `scrape` flushes)
+WRITE_BATCH = 24
+
+
+class LeaseLost(Exception):
+    """The task's lease ran out and another worker may already have it."""
+
+
+class _Heartbeat(threading.Thread):
+    """Extends a task's lease every `interval` seconds until stopped or the lease is lost."""
+
+    def __init__(self, queue: WorkQueue, task: Task, interval: float):
+        super().__init__(name=f"heartbeat-{task.handle}", daemon=True)
+        self.queue = queue
+        self.task = task
+        self.interval = interval
+        self.lost = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                if not self.queue.heartbeat(self.task):
+                    print(f"[WORKER] Lost the lease on {self.task.handle}", flush=True)
+                    self.lost.set()
+                    return
+            except Exception as e:
+                # A locked or unreachable queue: keep trying until the lease itself runs out
+                print(f"[WORKER] Heartbeat failed: {type(e).__name__}: {e}", flush=True)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(
+    queue: WorkQueue,
+    scrape: Callable[[str, Callable[[], None]], Iterable[Dict]],
+    sink: Optional[Sink] = None,
+    worker_id: Optional[str] = None,
+    stop: Optional[threading.Event] = None,
+    exit_when_empty: bool = False,
+    poll: float = 5.0,
+    max_tasks: Optional[int] = None,
+    backoff: float = 60.0,
+) -> Dict[str, int]:
+    """Claim handles until `stop` is set (or, with `exit_when_empty`, the queue is empty),
+    running `scrape(handle, flush)` for each and writing its rows, tagged with the handle,
+    to `sink`. Rows are written in groups; `scrape` calls `flush()` to have everything it
+    yielded so far written before it records progress anywhere (e.g. a checkpoint).
+    Returns counts of done / failed / released tasks.
+
+    A scrape that raises Blocked fails its task, so the handle is retried (on any node)
+    until it has used up its attempts. After a login wall or throttling this worker also
+    waits `backoff` seconds before claiming again instead of failing the rest of the backlog.
+
+    The lease is renewed every third of `queue.lease` while a handle is scraped. If it is
+    lost anyway, the rows stop there; whoever re-claims the handle scrapes it again.
+    """
+    worker_id = worker_id or default_worker_id()
+    stop = stop or threading.Event()
+    counts = {"done": 0, "failed": 0, "released": 0}
+    print(f"[WORKER] {worker_id} started", flush=True)
+    while not stop.is_set() and (max_tasks is None or counts["done"] + counts["failed"] < max_tasks):
+        task = queue.claim(worker_id)
+        if task is None:
+            if exit_when_empty:
+                break
+            stop.wait(poll)
+            continue
+
+        print(f"[WORKER] {worker_id} claimed {task.handle} (attempt {task.attempts})", flush=True)
+        heartbeat = _Heartbeat(queue, task, max(1.0, queue.lease / 3))
+        heartbeat.start()
+        t0 = time.monotonic()
+        posts = 0
+        pause = False
+        pending: List[Dict] = []
+        rows_iter = None
+
+        def flush() -> None:
+            nonlocal posts
+            if pending:
+                if sink:
+                    sink.write([{"handle": task.handle, **r} for r in pending])
+                posts += len(pending)
+                pending.clear()
+
+        try:
+            rows_iter = scrape(task.handle, flush)
+            for row in rows_iter:
+                # Checked between rows: a lost lease or a shutdown stops the scrape mid-grid
+                if heartbeat.lost.is_set():
+                    raise LeaseLost()
+                pending.append(row)
+                if len(pending) >= WRITE_BATCH:
+                    flush()
+                if stop.is_set():
+                    break
+            flush()
+            if stop.is_set():
+                queue.release(task)
+                counts["released"] += 1
+                print(f"[WORKER] Released {task.handle} on shutdown", flush=True)
+                continue
+            seconds = round(time.monotonic() - t0, 2)
+            queue.complete(task, {"posts": posts, "seconds": seconds, "worker": worker_id})
+            counts["done"] += 1
+            print(f"[WORKER] {task.handle}: {posts} posts", flush=True)
+        except LeaseLost:
+            counts["failed"] += 1
+        except Blocked as e:
+            # Rows found before the block are real; the checkpoint resumes after them
+            flush()
+            queue.fail(task, f"Blocked: {e}")
+            counts["failed"] += 1
+            # Only Instagram pushing back calls for a pause; a grid given up on is retried at once
+            pause = e.reason != INCOMPLETE
+            print(f"[WORKER] {task.handle} stopped early ({e})" + (f"; pausing {backoff:.0f}s" if pause else ""),
+                  flush=True)
+        except Exception as e:
+            queue.fail(task, f"{type(e).__name__}: {e}")
+            counts["failed"] += 1
+            print(f"[WORKER] {task.handle} failed: {type(e).__name__}: {e}", flush=True)
+        finally:
+            heartbeat.stop()
+            # An abandoned scrape generator still holds its pooled browser until closed
+            if hasattr(rows_iter, "close"):
+                rows_iter.close()
+            metrics.log_event("queue_task", handle=task.handle, attempt=task.attempts, posts=posts,
+                              worker=worker_id, seconds=round(time.monotonic() - t0, 3))
+            metrics.flush()
+        if pause:
+            stop.wait(backoff)
+    print(f"[WORKER] {worker_id} stopping: {counts}", flush=True)
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Shared work queue for scraping handles across nodes.")
+    ap.add_argument("--queue", default=None,
+                    help="queue URL or SQLite path (default SCRAPER_QUEUE, else .scraper_data/queue.db)")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    add = sub.add_parser("add", help="enqueue handles (finished ones are queued again)")
+    add.add_argument("handles", nargs="+", help="handles/profile URLs, or a file of them (one per line)")
+
+    run = sub.add_parser("run", help="claim and scrape handles until stopped")
+    run.add_argument("-o", "--out", default="posts.jsonl", help="file rows stream into: .jsonl, .csv or .db/.sqlite")
+    run.add_argument("--lease", type=float, default=float(os.getenv("SCRAPER_QUEUE_LEASE", "300")),
+                     help="seconds a claim lasts without a heartbeat")
+    run.add_argument("--max-attempts", type=int, default=3, help="claims per handle before it is marked failed")
+    run.add_argument("--exit-when-empty", action="store_true", help="stop once nothing is queued")
+    run.add_argument("--poll", type=float, default=5.0, help="seconds between claims while the queue is empty")
+    run.add_argument("--backoff", type=float, default=60.0,
+                     help="seconds to pause claiming after a login wall or throttling")
+    run.add_argument("--lean", action="store_true", help="block images/media/fonts/trackers in the browser")
+    run.add_argument("--long-scroll", action="store_true", default=None,
+                     help="prune harvested tiles and recycle tabs to bound memory on very long grids")
+    run.add_argument("--metrics-port", type=int, default=None,
+                     help="serve Prometheus metrics on this port while running (or SCRAPER_METRICS_PORT)")
+
+    sub.add_parser("status", help="print task counts and failed handles")
+    args = ap.parse_args(argv)
+
+    if args.command == "add":
+        from scrapers.batch import read_handles
+        from scrapers.urls import normalize_handle
+
+        raw = []
+        for h in args.handles:
+            raw.extend(read_handles(h) if os.path.isfile(h) else [h])
+        handles = [normalize_handle(h) for h in raw]
+        invalid = [r for r, h in zip(raw, handles) if not h]
+        if invalid:
+            print(f"[WORKER] Skipping invalid handles: {', '.join(invalid)}", flush=True)
+        added = open_queue(args.queue).put(h for h in handles if h)
+        print(f"[WORKER] Queued {added} handle(s)", flush=True)
+        return 0
+
+    if args.command == "status":
+        queue = open_queue(args.queue)
+        print(" ".join(f"{k}={v}" for k, v in queue.stats().items()), flush=True)
+        for t in queue.tasks("failed"):
+            print(f"  {t['handle']}: {t['error']}", flush=True)
+        return 0
+
+    from scrapers.checkpoint import CheckpointStore
+    from scrapers.instagram_selenium import InstagramScraperSelenium
+
+    queue = open_queue(args.queue, lease=args.lease, max_attempts=args.max_attempts)
+    scraper = InstagramScraperSelenium(lean=args.lean, long_scroll=args.long_scroll)
+    # A handle re-claimed after a crash skips the rows this node already wrote
+    checkpoint = CheckpointStore()
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    metrics.serve_prometheus(args.metrics_port)
+    with open_sink(args.out) as sink:
+        counts = run_worker(queue, lambda h, flush: scraper.iter_profile(h, checkpoint=checkpoint, flush=flush),
+                            sink=sink, stop=stop, exit_when_empty=args.exit_when_empty, poll=args.poll,
+                            backoff=args.backoff)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())